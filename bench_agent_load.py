@@ -0,0 +1,151 @@
+#################################
+#         bench_agent_load.py
+#################################
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Any
+# Default to the scripted model so the load test never needs a live Ollama endpoint
+os.environ.setdefault("LLM_PROVIDER", "fake")
+import config
+import db_tools
+import langgraph_agent
+print("----------------- argparse, os, threading, time imports completed or connected, ---------")
+print("----------------- concurrent.futures, contextlib imports completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+print("----------------- langgraph_agent import completed or connected, ---------")
+
+print("="*40)
+# Measurement Helpers
+print("="*40)
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux /proc, falls back to peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def checkpoint_count() -> int:
+    """Number of checkpoints held by the in-memory checkpointer of the agent graph."""
+    storage = getattr(langgraph_agent.get_graph().checkpointer, "storage", None) or {}
+    return sum(len(checkpoints) for namespaces in storage.values() for checkpoints in namespaces.values())
+
+def report(label: str, values: List[float]) -> None:
+    """Print p50/p95/p99/max of a list of seconds in milliseconds."""
+    print(f"  {label:<22} p50={percentile(values, 0.5) * 1000:8.2f} ms  p95={percentile(values, 0.95) * 1000:8.2f} ms  "
+          f"p99={percentile(values, 0.99) * 1000:8.2f} ms  max={max(values or [0]) * 1000:8.2f} ms")
+
+print("="*40)
+# Load Test
+print("="*40)
+
+def main() -> int:
+    """Drive concurrent agent turns against the scripted model and report overhead and memory growth."""
+    parser = argparse.ArgumentParser(description="Agent load test with the scripted fake LLM")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent run_agent_turn callers")
+    parser.add_argument("--turns", type=int, default=1000, help="Total agent turns")
+    parser.add_argument("--conversations", type=int, default=50,
+                        help="Distinct thread ids; turns are spread over them so histories grow")
+    parser.add_argument("--sample-every", type=int, default=100, help="Turns between memory samples")
+    parser.add_argument("--priority", choices=["interactive", "batch"], default="batch",
+                        help="LLM queue priority of the load turns")
+    parser.add_argument("--verbose", action="store_true", help="Keep the agent's own progress output")
+    args = parser.parse_args()
+
+    print("#===============[ start_of_main_process ]==========")
+    if config.LLM_PROVIDER != "fake":
+        print(f"WARNING: LLM_PROVIDER={config.LLM_PROVIDER}; results include real model latency")
+    if not config.validate_config() or not db_tools.test_connection():
+        print("ERROR: Database not reachable")
+        return 1
+    print(f"Load: {args.turns} turns, {args.threads} threads, {args.conversations} conversations, "
+          f"fake LLM latency {config.FAKE_LLM_LATENCY_MS} ms")
+
+    # Compile graph and open pool before measuring
+    langgraph_agent.get_graph()
+    langgraph_agent.run_agent_turn("warm up", "load_warmup")
+
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    samples = [(0, rss_mb(), checkpoint_count())]
+    results_lock = threading.Lock()
+    out = sys.__stdout__
+
+    def one_turn(i: int) -> None:
+        try:
+            turn = langgraph_agent.run_agent_turn(f"load turn {i}", f"load_{i % args.conversations}",
+                                                  priority=args.priority)
+        except Exception as e:
+            with results_lock:
+                errors.append(str(e))
+            return
+        with results_lock:
+            results.append(turn["stats"])
+            done = len(results) + len(errors)
+        if done % args.sample_every == 0:
+            sample = (done, rss_mb(), checkpoint_count())
+            samples.append(sample)
+            print(f"  {sample[0]:>6} turns  rss={sample[1]:8.1f} MB  checkpoints={sample[2]}", file=out, flush=True)
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(sys.stdout if args.verbose else devnull):
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(one_turn, range(args.turns)))
+    elapsed = time.perf_counter() - start
+
+    print("="*40)
+    # Results
+    print("="*40)
+
+    total = [s["total_seconds"] for s in results]
+    llm = [s["llm_seconds"] for s in results]
+    queue = [s["llm_queue_seconds"] for s in results]
+    tool = [s["tool_seconds"] for s in results]
+    db = [s["db_seconds"] for s in results]
+    # Time not spent in the model, its queue or inside tools: graph scheduling, checkpointer and state merging
+    overhead = [s["total_seconds"] - s["llm_seconds"] - s["llm_queue_seconds"] - s["tool_seconds"] for s in results]
+    stopped = sum(1 for s in results if s["stopped_reason"])
+
+    print(f"Turns: {len(results)} ok, {len(errors)} errors, {stopped} stopped early")
+    print(f"Throughput: {len(results) / elapsed:.1f} turns/s over {elapsed:.1f} s")
+    report("turn total", total)
+    report("llm (fake)", llm)
+    report("llm queue", queue)
+    report("tools", tool)
+    report("db", db)
+    report("graph overhead", overhead)
+    first, last = samples[0], samples[-1]
+    print(f"Memory: rss {first[1]:.1f} -> {last[1]:.1f} MB, checkpoints {first[2]} -> {last[2]}")
+    if last[0] > first[0]:
+        print(f"  growth per 1000 turns: {(last[1] - first[1]) / (last[0] - first[0]) * 1000:.1f} MB")
+    if errors:
+        print(f"First error: {errors[0]}")
+
+    print("#===============[ process completed ]==========")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# EXPLANATION
+# Purpose: Agent load test driving many concurrent run_agent_turn threads against the scripted fake LLM
+# Main functions: main -> runs turns on a thread pool, reports latency breakdown (llm/tools/db/graph overhead)
+#                 and memory growth; rss_mb/checkpoint_count -> process RSS and MemorySaver checkpoint count
+# Notable vars: LLM_PROVIDER defaults to "fake", FAKE_LLM_LATENCY_MS -> artificial model latency
@@ -0,0 +1,96 @@
+#################################
+#         bench_arrow.py
+#################################
+
+import sys
+import time
+import pandas as pd
+import config
+import db_tools
+print("----------------- time import completed or connected, ---------")
+print("----------------- pandas import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+
+print("#===============[ start_of_main_process ]==========")
+
+# Rows and columns of the throwaway wide table
+NUM_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+NUM_COLS = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+ROUNDS = 3
+BENCH_TABLE = "mcp_bench_wide"
+
+print("="*40)
+# Configuration Validation
+print("="*40)
+
+if not config.validate_config():
+    print("ERROR: Configuration validation failed")
+    exit(1)
+
+if not db_tools.test_connection():
+    print("ERROR: Connection test failed")
+    exit(1)
+
+print("="*40)
+# Create Wide Table
+print("="*40)
+
+# Mix of integer, float, text and timestamp columns
+column_defs = []
+for i in range(NUM_COLS):
+    kind = i % 4
+    if kind == 0:
+        column_defs.append(f"g + {i} AS c{i}")
+    elif kind == 1:
+        column_defs.append(f"(g * {i})::float8 / 7 AS c{i}")
+    elif kind == 2:
+        column_defs.append(f"md5((g + {i})::text) AS c{i}")
+    else:
+        column_defs.append(f"now() - (g || ' seconds')::interval AS c{i}")
+db_tools.execute_query(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+db_tools.execute_query(
+    f"CREATE TABLE {BENCH_TABLE} AS SELECT {', '.join(column_defs)} FROM generate_series(1, %s) g",
+    (NUM_ROWS,)
+)
+print(f"Created {BENCH_TABLE}: {NUM_ROWS} rows x {NUM_COLS} columns")
+
+query = f"SELECT * FROM {BENCH_TABLE}"
+
+def best_of(fn) -> float:
+    """Run fn ROUNDS times. Returns best wall time in seconds."""
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+print("="*40)
+# Dict Path
+print("="*40)
+
+dict_time = best_of(lambda: pd.DataFrame(db_tools.execute_query(query)))
+print(f"execute_query -> pd.DataFrame: {dict_time * 1000:.1f} ms")
+
+print("="*40)
+# Arrow Path
+print("="*40)
+
+arrow_time = best_of(lambda: db_tools.query_arrow(query))
+print(f"query_arrow -> pyarrow.Table: {arrow_time * 1000:.1f} ms")
+arrow_pandas_time = best_of(lambda: db_tools.query_arrow(query).to_pandas())
+print(f"query_arrow -> to_pandas(): {arrow_pandas_time * 1000:.1f} ms")
+
+print("="*40)
+# Cleanup
+print("="*40)
+
+db_tools.execute_query(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+print(f"\nSpeedup vs dict path: Arrow {dict_time / arrow_time:.2f}x, Arrow+pandas {dict_time / arrow_pandas_time:.2f}x")
+print("#===============[ process completed ]==========")
+
+# EXPLANATION
+# Purpose: Benchmark building frames from execute_query dicts vs the columnar query_arrow path on wide tables
+# Main functions: best_of -> best wall time over ROUNDS runs
+# Notable vars: NUM_ROWS, NUM_COLS -> size of the throwaway wide table, BENCH_TABLE -> its name
@@ -0,0 +1,266 @@
+#################################
+#         bench_mcp_replay.py
+#################################
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shlex
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, List, Any, Optional
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+print("----------------- argparse, asyncio, json, logging imports completed or connected, ---------")
+print("----------------- os, shlex, time imports completed or connected, ---------")
+print("----------------- contextlib, typing imports completed or connected, ---------")
+print("----------------- mcp client imports completed or connected, ---------")
+
+# The server prints its import/startup lines to stdout before the handshake; the client skips them, keep its log quiet
+logging.getLogger("mcp.client.stdio").setLevel(logging.CRITICAL)
+
+print("="*40)
+# Trace Loading
+print("="*40)
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """Load call_tool requests from JSONL. Accepts {"tool"|"name", "arguments"} lines (MCP_CALL_LOG format)."""
+    requests = []
+    skipped = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            tool = entry.get("tool") or entry.get("name")
+            if not tool:
+                skipped += 1
+                continue
+            requests.append({"tool": tool, "arguments": entry.get("arguments") or {}})
+    print(f"----------------- loaded {len(requests)} requests from {path} ({skipped} lines skipped), ---------")
+    return requests
+
+print("="*40)
+# Server Connections
+print("="*40)
+
+class InProcessServer:
+    """Calls the server's call_tool handler directly, without stdio transport."""
+    # Concurrency here relies on the server running handlers on its MCP_TOOL_WORKERS threads
+    # (dispatch_tool); replay concurrency above that queues inside the server. A timed-out call
+    # stops being awaited but its handler runs on in the worker, holding it until it finishes
+
+    def __init__(self):
+        import mcp_postgres_server
+        self._server = mcp_postgres_server
+        self.max_concurrency = mcp_postgres_server.config.MCP_TOOL_WORKERS
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        content = await self._server.call_tool(name, arguments)
+        return content[0].text if content else ""
+
+class StdioServer:
+    """One spawned server process with an MCP client session over stdio."""
+
+    def __init__(self, session: ClientSession):
+        self._session = session
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        result = await self._session.call_tool(name, arguments)
+        text = result.content[0].text if result.content else ""
+        if result.isError:
+            raise RuntimeError(text)
+        return text
+
+async def spawn_servers(stack: AsyncExitStack, command: str, count: int, server_log: str) -> List[StdioServer]:
+    """Start count server processes and initialize a client session on each. Server stderr goes to server_log."""
+    argv = shlex.split(command)
+    errlog = stack.enter_context(open(server_log, "a", encoding="utf-8"))
+    servers = []
+    for _ in range(count):
+        params = StdioServerParameters(command=argv[0], args=argv[1:], env=dict(os.environ))
+        read, write = await stack.enter_async_context(stdio_client(params, errlog=errlog))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        servers.append(StdioServer(session))
+    return servers
+
+def is_error_response(text: str) -> bool:
+    """Check if a tool response is the server's {"error": ...} payload."""
+    if not text.startswith("{"):
+        return False
+    try:
+        return "error" in json.loads(text)
+    except json.JSONDecodeError:
+        return False
+
+print("="*40)
+# Replay
+print("="*40)
+
+async def replay(servers: List[Any], requests: List[Dict[str, Any]], concurrency: int,
+                 rate: float, timeout: float) -> Dict[str, Any]:
+    """Replay requests with concurrency workers, optionally paced at rate per second. Returns raw samples."""
+    # With a rate, requests are scheduled open-loop and latency is measured from the scheduled
+    # send time, so client-side queueing behind a slow server is counted instead of hidden
+    queue: asyncio.Queue = asyncio.Queue()
+    samples: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+
+    async def producer():
+        for i, request in enumerate(requests):
+            scheduled = start + i / rate if rate > 0 else None
+            if scheduled is not None:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await queue.put((request, scheduled))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker(index: int):
+        server = servers[index % len(servers)]
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            request, scheduled = item
+            sent = time.perf_counter()
+            error: Optional[str] = None
+            try:
+                text = await asyncio.wait_for(server.call_tool(request["tool"], request["arguments"]), timeout)
+                if is_error_response(text):
+                    error = json.loads(text)["error"]
+            except asyncio.TimeoutError:
+                error = f"timeout after {timeout}s"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            done = time.perf_counter()
+            samples.append({
+                "tool": request["tool"],
+                "latency": done - (scheduled if scheduled is not None else sent),
+                "error": error,
+            })
+
+    await asyncio.gather(producer(), *(worker(i) for i in range(concurrency)))
+    return {"elapsed": time.perf_counter() - start, "samples": samples}
+
+print("="*40)
+# Report
+print("="*40)
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+def summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Aggregate samples into overall and per-tool throughput, latency percentiles and error rate."""
+    def stats(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latencies = [s["latency"] for s in group]
+        errors = sum(1 for s in group if s["error"])
+        return {
+            "count": len(group),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4) if group else 0.0,
+            "throughput": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(max(latencies or [0]) * 1000, 2),
+        }
+    tools: Dict[str, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        tools.setdefault(sample["tool"], []).append(sample)
+    first_errors = {}
+    for sample in samples:
+        if sample["error"] and sample["tool"] not in first_errors:
+            first_errors[sample["tool"]] = sample["error"][:200]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": stats(samples),
+        "tools": {name: stats(group) for name, group in sorted(tools.items())},
+        "first_errors": first_errors,
+    }
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print summary table of a replay."""
+    print(f"\n{'tool':<18} {'count':>7} {'req/s':>9} {'err%':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(report["tools"].items()) + [("ALL", report["overall"])]
+    for name, s in rows:
+        print(f"{name:<18} {s['count']:>7} {s['throughput']:>9.1f} {s['error_rate'] * 100:>6.1f}% "
+              f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['max_ms']:>9.2f}")
+    for name, error in report["first_errors"].items():
+        print(f"  first {name} error: {error}")
+
+async def run(args) -> int:
+    """Connect to servers, replay the trace and report. Returns process exit code."""
+    requests = load_trace(args.trace) * args.loops
+    if args.limit:
+        requests = requests[:args.limit]
+    if not requests:
+        print("ERROR: Trace contains no call_tool requests")
+        return 1
+
+    async with AsyncExitStack() as stack:
+        if args.in_process:
+            servers = [InProcessServer()]
+        else:
+            servers = await spawn_servers(stack, args.server_command, args.servers, args.server_log)
+        if args.in_process and args.concurrency > servers[0].max_concurrency:
+            print(f"WARNING: concurrency {args.concurrency} exceeds MCP_TOOL_WORKERS={servers[0].max_concurrency}; "
+                  f"extra requests queue inside the server and count as latency")
+        mode = "in-process" if args.in_process else f"{len(servers)} spawned server(s)"
+        print(f"Replaying {len(requests)} requests against {mode}, concurrency {args.concurrency}, "
+              f"rate {args.rate or 'unlimited'}/s")
+        result = await replay(servers, requests, args.concurrency, args.rate, args.timeout)
+
+    report = summarize(result["samples"], result["elapsed"])
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote report to {args.output}")
+    return 0
+
+def main() -> int:
+    """Parse arguments and run the replay."""
+    parser = argparse.ArgumentParser(description="Replay a JSONL trace of MCP call_tool requests against the server")
+    parser.add_argument("trace", help="JSONL file of {\"tool\", \"arguments\"} lines (e.g. written via MCP_CALL_LOG)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--rate", type=float, default=0, help="Requests per second (0 = as fast as possible)")
+    parser.add_argument("--servers", type=int, default=1, help="Server processes to spawn; workers are spread over them")
+    parser.add_argument("--server-command", default=f"{shlex.quote(sys.executable)} mcp_postgres_server.py",
+                        help="Command that starts a server speaking MCP over stdio")
+    parser.add_argument("--server-log", default=os.devnull, help="File receiving the spawned servers' stderr")
+    parser.add_argument("--in-process", action="store_true", help="Call the handler directly instead of spawning")
+    parser.add_argument("--loops", type=int, default=1, help="Times to repeat the trace")
+    parser.add_argument("--limit", type=int, default=0, help="Max requests to send (0 = all)")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default="", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    print("#===============[ start_of_main_process ]==========")
+    exit_code = asyncio.run(run(args))
+    print("#===============[ process completed ]==========")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# EXPLANATION
+# Purpose: Load generator replaying JSONL traces of MCP call_tool requests against mcp_postgres_server
+# Main functions: load_trace -> reads MCP_CALL_LOG-style JSONL, spawn_servers -> stdio client sessions,
+#                 replay -> concurrency workers with optional open-loop rate, summarize -> per-tool
+#                 throughput, p50/p95/p99 latency and error rate
+# Notable vars: --servers/--server-command -> spawned server processes, --in-process -> direct handler calls
@@ -0,0 +1,215 @@
+#################################
+#         bench_suite.py
+#################################
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Any
+import config
+import db_tools
+import mcp_postgres_server
+print("----------------- argparse, asyncio, json imports completed or connected, ---------")
+print("----------------- os, platform, statistics, time imports completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+print("----------------- mcp_postgres_server import completed or connected, ---------")
+
+# Throwaway tables created and dropped by the suite
+BENCH_TABLE = "mcp_bench_rows"
+INSERT_TABLE = "mcp_bench_inserts"
+
+print("="*40)
+# Measurement Helpers
+print("="*40)
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Time fn repeatedly after warmup runs. Returns median/min/max seconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times), "max": max(times)}
+
+def latency_result(name: str, timing: Dict[str, float], **extra) -> Dict[str, Any]:
+    """Build a lower-is-better result entry from a timing dict."""
+    return {"name": name, "value": timing["median"], "unit": "s", "better": "lower",
+            "min": timing["min"], "max": timing["max"], **extra}
+
+def throughput_result(name: str, ops: int, seconds: float, **extra) -> Dict[str, Any]:
+    """Build a higher-is-better result entry in operations per second."""
+    return {"name": name, "value": ops / seconds, "unit": "ops/s", "better": "higher", **extra}
+
+print("="*40)
+# Benchmarks
+print("="*40)
+
+def setup_tables(max_rows: int) -> None:
+    """Create the throwaway tables used by the suite."""
+    db_tools.execute_query(f"DROP TABLE IF EXISTS {BENCH_TABLE}, {INSERT_TABLE}")
+    db_tools.execute_query(f"""
+        CREATE TABLE {BENCH_TABLE} AS
+        SELECT g AS id, md5(g::text) AS name, (g %% 1000)::int AS value, now() AS created_at
+        FROM generate_series(1, %s) g
+    """, (max_rows,))
+    db_tools.execute_query(f"ALTER TABLE {BENCH_TABLE} ADD PRIMARY KEY (id)")
+    db_tools.execute_query(f"ANALYZE {BENCH_TABLE}")
+    db_tools.execute_query(f"CREATE TABLE {INSERT_TABLE} (id SERIAL PRIMARY KEY, name TEXT, value INTEGER)")
+
+def teardown_tables() -> None:
+    """Drop the throwaway tables."""
+    db_tools.execute_query(f"DROP TABLE IF EXISTS {BENCH_TABLE}, {INSERT_TABLE}")
+
+def bench_execute_query(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """execute_query latency at several result sizes."""
+    results = []
+    for size in sizes:
+        timing = measure(lambda: db_tools.execute_query(f"SELECT * FROM {BENCH_TABLE} LIMIT %s", (size,)), repeat)
+        results.append(latency_result(f"execute_query.rows_{size}", timing, rows=size))
+    return results
+
+def bench_inserts(count: int, repeat: int) -> List[Dict[str, Any]]:
+    """count single-row insert_record calls vs one insert_records batch."""
+    records = [{"name": f"bench_{i}", "value": i} for i in range(count)]
+    single = measure(lambda: [db_tools.insert_record(INSERT_TABLE, r) for r in records], repeat)
+    bulk = measure(lambda: db_tools.insert_records(INSERT_TABLE, records), repeat)
+    return [
+        latency_result(f"insert.single_x{count}", single, rows=count),
+        latency_result(f"insert.bulk_x{count}", bulk, rows=count),
+    ]
+
+def bench_introspection(repeat: int) -> List[Dict[str, Any]]:
+    """list_tables and describe_table latency."""
+    return [
+        latency_result("list_tables", measure(db_tools.list_tables, repeat)),
+        latency_result("describe_table", measure(lambda: db_tools.describe_table(BENCH_TABLE), repeat)),
+    ]
+
+def bench_json_encoding(size: int, repeat: int) -> List[Dict[str, Any]]:
+    """json.dumps of a result set the way call_tool encodes db_query output."""
+    rows = db_tools.execute_query(f"SELECT * FROM {BENCH_TABLE} LIMIT %s", (size,))
+    timing = measure(lambda: json.dumps(rows, indent=2, default=str), repeat)
+    return [latency_result(f"json_encode.rows_{size}", timing, rows=size)]
+
+def bench_call_tool(concurrency_levels: List[int], calls: int) -> List[Dict[str, Any]]:
+    """End-to-end call_tool throughput with 1..N concurrent callers on one event loop."""
+    results = []
+    arguments = {"query": f"SELECT * FROM {BENCH_TABLE} LIMIT 10"}
+
+    async def worker(n: int):
+        for _ in range(n):
+            await mcp_postgres_server.call_tool("db_query", arguments)
+
+    for concurrency in concurrency_levels:
+        per_worker = max(1, calls // concurrency)
+
+        async def run_all():
+            await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+
+        start = time.perf_counter()
+        asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+        results.append(throughput_result(f"call_tool.db_query.c{concurrency}", per_worker * concurrency,
+                                         elapsed, concurrency=concurrency))
+    return results
+
+print("="*40)
+# Baseline Comparison
+print("="*40)
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare results with a baseline run. Returns list of regression messages."""
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        previous = base.get(result["name"])
+        if previous is None or not previous["value"]:
+            continue
+        change = (result["value"] - previous["value"]) / previous["value"]
+        worse = change > tolerance if result["better"] == "lower" else change < -tolerance
+        marker = "REGRESSION" if worse else "ok"
+        print(f"  {result['name']:<32} {previous['value']:>12.5f} -> {result['value']:>12.5f} {result['unit']:<6} ({change:+.1%}) {marker}")
+        if worse:
+            regressions.append(f"{result['name']}: {change:+.1%} vs baseline")
+    return regressions
+
+def main() -> int:
+    """Run the suite, write results and compare with the baseline. Returns process exit code."""
+    parser = argparse.ArgumentParser(description="Benchmark db_tools and the MCP call_tool path")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="Stored baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before failing")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per latency case")
+    parser.add_argument("--sizes", default="10,1000,10000,100000", help="Result sizes for execute_query")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="call_tool concurrency levels")
+    parser.add_argument("--calls", type=int, default=200, help="call_tool calls per concurrency level")
+    parser.add_argument("--inserts", type=int, default=500, help="Rows for single vs bulk insert")
+    args = parser.parse_args()
+
+    print("#===============[ start_of_main_process ]==========")
+    if not config.validate_config() or not db_tools.test_connection():
+        print("ERROR: Database not reachable; point DB_* at a throwaway local PostgreSQL")
+        return 1
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+
+    setup_tables(max(sizes))
+    try:
+        results: List[Dict[str, Any]] = []
+        results += bench_execute_query(sizes, args.repeat)
+        results += bench_inserts(args.inserts, max(1, args.repeat // 2))
+        results += bench_introspection(args.repeat)
+        results += bench_json_encoding(min(10000, max(sizes)), args.repeat)
+        results += bench_call_tool(concurrency_levels, args.calls)
+    finally:
+        teardown_tables()
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nComparing with baseline {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nERROR: {len(regressions)} regressions")
+            exit_code = 1
+    else:
+        for result in results:
+            print(f"  {result['name']:<32} {result['value']:>12.5f} {result['unit']}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    print("#===============[ process completed ]==========")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# EXPLANATION
+# Purpose: Reproducible benchmark suite for db_tools and the MCP call_tool path with baseline comparison
+# Main functions: bench_* -> execute_query sizes, single vs bulk inserts, introspection, JSON encoding,
+#                 call_tool throughput at 1..N concurrency; compare -> flags regressions past tolerance
+# Notable vars: BENCH_TABLE, INSERT_TABLE -> throwaway tables, --output/--baseline -> JSON result files
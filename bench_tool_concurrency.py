@@ -0,0 +1,89 @@
+#################################
+#         bench_tool_concurrency.py
+#################################
+
+import sys
+import time
+from langchain_core.messages import AIMessage
+import config
+import db_tools
+import langgraph_agent
+print("----------------- time import completed or connected, ---------")
+print("----------------- langchain_core import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+print("----------------- langgraph_agent import completed or connected, ---------")
+
+print("#===============[ start_of_main_process ]==========")
+
+# Number of tool calls in the simulated agent step and per-call SQL latency in seconds
+NUM_CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+SQL_SLEEP = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+ROUNDS = 3
+
+print("="*40)
+# Configuration Validation
+print("="*40)
+
+if not config.validate_config():
+    print("ERROR: Configuration validation failed")
+    exit(1)
+
+if not db_tools.test_connection():
+    print("ERROR: Connection test failed")
+    exit(1)
+
+print("="*40)
+# Build Simulated Agent Step
+print("="*40)
+
+# One AI message carrying several independent read-only tool calls, as the LLM would emit
+tool_calls = [
+    {"name": "db_query", "args": {"query": f"SELECT pg_sleep({SQL_SLEEP}), {i} AS call"}, "id": f"call_{i}"}
+    for i in range(NUM_CALLS)
+]
+tool_calls.append({"name": "db_list_tables", "args": {}, "id": "call_tables"})
+state = {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+print(f"Simulated step: {len(tool_calls)} tool calls, {SQL_SLEEP}s SQL latency each")
+
+print("="*40)
+# Serial Execution
+print("="*40)
+
+serial_times = []
+for _ in range(ROUNDS):
+    start = time.perf_counter()
+    serial_results = [langgraph_agent.run_tool_call(call) for call in tool_calls]
+    serial_times.append(time.perf_counter() - start)
+serial_best = min(serial_times)
+print(f"Serial step latency (best of {ROUNDS}): {serial_best * 1000:.1f} ms")
+
+print("="*40)
+# Concurrent Execution
+print("="*40)
+
+concurrent_times = []
+for _ in range(ROUNDS):
+    start = time.perf_counter()
+    concurrent_results = langgraph_agent.tools_node(state)["messages"]
+    concurrent_times.append(time.perf_counter() - start)
+concurrent_best = min(concurrent_times)
+print(f"Concurrent step latency (best of {ROUNDS}, {config.TOOL_MAX_WORKERS} workers): {concurrent_best * 1000:.1f} ms")
+
+print("="*40)
+# Result Ordering Check
+print("="*40)
+
+ordered = [m.tool_call_id for m in concurrent_results] == [c["id"] for c in tool_calls]
+print(f"Results assembled in call order: {ordered}")
+if not ordered:
+    print("ERROR: Concurrent results out of order")
+    exit(1)
+
+print(f"\nSpeedup: {serial_best / concurrent_best:.2f}x")
+print("#===============[ process completed ]==========")
+
+# EXPLANATION
+# Purpose: Benchmark agent step latency for serial vs concurrent read-only tool execution
+# Main functions: Times run_tool_call in a loop against tools_node on the same simulated tool calls
+# Notable vars: NUM_CALLS -> tool calls per step, SQL_SLEEP -> simulated per-query latency via pg_sleep
@@ -0,0 +1,233 @@
+#################################
+#         change_feed.py
+#################################
+
+import json
+import select
+import threading
+import time
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from collections import deque
+from typing import Callable, Dict, List, Any, Optional
+import config
+import db_tools
+print("----------------- json, select, threading, time imports completed or connected, ---------")
+print("----------------- psycopg2 import completed or connected, ---------")
+print("----------------- collections, typing imports completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+
+print("="*40)
+# Triggers
+print("="*40)
+
+# One shared trigger function; every watched table gets an AFTER ROW trigger named TRIGGER_NAME
+# that publishes {"table", "op", "row"} on the channel passed as trigger argument
+TRIGGER_NAME = "mcp_watch"
+
+_TRIGGER_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION mcp_notify_change() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        row_data json := row_to_json(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+        payload text := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_data)::text;
+    BEGIN
+        -- NOTIFY payloads are capped at 8000 bytes; large rows are sent as their id only
+        IF octet_length(payload) > 7900 THEN
+            payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'truncated', true,
+                                         'id', row_data->'id')::text;
+        END IF;
+        PERFORM pg_notify(TG_ARGV[0], payload);
+        RETURN NULL;
+    END $$
+"""
+
+def _require_default_database() -> None:
+    # The LISTEN connection is opened on the default database profile only
+    if db_tools.resolve_database() != config.DEFAULT_DATABASE:
+        raise ValueError(f"Change feeds are only available on the '{config.DEFAULT_DATABASE}' database")
+
+def watch(table: str) -> Dict[str, Any]:
+    """Install change trigger on table and start the listener. Returns watch info with resource URI."""
+    print("#===============[ watch ]==========")
+    _require_default_database()
+    if table not in db_tools.list_tables():
+        raise ValueError(f"Unknown table '{table}'")
+    with db_tools.get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_TRIGGER_FUNCTION_SQL)
+            cur.execute(sql.SQL("DROP TRIGGER IF EXISTS {} ON {}").format(
+                sql.Identifier(TRIGGER_NAME), sql.Identifier(table)))
+            cur.execute(sql.SQL(
+                "CREATE TRIGGER {} AFTER INSERT OR UPDATE OR DELETE ON {} "
+                "FOR EACH ROW EXECUTE FUNCTION mcp_notify_change({})"
+            ).format(sql.Identifier(TRIGGER_NAME), sql.Identifier(table), sql.Literal(config.CHANGE_FEED_CHANNEL)))
+    start_listener()
+    print(f"----------------- watching '{table}' on channel {config.CHANGE_FEED_CHANNEL}, ---------")
+    return {
+        "table": table,
+        "channel": config.CHANGE_FEED_CHANNEL,
+        "resource": resource_uri(table),
+        "last_seq": last_seq(),
+    }
+
+def unwatch(table: str) -> bool:
+    """Remove change trigger from table. Returns True if a trigger was dropped."""
+    print("#===============[ unwatch ]==========")
+    _require_default_database()
+    was_watched = table in watched_tables()
+    if was_watched:
+        with db_tools.get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("DROP TRIGGER IF EXISTS {} ON {}").format(
+                    sql.Identifier(TRIGGER_NAME), sql.Identifier(table)))
+    print(f"----------------- unwatched '{table}': {was_watched}, ---------")
+    return was_watched
+
+def watched_tables() -> List[str]:
+    """Get tables that currently carry the change trigger."""
+    rows = db_tools.execute_query("""
+        SELECT c.relname AS table_name
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE t.tgname = %s AND n.nspname = 'public'
+        ORDER BY c.relname
+    """, (TRIGGER_NAME,))
+    return [row["table_name"] for row in rows]
+
+def resource_uri(table: str) -> str:
+    """MCP resource URI of a table's change stream."""
+    return f"changes://{table}"
+
+print("="*40)
+# Event Buffer
+print("="*40)
+
+# Recent events per table with a process-wide sequence number; readers wait on the condition
+# instead of polling the database
+_events: Dict[str, deque] = {}
+_seq = 0
+_events_cond = threading.Condition()
+_subscribers: List[Callable[[str, Dict[str, Any]], None]] = []
+
+def add_subscriber(callback: Callable[[str, Dict[str, Any]], None]) -> None:
+    """Register callback(table, event) invoked on the listener thread for every change."""
+    _subscribers.append(callback)
+
+def last_seq() -> int:
+    """Sequence number of the newest event seen by this process."""
+    with _events_cond:
+        return _seq
+
+def _publish(payload: str) -> None:
+    # Buffers one notification and wakes waiting readers and subscribers
+    global _seq
+    try:
+        change = json.loads(payload)
+    except json.JSONDecodeError:
+        print(f"ERROR: Unparseable change notification: {payload[:200]}")
+        return
+    table = change.get("table", "")
+    with _events_cond:
+        _seq += 1
+        event = {"seq": _seq, "at": round(time.time(), 3), **change}
+        _events.setdefault(table, deque(maxlen=config.CHANGE_FEED_BUFFER)).append(event)
+        _events_cond.notify_all()
+    for callback in list(_subscribers):
+        try:
+            callback(table, event)
+        except Exception as e:
+            print(f"ERROR: Change subscriber failed: {e}")
+
+def events_since(table: str, after: int = 0, wait_seconds: float = 0, limit: int = 100) -> Dict[str, Any]:
+    """Get buffered events of table with seq > after, waiting up to wait_seconds for the first one."""
+    def pending() -> List[Dict[str, Any]]:
+        return [e for e in _events.get(table, ()) if e["seq"] > after]
+
+    with _events_cond:
+        events = pending()
+        if not events and wait_seconds > 0:
+            _events_cond.wait_for(lambda: bool(pending()), timeout=wait_seconds)
+            events = pending()
+        events = events[:limit]
+        return {
+            "table": table,
+            "events": events,
+            "last_seq": events[-1]["seq"] if events else max(after, 0),
+            "listening": _listener is not None and _listener.is_alive(),
+        }
+
+print("="*40)
+# Listener
+print("="*40)
+
+# Single dedicated autocommit connection outside the pool, held by a daemon thread for LISTEN
+_listener: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
+_listener_lock = threading.Lock()
+
+def _listen_loop() -> None:
+    # Waits on the socket for notifications; reconnects with backoff if the connection drops
+    backoff = 1.0
+    while not _listener_stop.is_set():
+        conn = None
+        try:
+            # Same keyword arguments as the default pool: credentials need no URL escaping
+            conn = psycopg2.connect(**config.DB_PROFILE_SETTINGS[config.DEFAULT_DATABASE]["connect"])
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(config.CHANGE_FEED_CHANNEL)))
+            print(f"----------------- listening on channel {config.CHANGE_FEED_CHANNEL}, ---------")
+            backoff = 1.0
+            while not _listener_stop.is_set():
+                if select.select([conn], [], [], 1.0)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        _publish(conn.notifies.pop(0).payload)
+        except psycopg2.Error as e:
+            print(f"ERROR: Change listener connection failed: {e}; retrying in {backoff:.0f}s")
+            _listener_stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if conn is not None:
+                conn.close()
+
+def start_listener() -> None:
+    """Start the LISTEN thread if it is not running."""
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener_stop.clear()
+            _listener = threading.Thread(target=_listen_loop, name="change-feed", daemon=True)
+            _listener.start()
+
+def resume_listener() -> bool:
+    """Start the LISTEN thread when tables still carry the change trigger (e.g. after a restart). Returns True if started."""
+    try:
+        tables = watched_tables()
+    except Exception as e:
+        print(f"ERROR: Checking watched tables failed: {e}")
+        return False
+    if not tables:
+        return False
+    start_listener()
+    print(f"----------------- change feed resumed for {', '.join(tables)}, ---------")
+    return True
+
+def stop_listener() -> None:
+    """Stop the LISTEN thread and close its connection."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener_stop.set()
+            _listener.join(timeout=5)
+            _listener = None
+
+# EXPLANATION
+# Purpose: Change feed for watched tables via triggers + LISTEN/NOTIFY, replacing polling with pushed events
+# Main functions: watch/unwatch -> install/drop the AFTER ROW trigger, events_since -> long-poll of buffered events,
+#                 add_subscriber -> callbacks on every change (MCP resource notifications), start_listener -> LISTEN thread,
+#                 resume_listener -> restarts it at server start for tables still carrying the trigger
+# Notable vars: _events -> per-table ring buffers with process-wide seq, TRIGGER_NAME -> trigger on watched tables
@@ -3,7 +3,7 @@
 #################################
 
 import os
-from typing import Final
+from typing import Any, Dict, Final
 from dotenv import load_dotenv
 print("----------------- os import completed or connected, ---------")
 print("----------------- typing import completed or connected, ---------")
@@ -24,9 +24,47 @@ DB_NAME: Final[str] = os.getenv("DB_NAME", "mcpdb")
 DB_USER: Final[str] = os.getenv("DB_USER", "mcpuser")
 DB_PASSWORD: Final[str] = os.getenv("DB_PASSWORD", "mcppassword")
 
+# Connection pool size per process: DB_POOL_MIN connections are opened when the pool is created,
+# more are opened on demand up to DB_POOL_MAX, and returned connections stay open (idle) up to
+# DB_POOL_MAX instead of being closed above DB_POOL_MIN as plain psycopg2 pools do
+DB_POOL_MIN: Final[int] = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX: Final[int] = int(os.getenv("DB_POOL_MAX", "10"))
+
 # Connection string
 DB_CONN_STRING: Final[str] = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Additional named databases served by the same process: DB_PROFILES=analytics,billing with
+# DB_ANALYTICS_URL=postgresql://... and optional DB_ANALYTICS_POOL_MAX per profile; the settings
+# above are the "default" profile, used when a tool call names no database
+DEFAULT_DATABASE: Final[str] = "default"
+DB_PROFILES: Final[str] = os.getenv("DB_PROFILES", "")
+
+# Seconds that table lists and column descriptions stay cached per database (0 = no cache); after the
+# startup warm-up the catalog is reloaded in the background every half TTL so lookups keep hitting
+SCHEMA_CACHE_TTL: Final[float] = float(os.getenv("SCHEMA_CACHE_TTL", "30"))
+
+def _load_db_profiles() -> Dict[str, Dict[str, Any]]:
+    # Connection kwargs and pool size per profile name
+    profiles = {
+        DEFAULT_DATABASE: {
+            "connect": {"host": DB_HOST, "port": DB_PORT, "dbname": DB_NAME, "user": DB_USER, "password": DB_PASSWORD},
+            "dsn": DB_CONN_STRING,
+            "pool_max": DB_POOL_MAX,
+        }
+    }
+    for name in (n.strip().lower() for n in DB_PROFILES.split(",")):
+        if not name or name == DEFAULT_DATABASE:
+            continue
+        url = os.getenv(f"DB_{name.upper()}_URL", "")
+        profiles[name] = {
+            "connect": {"dsn": url},
+            "dsn": url,
+            "pool_max": int(os.getenv(f"DB_{name.upper()}_POOL_MAX", str(DB_POOL_MAX))),
+        }
+    return profiles
+
+DB_PROFILE_SETTINGS: Final[Dict[str, Dict[str, Any]]] = _load_db_profiles()
+
 print("="*40)
 # Ollama Configuration
 print("="*40)
@@ -40,6 +78,118 @@ OLLAMA_LLM_MODEL: Final[str] = os.getenv("OLLAMA_LLM_MODEL", "gpt-oss:120b-cloud
 LLM_TEMPERATURE: Final[float] = float(os.getenv("LLM_TEMPERATURE", "0"))
 LLM_MAX_TOKENS: Final[int] = int(os.getenv("LLM_MAX_TOKENS", "1000"))
 
+# Chat model backend: "ollama" or "fake" (scripted model for load testing, see fake_llm.py)
+LLM_PROVIDER: Final[str] = os.getenv("LLM_PROVIDER", "ollama").lower()
+FAKE_LLM_LATENCY_MS: Final[float] = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+FAKE_LLM_SCRIPT: Final[str] = os.getenv("FAKE_LLM_SCRIPT", "")
+
+# Process-wide chat model admission: requests sent to the model at once, requests allowed to wait
+# for a slot (more are rejected), and max seconds one request waits in the queue
+LLM_MAX_IN_FLIGHT: Final[int] = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+LLM_MAX_QUEUED: Final[int] = int(os.getenv("LLM_MAX_QUEUED", "32"))
+LLM_QUEUE_TIMEOUT_SECONDS: Final[float] = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+print("="*40)
+# Agent Turn Budgets
+print("="*40)
+
+# Wall-clock deadline per agent turn and max chatbot->tools round trips before stopping early
+AGENT_TIMEOUT_SECONDS: Final[float] = float(os.getenv("AGENT_TIMEOUT_SECONDS", "120"))
+AGENT_MAX_TOOL_HOPS: Final[int] = int(os.getenv("AGENT_MAX_TOOL_HOPS", "8"))
+
+print("="*40)
+# Agent Tool Execution
+print("="*40)
+
+# Max worker threads used to run read-only tool calls of one agent step concurrently
+TOOL_MAX_WORKERS: Final[int] = int(os.getenv("TOOL_MAX_WORKERS", "4"))
+
+# Tool result rendering: rows shown to the LLM, per-cell text cap, full results kept by handle
+RESULT_MAX_ROWS: Final[int] = int(os.getenv("RESULT_MAX_ROWS", "50"))
+RESULT_MAX_CELL_CHARS: Final[int] = int(os.getenv("RESULT_MAX_CELL_CHARS", "200"))
+RESULT_STORE_SIZE: Final[int] = int(os.getenv("RESULT_STORE_SIZE", "20"))
+
+# Stored results are spilled to files under RESULT_SPILL_DIR (system temp dir if empty) and expire
+# RESULT_TTL_SECONDS after last access; MCP db_query returns results over MCP_INLINE_MAX_ROWS rows
+# as a results:// resource with a preview instead of inlining them
+RESULT_SPILL_DIR: Final[str] = os.getenv("RESULT_SPILL_DIR", "")
+RESULT_TTL_SECONDS: Final[float] = float(os.getenv("RESULT_TTL_SECONDS", "900"))
+MCP_INLINE_MAX_ROWS: Final[int] = int(os.getenv("MCP_INLINE_MAX_ROWS", "200"))
+
+print("="*40)
+# Export Configuration
+print("="*40)
+
+# Directory db_export writes into and rows per Parquet row group / fetch batch
+EXPORT_DIR: Final[str] = os.getenv("EXPORT_DIR", "exports")
+EXPORT_CHUNK_ROWS: Final[int] = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+
+print("="*40)
+# Metrics Configuration
+print("="*40)
+
+# Samples kept per histogram for percentiles, and port of the Prometheus /metrics endpoint (0 = off)
+METRICS_WINDOW: Final[int] = int(os.getenv("METRICS_WINDOW", "1024"))
+METRICS_PORT: Final[int] = int(os.getenv("METRICS_PORT", "0"))
+
+# Statements slower than SLOW_QUERY_MS are kept in the in-process slow-query log (last SLOW_QUERY_LOG_SIZE)
+SLOW_QUERY_MS: Final[float] = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_LOG_SIZE: Final[int] = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+
+# Distinct statements remembered (least recently run dropped first) for the index advisor
+WORKLOAD_LOG_SIZE: Final[int] = int(os.getenv("WORKLOAD_LOG_SIZE", "500"))
+
+print("="*40)
+# Change Feed Configuration
+print("="*40)
+
+# NOTIFY channel used by db_watch triggers and events kept in memory per watched table
+CHANGE_FEED_CHANNEL: Final[str] = os.getenv("CHANGE_FEED_CHANNEL", "mcp_changes")
+CHANGE_FEED_BUFFER: Final[int] = int(os.getenv("CHANGE_FEED_BUFFER", "1000"))
+
+print("="*40)
+# Materialized View Configuration
+print("="*40)
+
+# Seconds between checks for managed views whose refresh interval has passed (0 = no scheduled refreshes)
+MATVIEW_REFRESH_TICK: Final[float] = float(os.getenv("MATVIEW_REFRESH_TICK", "30"))
+
+print("="*40)
+# Warm-up Configuration
+print("="*40)
+
+# Background warm-up at server start: connections opened per database profile (capped at its pool max),
+# and whether to send the model a one-token request so the first agent turn does not load it
+WARMUP_ENABLED: Final[bool] = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_POOL_CONNECTIONS: Final[int] = int(os.getenv("WARMUP_POOL_CONNECTIONS", "4"))
+WARMUP_PRIME_LLM: Final[bool] = os.getenv("WARMUP_PRIME_LLM", "false").lower() in ("1", "true", "yes")
+
+print("="*40)
+# Tracing Configuration
+print("="*40)
+
+# Span recording (off by default), ring buffer size, and optional JSONL file for finished spans
+TRACING_ENABLED: Final[bool] = os.getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes")
+TRACE_BUFFER_SIZE: Final[int] = int(os.getenv("TRACE_BUFFER_SIZE", "2048"))
+TRACE_FILE: Final[str] = os.getenv("TRACE_FILE", "")
+
+# Optional JSONL file recording every MCP call_tool request, replayable with bench_mcp_replay.py
+MCP_CALL_LOG: Final[str] = os.getenv("MCP_CALL_LOG", "")
+
+# Worker threads running MCP tool calls off the event loop (calls beyond this wait for a worker)
+MCP_TOOL_WORKERS: Final[int] = int(os.getenv("MCP_TOOL_WORKERS", "16"))
+
+print("="*40)
+# Streamlit Configuration
+print("="*40)
+
+# Seconds that table lists, structures and previews stay cached in the Streamlit app
+STREAMLIT_CACHE_TTL: Final[int] = int(os.getenv("STREAMLIT_CACHE_TTL", "60"))
+
+# Agent turns running at once across all Streamlit sessions, and turns allowed to wait for a slot
+STREAMLIT_AGENT_MAX_IN_FLIGHT: Final[int] = int(os.getenv("STREAMLIT_AGENT_MAX_IN_FLIGHT", "4"))
+STREAMLIT_AGENT_MAX_QUEUED: Final[int] = int(os.getenv("STREAMLIT_AGENT_MAX_QUEUED", "8"))
+
 print("="*40)
 # validate_config
 print("="*40)
@@ -50,6 +200,10 @@ def validate_config() -> bool:
     if not all([DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD]):
         print("ERROR: Missing database configuration")
         return False
+    missing = [name for name, profile in DB_PROFILE_SETTINGS.items() if not profile["dsn"]]
+    if missing:
+        print(f"ERROR: Missing DB_<NAME>_URL for database profiles: {', '.join(missing)}")
+        return False
     
     # Check Ollama config
     if not all([OLLAMA_ENDPOINT, OLLAMA_LLM_MODEL]):
@@ -62,4 +216,5 @@ def validate_config() -> bool:
 # EXPLANATION
 # Purpose: Centralized configuration management for MCP server
 # Main functions: validate_config -> validates all config params are present
-# Notable vars: DB_CONN_STRING -> full PostgreSQL connection string, OLLAMA_ENDPOINT -> remote Ollama URL
+# Notable vars: DB_CONN_STRING -> full PostgreSQL connection string, OLLAMA_ENDPOINT -> remote Ollama URL,
+#               DB_PROFILE_SETTINGS -> connection kwargs and pool size per named database
@@ -2,66 +2,340 @@
 #         db_tools.py
 #################################
 
+import hashlib
+import json
+import os
+import random
+import time
+import threading
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, List, Any, Optional
-from contextlib import contextmanager
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from typing import Dict, List, Any, Optional, Tuple
+from contextlib import ExitStack, contextmanager
+from collections import OrderedDict, deque
+from contextvars import ContextVar
 import config
+import metrics
+import tracing
+print("----------------- hashlib, json, os, random, time, threading imports completed or connected, ---------")
 print("----------------- psycopg2 import completed or connected, ---------")
 print("----------------- typing import completed or connected, ---------")
-print("----------------- contextlib import completed or connected, ---------")
+print("----------------- contextlib, collections import completed or connected, ---------")
+print("----------------- contextvars import completed or connected, ---------")
 print("----------------- config import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+print("----------------- tracing import completed or connected, ---------")
+
+print("="*40)
+# DB Time Accounting
+print("="*40)
+
+# Callers that want DB time accounted (e.g. an agent turn) set a list here; every connection
+# use appends its elapsed seconds, including connection setup
+db_time_sink: ContextVar[Optional[List[float]]] = ContextVar("db_time_sink", default=None)
+
+# Name of the tool whose handler is running (MCP call or agent tool call), for the slow-query log
+current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+print("="*40)
+# Transaction Limits
+print("="*40)
+
+# Set by callers for everything they run in the current context and applied by get_db_connection
+# at checkout: transaction_read_only makes the database reject writes (SET TRANSACTION READ ONLY),
+# statement_deadline (a time.monotonic() value, e.g. an agent turn deadline) caps every statement
+# with SET LOCAL statement_timeout of the time left. Autocommit checkouts (statements that cannot
+# run in a transaction block, e.g. CREATE INDEX CONCURRENTLY) get the same limits at session level
+transaction_read_only: ContextVar[bool] = ContextVar("transaction_read_only", default=False)
+statement_deadline: ContextVar[Optional[float]] = ContextVar("statement_deadline", default=None)
+
+def _apply_transaction_limits(conn, session: bool = False) -> bool:
+    # Per-transaction settings; commit or rollback at the end of the checkout resets them. With
+    # session=True they are set for the session instead and _reset_session_limits undoes them.
+    # Returns True if anything was set
+    settings = []
+    if transaction_read_only.get():
+        settings.append("SET default_transaction_read_only = on" if session else "SET TRANSACTION READ ONLY")
+    deadline = statement_deadline.get()
+    if deadline is not None:
+        # A passed deadline still gets 1 ms (0 would mean no timeout), so statements fail at once
+        remaining_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+        settings.append(f"SET {'' if session else 'LOCAL '}statement_timeout = {remaining_ms}")
+    if settings:
+        with conn.cursor() as cur:
+            cur.execute("; ".join(settings))
+    return bool(settings)
+
+def _reset_session_limits(conn) -> bool:
+    # Undoes session-level limits before the connection goes back to the pool. Returns False if it failed
+    try:
+        with conn.cursor() as cur:
+            cur.execute("RESET statement_timeout; RESET default_transaction_read_only")
+        return True
+    except psycopg2.Error:
+        return False
+
+print("="*40)
+# Database Routing
+print("="*40)
+
+# Profile that connections are taken from; set per tool call (use_database) and inherited by
+# everything the call runs, including agent tool calls on worker threads (copy_context)
+current_database: ContextVar[Optional[str]] = ContextVar("current_database", default=None)
+
+def database_names() -> List[str]:
+    """Get configured database profile names, default first."""
+    return list(config.DB_PROFILE_SETTINGS)
+
+def resolve_database(database: Optional[str] = None) -> str:
+    """Get the profile name to use: explicit name, else the one set for this context, else default."""
+    name = (database or current_database.get() or config.DEFAULT_DATABASE).lower()
+    if name not in config.DB_PROFILE_SETTINGS:
+        raise ValueError(f"Unknown database '{name}', configured: {', '.join(database_names())}")
+    return name
+
+@contextmanager
+def use_database(database: Optional[str]):
+    """Route database access in this context to the named profile. None keeps the current one."""
+    token = current_database.set(resolve_database(database))
+    try:
+        yield
+    finally:
+        current_database.reset(token)
+
+print("="*40)
+# Slow Query Log
+print("="*40)
+
+# Most recent statements slower than SLOW_QUERY_MS, newest last
+_slow_queries: deque = deque(maxlen=config.SLOW_QUERY_LOG_SIZE)
+_slow_lock = threading.Lock()
+
+def _params_fingerprint(params: Optional[tuple]) -> Optional[str]:
+    # Hash of the bound values, so repeated calls can be grouped without logging the values
+    if not params:
+        return None
+    return hashlib.sha1(json.dumps(params, default=str).encode("utf-8")).hexdigest()[:12]
+
+def _record_slow_query(query: str, params: Optional[tuple], seconds: float) -> None:
+    # Adds the statement to the slow-query log if it crossed the threshold
+    if seconds * 1000 < config.SLOW_QUERY_MS:
+        return
+    entry = {
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "duration_ms": round(seconds * 1000, 1),
+        "tool": current_tool.get(),
+        "database": resolve_database(),
+        "sql": query.strip()[:1000],
+        "sql_fingerprint": tracing.sql_fingerprint(query),
+        "params_fingerprint": _params_fingerprint(params),
+    }
+    with _slow_lock:
+        _slow_queries.append(entry)
+    metrics.increment("db_slow_queries_total")
+
+def slow_queries(limit: int = 50) -> List[Dict[str, Any]]:
+    """Get most recent slow statements, slowest first."""
+    with _slow_lock:
+        entries = list(_slow_queries)[-limit:]
+    return sorted(entries, key=lambda e: e["duration_ms"], reverse=True)
+
+print("="*40)
+# Workload Log
+print("="*40)
+
+# Distinct statement texts run through execute_query or query_arrow with their latest params, call
+# count and total time; read by the index advisor. Keyed by database and raw text so recording stays a dict lookup
+_workload: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_workload_lock = threading.Lock()
+
+def _record_statement(query: str, params: Optional[tuple], seconds: float) -> None:
+    # Adds one execution of the statement, evicting the least recently run past WORKLOAD_LOG_SIZE
+    key = (resolve_database(), query)
+    with _workload_lock:
+        entry = _workload.get(key)
+        if entry is None:
+            entry = {"database": key[0], "query": query, "params": params, "calls": 0, "total_seconds": 0.0}
+            _workload[key] = entry
+            while len(_workload) > config.WORKLOAD_LOG_SIZE:
+                _workload.popitem(last=False)
+        else:
+            _workload.move_to_end(key)
+        entry["params"] = params
+        entry["calls"] += 1
+        entry["total_seconds"] += seconds
+
+def workload_statements(limit: int = 100, database: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get recorded statements with most total time first, optionally of one database only."""
+    with _workload_lock:
+        entries = [dict(e) for e in _workload.values() if database is None or e["database"] == database]
+    return sorted(entries, key=lambda e: e["total_seconds"], reverse=True)[:limit]
+
+print("="*40)
+# Connection Pool
+print("="*40)
+
+# One pool per database profile, created on first use; the semaphores make callers wait for a
+# free connection instead of failing when all of a profile's connections are checked out
+class RetainingConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool that keeps returned connections open up to maxconn."""
+    # psycopg2 closes a returned connection once minconn connections are idle, so with
+    # minconn=DB_POOL_MIN every concurrent connection beyond it would be reopened per request.
+    # minconn only decides that retention after the initial connections are opened, so it is
+    # raised to maxconn once the pool exists (DB_POOL_MIN stays the number opened eagerly)
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.minconn = maxconn
+
+_pools: Dict[str, RetainingConnectionPool] = {}
+_pool_slots = {name: threading.BoundedSemaphore(profile["pool_max"])
+               for name, profile in config.DB_PROFILE_SETTINGS.items()}
+_pool_lock = threading.Lock()
+_pool_in_use = {name: 0 for name in config.DB_PROFILE_SETTINGS}
+
+def get_pool(database: Optional[str] = None) -> RetainingConnectionPool:
+    """Get or create the connection pool of a database profile. Returns RetainingConnectionPool."""
+    name = resolve_database(database)
+    pool = _pools.get(name)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                profile = config.DB_PROFILE_SETTINGS[name]
+                pool = RetainingConnectionPool(config.DB_POOL_MIN, profile["pool_max"], **profile["connect"])
+                _pools[name] = pool
+                print(f"----------------- connection pool '{name}' created ({config.DB_POOL_MIN}-{profile['pool_max']}), ---------")
+    return pool
+
+def prefill_pool(count: int, database: Optional[str] = None) -> int:
+    """Open up to count connections of a database and keep them idle in its pool. Returns connections opened."""
+    name = resolve_database(database)
+    count = min(count, config.DB_PROFILE_SETTINGS[name]["pool_max"])
+    with use_database(name), ExitStack() as stack:
+        # Held at once so the pool opens distinct connections instead of handing out the same one
+        for _ in range(count):
+            conn = stack.enter_context(get_db_connection())
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    print(f"----------------- connection pool '{name}' prefilled with {count} connections, ---------")
+    return count
+
+def close_pool(database: Optional[str] = None) -> None:
+    """Close pooled connections of one database, or of all when None. Next use creates a fresh pool."""
+    with _pool_lock:
+        for name in ([resolve_database(database)] if database else list(_pools)):
+            pool = _pools.pop(name, None)
+            if pool is not None:
+                pool.closeall()
+                print(f"----------------- connection pool '{name}' closed, ---------")
+
+def pool_stats() -> Dict[str, Any]:
+    """Get connection pool usage per database. Returns dict of name -> max, in_use and whether the pool exists."""
+    return {
+        name: {"created": name in _pools, "max": profile["pool_max"], "in_use": _pool_in_use[name]}
+        for name, profile in config.DB_PROFILE_SETTINGS.items()
+    }
 
 print("="*40)
 # get_db_connection
 print("="*40)
 
 @contextmanager
-def get_db_connection():
-    """Get database connection context manager. Yields connection with RealDictCursor."""
-    # Context manager for safe database connections with automatic cleanup
+def get_db_connection(autocommit: bool = False):
+    """Get database connection context manager. Yields pooled connection of the current database."""
+    # Context manager for safe database connections with automatic cleanup; autocommit=True runs
+    # every statement on its own, for statements that cannot run inside a transaction block
     conn = None
+    broken = False
+    session_limits = False
+    name = resolve_database()
+    start = time.perf_counter()
+    with tracing.span("db.pool_wait"):
+        _pool_slots[name].acquire()
     try:
-        conn = psycopg2.connect(
-            host=config.DB_HOST,
-            port=config.DB_PORT,
-            dbname=config.DB_NAME,
-            user=config.DB_USER,
-            password=config.DB_PASSWORD
-        )
-        print("----------------- database connection established, ---------")
+        with tracing.span("db.connect"):
+            pool = get_pool(name)
+            conn = pool.getconn()
+        with _pool_lock:
+            _pool_in_use[name] += 1
+        metrics.observe("db_pool_wait_seconds", time.perf_counter() - start)
+        if autocommit:
+            # Switched before any statement, while no transaction is open
+            conn.autocommit = True
+            session_limits = _apply_transaction_limits(conn, session=True)
+        else:
+            _apply_transaction_limits(conn)
         yield conn
         conn.commit()
     except Exception as e:
+        metrics.increment("db_errors_total")
         if conn:
-            conn.rollback()
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
         print(f"ERROR: Database connection failed: {e}")
         raise
     finally:
         if conn:
-            conn.close()
-            print("----------------- database connection closed, ---------")
+            if session_limits and not conn.closed:
+                broken = broken or not _reset_session_limits(conn)
+            if autocommit and not conn.closed:
+                conn.autocommit = False
+            # Dead connections are discarded so the pool reconnects on next checkout
+            pool.putconn(conn, close=broken or bool(conn.closed))
+            with _pool_lock:
+                _pool_in_use[name] -= 1
+        _pool_slots[name].release()
+        sink = db_time_sink.get()
+        if sink is not None:
+            sink.append(time.perf_counter() - start)
 
 print("="*40)
 # execute_query
 print("="*40)
 
+@contextmanager
+def _query_cursor(query: str, params: Optional[tuple] = None, cursor_factory=None):
+    # Runs one statement and yields (cursor, span) for fetching; shared by execute_query and query_arrow
+    # so both get the db.query span, db_query_seconds (fetch included), the slow-query and workload
+    # logs, and schema cache invalidation after DDL or a missing table
+    with tracing.span("db.query") as span, metrics.timer("db_query_seconds"), get_db_connection() as conn:
+        if tracing.is_enabled():
+            span.set_attribute("sql_fingerprint", tracing.sql_fingerprint(query))
+        with conn.cursor(cursor_factory=cursor_factory) as cur:
+            start = time.perf_counter()
+            try:
+                cur.execute(query, params or ())
+            except psycopg2.errors.UndefinedTable:
+                # The cached table list may predate a DROP or RENAME of another process
+                invalidate_schema_cache(resolve_database(), "tables")
+                raise
+            elapsed = time.perf_counter() - start
+            _record_slow_query(query, params, elapsed)
+            _record_statement(query, params, elapsed)
+            if query.lstrip().lower().startswith(_DDL_KEYWORDS):
+                invalidate_schema_cache(resolve_database())
+            yield cur, span
+
 def execute_query(query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
     """Execute SELECT query and return results as list of dicts. Params are optional query parameters."""
     # Executes a SELECT query with optional parameters, returns results
     print("#===============[ execute_query ]==========")
-    with get_db_connection() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query, params or ())
-            # Check if query returns results (SELECT, RETURNING, etc.)
-            if cur.description:
-                results = [dict(row) for row in cur.fetchall()]
-                print(f"----------------- query executed, returned {len(results)} rows, ---------")
-                return results
-            else:
-                # DDL or DML without RETURNING clause
-                print(f"----------------- query executed successfully (no results), ---------")
-                return []
+    with _query_cursor(query, params, RealDictCursor) as (cur, span):
+        # Check if query returns results (SELECT, RETURNING, etc.)
+        if cur.description:
+            results = [dict(row) for row in cur.fetchall()]
+            metrics.observe("db_query_rows", len(results))
+            span.set_attribute("rows", len(results))
+            print(f"----------------- query executed, returned {len(results)} rows, ---------")
+            return results
+        else:
+            # DDL or DML without RETURNING clause
+            print(f"----------------- query executed successfully (no results), ---------")
+            return []
 
 print("="*40)
 # insert_record
@@ -82,6 +356,88 @@ def insert_record(table: str, data: Dict[str, Any]) -> int:
             print(f"----------------- record inserted with ID {row_id}, ---------")
             return row_id
 
+print("="*40)
+# insert_records
+print("="*40)
+
+def insert_records(table: str, records: List[Dict[str, Any]], page_size: int = 1000) -> List[int]:
+    """Bulk insert records sharing the same keys in one transaction. Returns inserted row IDs."""
+    # Multi-row INSERT ... VALUES via execute_values, page_size rows per statement
+    print("#===============[ insert_records ]==========")
+    if not records:
+        return []
+    columns = list(records[0].keys())
+    query = sql.SQL("INSERT INTO {} ({}) VALUES %s RETURNING id").format(
+        sql.Identifier(table), sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    )
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            rows = execute_values(
+                cur, query.as_string(conn), [tuple(r[c] for c in columns) for r in records],
+                page_size=page_size, fetch=True
+            )
+            ids = [row[0] for row in rows]
+            print(f"----------------- {len(ids)} records inserted, ---------")
+            return ids
+
+print("="*40)
+# upsert_records
+print("="*40)
+
+def upsert_records(table: str, records: List[Dict[str, Any]], conflict_columns: List[str],
+                   update_columns: Optional[List[str]] = None, page_size: int = 1000) -> Dict[str, int]:
+    """Insert or update records in batches within one transaction. Returns inserted/updated/unchanged counts."""
+    # INSERT ... ON CONFLICT DO UPDATE via execute_values; RETURNING (xmax = 0) is true for freshly
+    # inserted rows. Updates that would not change the row are skipped (no dead tuple, counted as
+    # unchanged). update_columns defaults to every non-conflict column; an empty list means DO NOTHING
+    print("#===============[ upsert_records ]==========")
+    if not conflict_columns:
+        raise ValueError("conflict_columns must name the unique key to upsert on")
+    if not records:
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "total": 0}
+    columns = list(records[0].keys())
+    for record in records:
+        if record.keys() != records[0].keys():
+            raise ValueError("All records must have the same columns")
+    missing = [c for c in conflict_columns if c not in columns]
+    if missing:
+        raise ValueError(f"Conflict columns missing from records: {', '.join(missing)}")
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in conflict_columns]
+
+    # One statement cannot touch the same row twice, so the last record per key wins
+    deduped: Dict[tuple, tuple] = {}
+    for record in records:
+        deduped[tuple(record[c] for c in conflict_columns)] = tuple(record[c] for c in columns)
+
+    target = sql.Identifier(table)
+    if update_columns:
+        conflict_action = sql.SQL("DO UPDATE SET {} WHERE ({}) IS DISTINCT FROM ({})").format(
+            sql.SQL(", ").join(sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in update_columns),
+            sql.SQL(", ").join(sql.SQL("{}.{}").format(target, sql.Identifier(c)) for c in update_columns),
+            sql.SQL(", ").join(sql.SQL("EXCLUDED.{}").format(sql.Identifier(c)) for c in update_columns),
+        )
+    else:
+        conflict_action = sql.SQL("DO NOTHING")
+    query = sql.SQL("INSERT INTO {} ({}) VALUES %s ON CONFLICT ({}) {} RETURNING (xmax = 0) AS inserted").format(
+        target,
+        sql.SQL(", ").join(sql.Identifier(c) for c in columns),
+        sql.SQL(", ").join(sql.Identifier(c) for c in conflict_columns),
+        conflict_action,
+    )
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            rows = execute_values(cur, query.as_string(conn), list(deduped.values()), page_size=page_size, fetch=True)
+    inserted = sum(1 for row in rows if row[0])
+    counts = {
+        "inserted": inserted,
+        "updated": len(rows) - inserted,
+        "unchanged": len(deduped) - len(rows),
+        "total": len(deduped),
+    }
+    print(f"----------------- upserted {counts}, ---------")
+    return counts
+
 print("="*40)
 # update_record
 print("="*40)
@@ -117,6 +473,76 @@ def delete_record(table: str, record_id: int) -> bool:
             print(f"----------------- record deleted: {success}, ---------")
             return success
 
+print("="*40)
+# Schema Cache
+print("="*40)
+
+# Table lists and column descriptions per database for SCHEMA_CACHE_TTL seconds; DDL run through
+# execute_query drops that database's entries, other processes' DDL shows up after the TTL
+_schema_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_schema_lock = threading.Lock()
+_DDL_KEYWORDS = ("create", "alter", "drop", "comment")
+
+_LIST_TABLES_SQL = """
+    SELECT table_name 
+    FROM information_schema.tables 
+    WHERE table_schema = 'public'
+    ORDER BY table_name
+"""
+_DESCRIBE_TABLE_SQL = """
+    SELECT column_name, data_type, is_nullable
+    FROM information_schema.columns
+    WHERE table_name = %s
+    ORDER BY ordinal_position
+"""
+
+def _cached_schema(key: str, load):
+    # Returns a copy of the cached value for this database, loading it when missing or stale
+    if config.SCHEMA_CACHE_TTL <= 0:
+        return load()
+    cache_key = (resolve_database(), key)
+    with _schema_lock:
+        entry = _schema_cache.get(cache_key)
+    hit = entry is not None and time.monotonic() - entry[0] < config.SCHEMA_CACHE_TTL
+    metrics.increment("schema_cache_requests_total", result="hit" if hit else "miss")
+    if not hit:
+        entry = (time.monotonic(), load())
+        with _schema_lock:
+            _schema_cache[cache_key] = entry
+    return [dict(v) if isinstance(v, dict) else v for v in entry[1]]
+
+def invalidate_schema_cache(database: Optional[str] = None, key: Optional[str] = None) -> None:
+    """Drop cached table lists and descriptions of one database (only entry key if given), or of all when None."""
+    name = resolve_database(database) if database else None
+    with _schema_lock:
+        for cache_key in [k for k in _schema_cache if (name is None or k[0] == name) and key in (None, k[1])]:
+            del _schema_cache[cache_key]
+
+def warm_schema_cache(max_tables: int = 500) -> int:
+    """Reload table list and column descriptions of the current database into the cache. Returns table count."""
+    # Two statements however many tables: all column descriptions come from one query and are split
+    # per table; entries get a fresh timestamp and expire after SCHEMA_CACHE_TTL like any other
+    tables = [row["table_name"] for row in execute_query(_LIST_TABLES_SQL)]
+    if config.SCHEMA_CACHE_TTL <= 0:
+        return len(tables)
+    warmed = tables[:max_tables]
+    columns: Dict[str, List[Dict[str, Any]]] = {table: [] for table in warmed}
+    for row in execute_query("""
+        SELECT table_name, column_name, data_type, is_nullable
+        FROM information_schema.columns
+        WHERE table_name = ANY(%s)
+        ORDER BY table_name, ordinal_position
+    """, (warmed,)):
+        table = row.pop("table_name")
+        columns[table].append(row)
+    name = resolve_database()
+    loaded_at = time.monotonic()
+    with _schema_lock:
+        _schema_cache[(name, "tables")] = (loaded_at, tables)
+        for table, rows in columns.items():
+            _schema_cache[(name, f"columns:{table}")] = (loaded_at, rows)
+    return len(tables)
+
 print("="*40)
 # list_tables
 print("="*40)
@@ -125,14 +551,7 @@ def list_tables() -> List[str]:
     """List all tables in database. Returns list of table names."""
     # Retrieves all table names from the current database schema
     print("#===============[ list_tables ]==========")
-    query = """
-        SELECT table_name 
-        FROM information_schema.tables 
-        WHERE table_schema = 'public'
-        ORDER BY table_name
-    """
-    results = execute_query(query)
-    tables = [row['table_name'] for row in results]
+    tables = _cached_schema("tables", lambda: [row['table_name'] for row in execute_query(_LIST_TABLES_SQL)])
     print(f"----------------- found {len(tables)} tables, ---------")
     return tables
 
@@ -144,16 +563,480 @@ def describe_table(table: str) -> List[Dict[str, str]]:
     """Describe table structure. Returns list of column info dicts with name, type, nullable."""
     # Gets detailed column information for a specified table
     print("#===============[ describe_table ]==========")
+    results = _cached_schema(f"columns:{table}", lambda: execute_query(_DESCRIBE_TABLE_SQL, (table,)))
+    print(f"----------------- table '{table}' has {len(results)} columns, ---------")
+    return results
+
+print("="*40)
+# table_stats
+print("="*40)
+
+def table_stats(table: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get estimated row counts, sizes and activity stats from the catalog. Returns one dict per table."""
+    # Single catalog query instead of COUNT(*): reltuples (falling back to n_live_tup before the
+    # first ANALYZE), relation sizes and pg_stat_user_tables scan/tuple/maintenance counters
+    print("#===============[ table_stats ]==========")
     query = """
-        SELECT column_name, data_type, is_nullable
-        FROM information_schema.columns
-        WHERE table_name = %s
-        ORDER BY ordinal_position
+        SELECT c.relname AS table_name,
+               CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint ELSE s.n_live_tup END AS estimated_rows,
+               pg_total_relation_size(c.oid) AS total_bytes,
+               pg_relation_size(c.oid) AS table_bytes,
+               pg_indexes_size(c.oid) AS index_bytes,
+               pg_size_pretty(pg_total_relation_size(c.oid)) AS total_size,
+               s.seq_scan, s.idx_scan, s.n_live_tup, s.n_dead_tup,
+               s.last_analyze, s.last_autoanalyze, s.last_vacuum, s.last_autovacuum
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+          AND (%s::text IS NULL OR c.relname = %s)
+        ORDER BY pg_total_relation_size(c.oid) DESC
     """
-    results = execute_query(query, (table,))
-    print(f"----------------- table '{table}' has {len(results)} columns, ---------")
+    results = execute_query(query, (table, table))
+    print(f"----------------- stats for {len(results)} tables, ---------")
     return results
 
+print("="*40)
+# sample_table
+print("="*40)
+
+# SYSTEM samples whole pages, so rows come in clusters and the page fraction is padded more
+SAMPLE_METHODS = {"system": 3.0, "bernoulli": 1.5}
+SAMPLE_MAX_ROWS = 1000
+SAMPLE_MIN_PAGES = 20
+
+def _column_profile(cur, table: str, estimated_rows: int) -> Dict[str, Dict[str, Any]]:
+    # Per-column statistics gathered by ANALYZE; negative n_distinct is a fraction of the row count
+    cur.execute("""
+        SELECT attname, null_frac, n_distinct, avg_width, correlation,
+               most_common_vals::text::text[] AS most_common_vals, most_common_freqs
+        FROM pg_stats
+        WHERE schemaname = 'public' AND tablename = %s
+    """, (table,))
+    profile = {}
+    for row in cur.fetchall():
+        n_distinct = row["n_distinct"]
+        profile[row["attname"]] = {
+            "null_frac": round(row["null_frac"], 4),
+            "distinct_estimate": int(-n_distinct * estimated_rows) if n_distinct < 0 else int(n_distinct),
+            "avg_width": row["avg_width"],
+            "correlation": round(row["correlation"], 3) if row["correlation"] is not None else None,
+            "most_common": [
+                {"value": value, "freq": round(freq, 4)}
+                for value, freq in zip((row["most_common_vals"] or [])[:5], (row["most_common_freqs"] or [])[:5])
+            ],
+        }
+    return profile
+
+def sample_table(table: str, rows: int = 100, method: str = "system",
+                 seed: Optional[int] = None) -> Dict[str, Any]:
+    """Get a random sample of about rows rows via TABLESAMPLE plus per-column pg_stats profile."""
+    # The sample percentage comes from reltuples so only a fraction of the table is read; a seed
+    # makes the sample repeatable (REPEATABLE). Tables at or below the target are returned whole,
+    # and a short sample is retried with a larger percentage
+    print("#===============[ sample_table ]==========")
+    if method not in SAMPLE_METHODS:
+        raise ValueError(f"Unsupported sample method '{method}', use one of {', '.join(SAMPLE_METHODS)}")
+    if table not in list_tables():
+        raise ValueError(f"Unknown table '{table}'")
+    rows = max(1, min(int(rows), SAMPLE_MAX_ROWS))
+    start = time.perf_counter()
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT reltuples::bigint AS estimate, relpages FROM pg_class WHERE oid = %s::regclass",
+                        (sql.Identifier(table).as_string(conn),))
+            stats = cur.fetchone()
+            estimated_rows = max(int(stats["estimate"]), 0)
+
+            percent = None
+            if estimated_rows > rows:
+                percent = 100.0 * rows * SAMPLE_METHODS[method] / estimated_rows
+                if method == "system" and stats["relpages"] > 0:
+                    # Spread the sample over at least SAMPLE_MIN_PAGES pages
+                    percent = max(percent, 100.0 * SAMPLE_MIN_PAGES / stats["relpages"])
+                percent = min(100.0, percent)
+            while True:
+                if percent is None:
+                    query = sql.SQL("SELECT * FROM {} LIMIT %s").format(sql.Identifier(table))
+                    params: List[Any] = [rows]
+                else:
+                    repeatable = sql.SQL(" REPEATABLE (%s)") if seed is not None else sql.SQL("")
+                    query = sql.SQL("SELECT * FROM {} TABLESAMPLE {} (%s){} LIMIT %s").format(
+                        sql.Identifier(table), sql.SQL(method.upper()), repeatable)
+                    # The cap only guards against stale reltuples; a normal sample is fetched whole
+                    cap = max(rows * 10, int(2 * percent * estimated_rows / 100))
+                    params = [percent] + ([seed] if seed is not None else []) + [cap]
+                cur.execute(query, params)
+                sample = [dict(row) for row in cur.fetchall()]
+                if percent is None or len(sample) >= rows or percent >= 100.0:
+                    break
+                percent = min(100.0, percent * 4)
+            # The padded sample is thinned at random instead of keeping its first pages
+            if len(sample) > rows:
+                sample = [sample[i] for i in sorted(random.Random(seed).sample(range(len(sample)), rows))]
+
+            profile = _column_profile(cur, table, estimated_rows)
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    print(f"----------------- sampled {len(sample)} rows of '{table}' in {elapsed_ms} ms, ---------")
+    return {
+        "table": table,
+        "method": method if percent is not None else "full",
+        "percent": round(percent, 4) if percent is not None else None,
+        "seed": seed,
+        "estimated_rows": estimated_rows,
+        "row_count": len(sample),
+        "rows": sample,
+        "profile": profile,
+        "profile_note": None if profile else "No pg_stats for this table yet; run ANALYZE to get a column profile",
+        "elapsed_ms": elapsed_ms,
+    }
+
+print("="*40)
+# top_queries
+print("="*40)
+
+# Sort keys accepted by top_queries and the result column each one orders by
+TOP_QUERY_ORDERS = {
+    "total_time": "total_ms",
+    "mean_time": "mean_ms",
+    "calls": "calls",
+    "rows": "rows",
+    "blocks_read": "shared_blks_read",
+}
+
+def top_queries(order_by: str = "total_time", limit: int = 10) -> Dict[str, Any]:
+    """Get heaviest statements of this database from pg_stat_statements. Returns dict with availability and rows."""
+    # Reports available=False with a reason instead of failing when the extension is not
+    # installed or not preloaded; PostgreSQL 13 renamed total_time/mean_time to *_exec_time
+    print("#===============[ top_queries ]==========")
+    if order_by not in TOP_QUERY_ORDERS:
+        raise ValueError(f"Unsupported order '{order_by}', use one of {', '.join(TOP_QUERY_ORDERS)}")
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+            if cur.fetchone() is None:
+                reason = ("pg_stat_statements is not installed; add it to shared_preload_libraries "
+                          "and run CREATE EXTENSION pg_stat_statements")
+                print(f"----------------- {reason}, ---------")
+                return {"available": False, "reason": reason, "queries": []}
+            total_col, mean_col = (("total_exec_time", "mean_exec_time") if conn.server_version >= 130000
+                                   else ("total_time", "mean_time"))
+            query = sql.SQL("""
+                SELECT queryid, left(query, 1000) AS query, calls, rows,
+                       round({total}::numeric, 2)::float8 AS total_ms,
+                       round({mean}::numeric, 3)::float8 AS mean_ms,
+                       shared_blks_hit, shared_blks_read,
+                       round(100.0 * shared_blks_hit / nullif(shared_blks_hit + shared_blks_read, 0), 1)::float8
+                           AS hit_percent
+                FROM pg_stat_statements
+                WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+                ORDER BY {order} DESC NULLS LAST
+                LIMIT %s
+            """).format(
+                total=sql.Identifier(total_col),
+                mean=sql.Identifier(mean_col),
+                order=sql.Identifier(TOP_QUERY_ORDERS[order_by]),
+            )
+            try:
+                cur.execute(query, (limit,))
+            except psycopg2.Error as e:
+                # Installed but not preloaded, or not readable by this role
+                conn.rollback()
+                reason = str(e).strip()
+                print(f"----------------- pg_stat_statements unavailable: {reason}, ---------")
+                return {"available": False, "reason": reason, "queries": []}
+            results = [dict(row) for row in cur.fetchall()]
+    print(f"----------------- {len(results)} top statements by {order_by}, ---------")
+    return {"available": True, "order_by": order_by, "queries": results}
+
+print("="*40)
+# fetch_page
+print("="*40)
+
+# Filter operators accepted by fetch_page, mapped to their SQL form
+FILTER_OPERATORS = {
+    "=": "=", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">=",
+    "contains": "ILIKE", "is null": "IS NULL", "is not null": "IS NOT NULL",
+}
+
+def _build_filters(filters: List[Tuple[str, str, Any]], valid_columns: List[str]) -> Tuple[List[sql.Composable], List[Any]]:
+    # Turns (column, operator, value) filters into parameterized SQL conditions
+    conditions: List[sql.Composable] = []
+    params: List[Any] = []
+    for column, op, value in filters:
+        if column not in valid_columns:
+            raise ValueError(f"Unknown column '{column}'")
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+        if op in ("is null", "is not null"):
+            conditions.append(sql.SQL("{} {}").format(sql.Identifier(column), sql.SQL(FILTER_OPERATORS[op])))
+        elif op == "contains":
+            conditions.append(sql.SQL("{}::text ILIKE %s").format(sql.Identifier(column)))
+            params.append(f"%{value}%")
+        else:
+            conditions.append(sql.SQL("{} {} %s").format(sql.Identifier(column), sql.SQL(FILTER_OPERATORS[op])))
+            params.append(value)
+    return conditions, params
+
+def _keyset_condition(sort_column: Optional[str], key: sql.Composable, key_param: sql.Composable,
+                      descending: bool, cursor: Tuple[Any, Any]) -> Tuple[sql.Composable, List[Any]]:
+    # Rows strictly after the cursor in ORDER BY sort NULLS LAST, key order
+    sort_value, key_value = cursor
+    cmp = sql.SQL("<" if descending else ">")
+    if sort_column is None:
+        return sql.SQL("{} {} {}").format(key, cmp, key_param), [key_value]
+    col = sql.Identifier(sort_column)
+    if sort_value is None:
+        return sql.SQL("({} IS NULL AND {} {} {})").format(col, key, cmp, key_param), [key_value]
+    condition = sql.SQL("({col} {cmp} %s OR ({col} = %s AND {key} {cmp} {key_param}) OR {col} IS NULL)").format(
+        col=col, cmp=cmp, key=key, key_param=key_param
+    )
+    return condition, [sort_value, sort_value, key_value]
+
+def fetch_page(table: str, columns: Optional[List[str]] = None, sort_column: Optional[str] = None,
+               descending: bool = False, filters: Optional[List[Tuple[str, str, Any]]] = None,
+               cursor: Optional[Tuple[Any, Any]] = None, limit: int = 100,
+               as_arrow: bool = False) -> Dict[str, Any]:
+    """Fetch one keyset-paginated page of a table. Returns dict with rows (list of dicts, or Arrow table
+    when as_arrow is set), next_cursor and estimated_total."""
+    # Sorting, filtering, projection and pagination are pushed into parameterized SQL; the
+    # primary key (or ctid when there is none) breaks ties so pages never skip or repeat rows
+    print("#===============[ fetch_page ]==========")
+    filters = filters or []
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = %s
+                ORDER BY ordinal_position
+            """, (table,))
+            table_columns = [row["column_name"] for row in cur.fetchall()]
+            if not table_columns:
+                raise ValueError(f"Unknown table '{table}'")
+            for column in (columns or []) + ([sort_column] if sort_column else []):
+                if column not in table_columns:
+                    raise ValueError(f"Unknown column '{column}'")
+
+            cur.execute("""
+                SELECT a.attname FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = %s::regclass AND i.indisprimary
+            """, (sql.Identifier(table).as_string(conn),))
+            pk = [row["attname"] for row in cur.fetchall()]
+            # Single-column primary keys give stable keyset order; otherwise use the physical row id
+            key_name = pk[0] if len(pk) == 1 else "ctid"
+            key = sql.Identifier(key_name) if key_name != "ctid" else sql.SQL("ctid")
+            key_param = sql.SQL("%s") if key_name != "ctid" else sql.SQL("%s::tid")
+
+            selected = columns or table_columns
+            select_list = [sql.Identifier(c) for c in selected]
+            select_list.append(sql.SQL("{} AS __key").format(key))
+            if sort_column:
+                select_list.append(sql.SQL("{} AS __sort").format(sql.Identifier(sort_column)))
+
+            conditions, params = _build_filters(filters, table_columns)
+            count_conditions, count_params = list(conditions), list(params)
+            if cursor is not None:
+                condition, cursor_params = _keyset_condition(sort_column, key, key_param, descending, cursor)
+                conditions.append(condition)
+                params.extend(cursor_params)
+
+            direction = sql.SQL("DESC" if descending else "ASC")
+            order = [sql.SQL("{} {} NULLS LAST").format(sql.Identifier(sort_column), direction)] if sort_column else []
+            order.append(sql.SQL("{} {}").format(key, direction))
+            where = sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+            query = sql.SQL("SELECT {} FROM {}{} ORDER BY {} LIMIT %s").format(
+                sql.SQL(", ").join(select_list), sql.Identifier(table), where, sql.SQL(", ").join(order)
+            )
+            with conn.cursor() as page_cur:
+                page_cur.execute(query, params + [limit + 1])
+                raw = page_cur.fetchall()
+
+            estimated_total = _estimate_rows(cur, table, count_conditions, count_params)
+
+    # __key and __sort trail the selected columns and only feed the next cursor
+    has_more = len(raw) > limit
+    raw = raw[:limit]
+    next_cursor = None
+    if has_more and raw:
+        next_cursor = (raw[-1][len(selected) + 1] if sort_column else None, raw[-1][len(selected)])
+    if as_arrow:
+        rows = _columns_to_arrow(selected, list(zip(*raw))[:len(selected)] if raw else None)
+    else:
+        rows = [dict(zip(selected, row)) for row in raw]
+    print(f"----------------- page of '{table}' returned {len(raw)} rows, ---------")
+    return {"rows": rows, "next_cursor": next_cursor, "estimated_total": estimated_total}
+
+def _estimate_rows(cur, table: str, conditions: List[sql.Composable], params: List[Any]) -> int:
+    # Planner estimates instead of COUNT(*): reltuples for whole tables, EXPLAIN rows when filtered
+    if not conditions:
+        cur.execute("SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = %s::regclass",
+                    (sql.Identifier(table).as_string(cur),))
+        row = cur.fetchone()
+        if row and row["estimate"] >= 0:
+            return int(row["estimate"])
+    where = sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+    cur.execute(sql.SQL("EXPLAIN (FORMAT JSON) SELECT 1 FROM {}{}").format(sql.Identifier(table), where), params)
+    plan = cur.fetchone()["QUERY PLAN"]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+print("="*40)
+# query_arrow
+print("="*40)
+
+def _columns_to_arrow(names: List[str], columns: Optional[List[tuple]]):
+    # Builds an Arrow table column by column; columns Arrow cannot type (e.g. mixed JSON) fall back to text
+    import pyarrow as pa
+    if columns is None:
+        return pa.table({name: pa.array([], pa.null()) for name in names})
+    arrays = []
+    for values in columns:
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([
+                None if v is None else json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v)
+                for v in values
+            ], pa.string()))
+    return pa.Table.from_arrays(arrays, names=names)
+
+def query_arrow(query: str, params: Optional[tuple] = None, batch_size: int = 10000):
+    """Execute SELECT query and return results as pyarrow.Table. No per-row dicts are built."""
+    # Columnar fetch: rows come off a plain tuple cursor in batches and are transposed into
+    # per-column value lists, so wide results skip the dict-per-row path of execute_query
+    print("#===============[ query_arrow ]==========")
+    with _query_cursor(query, params) as (cur, span):
+        if not cur.description:
+            print(f"----------------- query executed successfully (no results), ---------")
+            return _columns_to_arrow([], None)
+        names = [d.name for d in cur.description]
+        columns: List[list] = [[] for _ in names]
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            for column, values in zip(columns, zip(*batch)):
+                column.extend(values)
+        num_rows = len(columns[0]) if columns else 0
+        metrics.observe("db_query_rows", num_rows)
+        span.set_attribute("rows", num_rows)
+    table = _columns_to_arrow(names, columns if num_rows else None)
+    print(f"----------------- query executed, returned {num_rows} rows as Arrow, ---------")
+    return table
+
+print("="*40)
+# export_query
+print("="*40)
+
+def _export_path(filename: str) -> str:
+    # Keeps exports inside EXPORT_DIR so callers cannot write elsewhere on the host
+    export_dir = os.path.abspath(config.EXPORT_DIR)
+    path = os.path.abspath(os.path.join(export_dir, filename))
+    if os.path.dirname(path) != export_dir:
+        raise ValueError(f"Export filename must be a plain file name inside {config.EXPORT_DIR}")
+    os.makedirs(export_dir, exist_ok=True)
+    return path
+
+# Parquet column types by PostgreSQL type OID; NUMERIC gets a decimal when its typmod fixes the
+# scale, every other type (text, json, uuid, interval, unconstrained NUMERIC, ...) is written as text
+_ARROW_TYPES_BY_OID = {
+    16: "bool_", 20: "int64", 21: "int16", 23: "int32", 26: "int64",
+    700: "float32", 701: "float64", 1082: "date32", 17: "binary",
+}
+_NUMERIC_OID = 1700
+_TIMESTAMP_OIDS = {1114: None, 1184: "UTC"}
+
+def _export_schema(description):
+    # One schema for the whole export, taken from the column types instead of inferred per batch,
+    # so an all-NULL first batch or varying NUMERIC scales cannot conflict with later batches
+    import pyarrow as pa
+    fields = []
+    for column in description:
+        if column.type_code in _ARROW_TYPES_BY_OID:
+            arrow_type = getattr(pa, _ARROW_TYPES_BY_OID[column.type_code])()
+        elif column.type_code in _TIMESTAMP_OIDS:
+            arrow_type = pa.timestamp("us", tz=_TIMESTAMP_OIDS[column.type_code])
+        elif (column.type_code == _NUMERIC_OID and column.scale is not None
+              and column.precision is not None and column.precision <= 38):
+            arrow_type = pa.decimal128(38, column.scale)
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+def _batch_to_arrow(schema, batch: List[tuple]):
+    # Converts fetched rows to a table of the export schema; text columns take str()/JSON of values
+    import pyarrow as pa
+    columns = list(zip(*batch)) if batch else [() for _ in schema]
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_string(field.type):
+            values = [None if v is None else json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v)
+                      for v in values]
+        elif pa.types.is_binary(field.type):
+            values = [None if v is None else bytes(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def export_query(filename: str, query: Optional[str] = None, table: Optional[str] = None,
+                 fmt: str = "csv", chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+    """Stream query or table results to a CSV or Parquet file. Returns dict with rows, bytes and path."""
+    # CSV streams straight from COPY ... TO STDOUT into the file; Parquet reads a server-side
+    # cursor in chunk_rows (default EXPORT_CHUNK_ROWS) batches and writes one row group per batch
+    # with a schema fixed from the column types. Memory stays constant in both cases and the file
+    # only appears once complete
+    print("#===============[ export_query ]==========")
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    if bool(query) == bool(table):
+        raise ValueError("Provide exactly one of query or table")
+    source = sql.SQL("SELECT * FROM {}").format(sql.Identifier(table)) if table else sql.SQL(query.strip().rstrip(";"))
+    path = _export_path(filename)
+    tmp_path = path + ".part"
+
+    try:
+        with get_db_connection() as conn:
+            # Exports only read; a read-only transaction rejects e.g. DELETE ... RETURNING sources
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION READ ONLY")
+            if fmt == "csv":
+                with conn.cursor() as cur, open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                    cur.copy_expert(sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER true)").format(source).as_string(conn), f)
+                    rows = cur.rowcount
+            else:
+                import pyarrow.parquet as pq
+                chunk_rows = chunk_rows or config.EXPORT_CHUNK_ROWS
+                rows = 0
+                writer = None
+                with conn.cursor(name="export_cursor") as cur:
+                    cur.itersize = chunk_rows
+                    cur.execute(source)
+                    try:
+                        while True:
+                            batch = cur.fetchmany(chunk_rows)
+                            if writer is None:
+                                # Named cursors describe their columns after the first fetch
+                                schema = _export_schema(cur.description)
+                                writer = pq.ParquetWriter(tmp_path, schema)
+                            elif not batch:
+                                break
+                            writer.write_table(_batch_to_arrow(schema, batch))
+                            rows += len(batch)
+                            if not batch:
+                                break
+                    finally:
+                        if writer is not None:
+                            writer.close()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    size = os.path.getsize(path)
+    print(f"----------------- exported {rows} rows ({size} bytes) to {path}, ---------")
+    return {"rows": rows, "bytes": size, "path": path, "format": fmt}
+
 print("="*40)
 # test_connection
 print("="*40)
@@ -176,7 +1059,24 @@ def test_connection() -> bool:
 
 # EXPLANATION
 # Purpose: PostgreSQL database operations for MCP server
-# Main functions: execute_query -> runs SELECT queries, insert_record -> adds new rows, 
+# Main functions: execute_query -> runs SELECT queries, insert_record -> adds new rows,
+#                 insert_records -> bulk multi-row insert, upsert_records -> batched ON CONFLICT upsert,
 #                 update_record -> modifies existing rows, delete_record -> removes rows,
-#                 list_tables -> gets all table names, describe_table -> shows table structure
-# Notable vars: get_db_connection -> context manager for safe DB access with auto-cleanup
+#                 list_tables -> gets all table names, describe_table -> shows table structure,
+#                 table_stats -> catalog-estimated row counts, sizes and scan stats without COUNT(*),
+#                 sample_table -> TABLESAMPLE SYSTEM/BERNOULLI sample with pg_stats column profile,
+#                 top_queries -> heaviest statements from pg_stat_statements (degrades if missing),
+#                 slow_queries -> in-process log of statements over SLOW_QUERY_MS,
+#                 workload_statements -> distinct statements run with calls and total time (index advisor),
+#                 fetch_page -> keyset-paginated, sorted, filtered table page with estimated total,
+#                 query_arrow -> columnar fetch into a pyarrow.Table for viewers and analytics,
+#                 export_query -> streams query/table to CSV (COPY TO STDOUT) or Parquet in chunks
+# Notable vars: get_db_connection -> context manager for pooled DB access with auto-cleanup,
+#               _pools -> RetainingConnectionPool per database profile (get_pool/prefill_pool/close_pool/pool_stats),
+#               current_database/use_database -> context-local database profile for all functions here,
+#               _schema_cache -> per-database list_tables/describe_table results for SCHEMA_CACHE_TTL
+#               (warm_schema_cache reloads a whole catalog in two statements),
+#               db_time_sink -> context-local list collecting DB time per caller,
+#               current_tool -> context-local name of the tool running SQL, for the slow-query log,
+#               transaction_read_only -> context-local flag running every transaction READ ONLY,
+#               statement_deadline -> context-local deadline applied as statement_timeout
@@ -0,0 +1,99 @@
+#################################
+#         fake_llm.py
+#################################
+
+import json
+import time
+import uuid
+from typing import Dict, List, Any, Optional
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+print("----------------- json, time, uuid imports completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- langchain_core imports completed or connected, ---------")
+
+print("="*40)
+# Scripts
+print("="*40)
+
+# A script is a list of steps, one per chatbot hop of a turn. A step either emits tool calls
+# ({"tool_calls": [{"name": ..., "args": {...}}]}) or a final answer ({"content": "..."}).
+# Answer text may use {user_input} and {tool_result} (latest tool output, truncated)
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {"tool_calls": [{"name": "db_list_tables", "args": {}}]},
+    {"content": "Answer to '{user_input}'. Latest tool result: {tool_result}"},
+]
+
+def load_script(path: str) -> List[Dict[str, Any]]:
+    """Load a step script from a JSON file. Returns list of steps, DEFAULT_SCRIPT if path is empty."""
+    if not path:
+        return DEFAULT_SCRIPT
+    with open(path, encoding="utf-8") as f:
+        script = json.load(f)
+    if not isinstance(script, list) or not script:
+        raise ValueError(f"Fake LLM script {path} must be a non-empty JSON list of steps")
+    return script
+
+print("="*40)
+# ScriptedChatModel
+print("="*40)
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic chat model replaying a step script with fixed artificial latency."""
+
+    script: List[Dict[str, Any]] = DEFAULT_SCRIPT
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools, **kwargs) -> "ScriptedChatModel":
+        """Accept tool binding like a real model. Returns self; tool names come from the script."""
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        # Step index is the number of assistant messages since the latest user message,
+        # so every turn replays the script from the start regardless of conversation length
+        step = 0
+        user_input = ""
+        tool_result = ""
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                user_input = str(message.content)
+                break
+            if isinstance(message, AIMessage):
+                step += 1
+            elif isinstance(message, ToolMessage) and not tool_result:
+                tool_result = str(message.content)[:200]
+        entry = self.script[min(step, len(self.script) - 1)]
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"call_{uuid.uuid4().hex[:8]}"}
+            for call in entry.get("tool_calls", [])
+        ]
+        content = "" if tool_calls else entry.get("content", "").format(user_input=user_input, tool_result=tool_result)
+        # Rough token counts (4 characters per token) so usage accounting has realistic shape
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = max(1, (len(content) + len(json.dumps(tool_calls))) // 4)
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+# EXPLANATION
+# Purpose: Deterministic scripted chat model for load testing the agent without a live Ollama model
+# Main functions: ScriptedChatModel -> replays tool calls/answers per chatbot hop with fixed latency,
+#                 load_script -> reads a JSON step script (FAKE_LLM_SCRIPT)
+# Notable vars: DEFAULT_SCRIPT -> list tables, then answer with the latest tool result
@@ -0,0 +1,263 @@
+#################################
+#         index_advisor.py
+#################################
+
+import re
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from typing import Dict, List, Any, Optional, Tuple
+import db_tools
+import tracing
+print("----------------- re import completed or connected, ---------")
+print("----------------- psycopg2 import completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+print("----------------- tracing import completed or connected, ---------")
+
+# Tables smaller than this are left to sequential scans; filters keeping more than
+# MAX_SELECTIVITY of the rows are not worth an index unless it also serves ORDER BY ... LIMIT
+MIN_TABLE_ROWS = 10000
+MAX_SELECTIVITY = 0.1
+MAX_INDEX_COLUMNS = 3
+
+print("="*40)
+# Plan Parsing
+print("="*40)
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+# column [)...] [::type] [)...] <operator>, optionally qualified by an alias
+_COMPARISON_RE = re.compile(r"(?:\b\w+\.)?\b([a-z_][a-z0-9_]*)\b\)*(?:::[a-z ]+?)?\)*\s*(<=|>=|<>|!=|=|<|>|~~|IS\b)",
+                            re.IGNORECASE)
+_SORT_KEY_RE = re.compile(r"^(?:\w+\.)?([a-z_][a-z0-9_]*)(?:\s+(?:ASC|DESC))?(?:\s+NULLS\s+(?:FIRST|LAST))?$", re.IGNORECASE)
+
+def _walk(plan: Dict[str, Any], ancestors: Tuple[Dict[str, Any], ...] = ()):
+    # Yields (node, ancestors) for every node of an EXPLAIN (FORMAT JSON) plan tree
+    yield plan, ancestors
+    for child in plan.get("Plans", []):
+        yield from _walk(child, ancestors + (plan,))
+
+def filter_columns(expression: str, table_columns: List[str]) -> Tuple[List[str], List[str]]:
+    """Split columns compared in a plan filter into equality and range columns of the table."""
+    # LIKE and <> are skipped: a default btree index cannot serve them
+    equality, ranges = [], []
+    for column, op in _COMPARISON_RE.findall(_STRING_LITERAL_RE.sub("?", expression)):
+        if column not in table_columns:
+            continue
+        if op == "=" and column not in equality:
+            equality.append(column)
+        elif op in ("<", ">", "<=", ">=", "IS") and column not in ranges:
+            ranges.append(column)
+    return equality, [c for c in ranges if c not in equality]
+
+def _limited_sort_keys(ancestors: Tuple[Dict[str, Any], ...]) -> List[str]:
+    # Sort keys of a Sort directly feeding a Limit (possibly through Gather Merge): an index in
+    # that order turns the sort into an ordered scan that stops after LIMIT rows
+    for i in range(len(ancestors) - 1, -1, -1):
+        node = ancestors[i]
+        if node["Node Type"] == "Sort":
+            above = [a["Node Type"] for a in ancestors[:i]]
+            if "Limit" in above and all(t in ("Limit", "Gather Merge") for t in above[above.index("Limit"):]):
+                keys = [_SORT_KEY_RE.match(k.strip()) for k in node.get("Sort Key", [])]
+                return [m.group(1) for m in keys] if all(keys) else []
+            return []
+        if node["Node Type"] not in ("Gather Merge", "Gather"):
+            return []
+    return []
+
+def _scan_rows(node: Dict[str, Any], ancestors: Tuple[Dict[str, Any], ...]) -> float:
+    # Parallel scan row estimates are per process; scale by workers plus the leader
+    if not node.get("Parallel Aware"):
+        return node["Plan Rows"]
+    for ancestor in reversed(ancestors):
+        if "Workers Planned" in ancestor:
+            return node["Plan Rows"] * (ancestor["Workers Planned"] + 1)
+    return node["Plan Rows"]
+
+print("="*40)
+# Catalog Helpers
+print("="*40)
+
+def _table_info(cur, table: str, cache: Dict[str, Any]) -> Dict[str, Any]:
+    # Columns, estimated rows and existing index column lists of a table, cached per run
+    if table not in cache:
+        cur.execute("""
+            SELECT c.reltuples::bigint AS rows,
+                   ARRAY(SELECT attname FROM pg_attribute
+                         WHERE attrelid = c.oid AND attnum > 0 AND NOT attisdropped) AS columns,
+                   ARRAY(SELECT array_to_string(ARRAY(
+                             SELECT a.attname FROM unnest(i.indkey) WITH ORDINALITY k(attnum, ord)
+                             JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                             ORDER BY k.ord), ',')
+                         FROM pg_index i WHERE i.indrelid = c.oid) AS indexes
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = %s AND n.nspname = 'public'
+        """, (table,))
+        row = cur.fetchone()
+        cache[table] = None if row is None else {
+            "rows": max(row["rows"], 0),
+            "columns": list(row["columns"]),
+            "indexes": [i.split(",") for i in row["indexes"] if i],
+        }
+    return cache[table]
+
+def _is_covered(columns: List[str], indexes: List[List[str]]) -> bool:
+    # An existing index whose leading columns are the candidate already serves it
+    return any(index[:len(columns)] == columns for index in indexes)
+
+def _hypopg_available(cur) -> bool:
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'hypopg'")
+    return cur.fetchone() is not None
+
+print("="*40)
+# Statement Sources
+print("="*40)
+
+def collect_statements(source: str = "workload", limit: int = 50) -> List[Dict[str, Any]]:
+    """Gather statements of the current database from the in-process workload log or pg_stat_statements."""
+    if source == "workload":
+        return [
+            {"query": e["query"], "params": e["params"] or (), "calls": e["calls"], "generic": False}
+            for e in db_tools.workload_statements(limit, db_tools.resolve_database())
+        ]
+    if source == "pg_stat_statements":
+        top = db_tools.top_queries("total_time", limit)
+        if not top["available"]:
+            raise ValueError(top["reason"])
+        # Normalized texts carry $n placeholders and are planned with EXPLAIN (GENERIC_PLAN)
+        return [
+            {"query": q["query"], "params": None, "calls": q["calls"], "generic": "$1" in q["query"]}
+            for q in top["queries"]
+        ]
+    raise ValueError(f"Unknown statement source '{source}', use workload or pg_stat_statements")
+
+def _explain(cur, statement: Dict[str, Any]) -> Dict[str, Any]:
+    # Plans the statement without executing it; returns the root plan node
+    options = "GENERIC_PLAN, FORMAT JSON" if statement["generic"] else "FORMAT JSON"
+    cur.execute(f"EXPLAIN ({options}) " + statement["query"], statement["params"])
+    return cur.fetchone()["QUERY PLAN"][0]["Plan"]
+
+print("="*40)
+# advise
+print("="*40)
+
+def _candidates_for_plan(cur, plan: Dict[str, Any], cache: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Proposes one index per sequential scan that filters a large table selectively or
+    # feeds an ORDER BY ... LIMIT; equality columns first, then sort keys or one range column
+    candidates = []
+    for node, ancestors in _walk(plan):
+        if node["Node Type"] != "Seq Scan" or "Relation Name" not in node:
+            continue
+        table = node["Relation Name"]
+        info = _table_info(cur, table, cache)
+        if info is None or info["rows"] < MIN_TABLE_ROWS:
+            continue
+        equality, ranges = filter_columns(node.get("Filter", ""), info["columns"])
+        sort_keys = [c for c in _limited_sort_keys(ancestors) if c in info["columns"]]
+        selectivity = min(1.0, _scan_rows(node, ancestors) / info["rows"]) if info["rows"] else 1.0
+        if sort_keys:
+            columns = equality + [c for c in sort_keys if c not in equality]
+            reason = f"Seq Scan + Sort for ORDER BY {', '.join(sort_keys)} LIMIT"
+        elif (equality or ranges) and selectivity <= MAX_SELECTIVITY:
+            columns = equality + ranges[:1]
+            reason = f"Seq Scan with filter {node['Filter']} keeping ~{selectivity:.2%} of {info['rows']:,} rows"
+        else:
+            continue
+        columns = columns[:MAX_INDEX_COLUMNS]
+        if _is_covered(columns, info["indexes"]):
+            continue
+        candidates.append({
+            "table": table,
+            "columns": columns,
+            "reason": reason,
+            "seq_scan_cost": node["Total Cost"],
+            "selectivity": round(selectivity, 5),
+        })
+    return candidates
+
+def _hypothetical_cost(cur, ddl: str, statement: Dict[str, Any]) -> Optional[float]:
+    # Plan cost of the statement with a hypothetical (never built) index in place
+    cur.execute("SELECT indexrelid FROM hypopg_create_index(%s)", (ddl,))
+    try:
+        return _explain(cur, statement)["Total Cost"]
+    finally:
+        cur.execute("SELECT hypopg_reset()")
+
+def advise(source: str = "workload", max_statements: int = 50) -> Dict[str, Any]:
+    """Propose indexes for recorded statements from their EXPLAIN plans. Nothing is created."""
+    # Each statement is planned inside a savepoint of one rolled-back transaction, so failing
+    # statements are skipped. With hypopg, candidates are re-planned against a hypothetical index
+    # and kept only if the plan gets cheaper; otherwise benefit is a seq-scan-cost heuristic
+    print("#===============[ index_advisor.advise ]==========")
+    statements = collect_statements(source, max_statements)
+    cache: Dict[str, Any] = {}
+    proposals: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+    analyzed, skipped = 0, []
+
+    with db_tools.get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SET LOCAL statement_timeout = '5s'")
+            hypopg = _hypopg_available(cur)
+            for statement in statements:
+                if not statement["query"].lstrip().lower().startswith(("select", "with", "update", "delete")):
+                    continue
+                cur.execute("SAVEPOINT advise_statement")
+                try:
+                    plan = _explain(cur, statement)
+                    analyzed += 1
+                    for candidate in _candidates_for_plan(cur, plan, cache):
+                        ddl = sql.SQL("CREATE INDEX ON {} ({})").format(
+                            sql.Identifier(candidate["table"]),
+                            sql.SQL(", ").join(sql.Identifier(c) for c in candidate["columns"])
+                        ).as_string(conn)
+                        if hypopg:
+                            cost_after = _hypothetical_cost(cur, ddl, statement)
+                            benefit = plan["Total Cost"] - cost_after
+                            if benefit <= 0:
+                                continue
+                        else:
+                            cost_after = None
+                            benefit = candidate["seq_scan_cost"] * (1 - candidate["selectivity"])
+                        key = (candidate["table"], tuple(candidate["columns"]))
+                        proposal = proposals.setdefault(key, {
+                            "table": candidate["table"],
+                            "columns": candidate["columns"],
+                            "ddl": ddl.replace("CREATE INDEX ON", "CREATE INDEX CONCURRENTLY ON", 1),
+                            "method": "hypopg" if hypopg else "heuristic",
+                            "estimated_benefit": 0.0,
+                            "statements": [],
+                        })
+                        proposal["estimated_benefit"] += benefit * statement["calls"]
+                        proposal["statements"].append({
+                            "sql_fingerprint": tracing.sql_fingerprint(statement["query"]),
+                            "query": statement["query"][:300],
+                            "calls": statement["calls"],
+                            "reason": candidate["reason"],
+                            "cost_before": plan["Total Cost"],
+                            "cost_after": cost_after,
+                        })
+                    cur.execute("RELEASE SAVEPOINT advise_statement")
+                except psycopg2.Error as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT advise_statement")
+                    skipped.append({"query": statement["query"][:200], "error": str(e).strip()[:200]})
+        conn.rollback()
+
+    ranked = sorted(proposals.values(), key=lambda p: p["estimated_benefit"], reverse=True)
+    for proposal in ranked:
+        proposal["estimated_benefit"] = round(proposal["estimated_benefit"], 2)
+    print(f"----------------- {len(ranked)} index proposals from {analyzed} statements, ---------")
+    return {
+        "source": source,
+        "hypopg": hypopg,
+        "statements_analyzed": analyzed,
+        "proposals": ranked,
+        "skipped": skipped,
+        "note": "Proposals only; review and run the DDL yourself.",
+    }
+
+# EXPLANATION
+# Purpose: Index advisor for agent-generated SQL; proposes indexes from EXPLAIN plans, never creates them
+# Main functions: advise -> plans workload/pg_stat_statements statements, finds selective Seq Scans and
+#                 Sort+Limit over Seq Scan, ranks candidate indexes (hypopg-verified when installed),
+#                 filter_columns -> equality/range columns of a plan filter
+# Notable vars: MIN_TABLE_ROWS, MAX_SELECTIVITY -> when a sequential scan is considered fine
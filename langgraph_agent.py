@@ -2,22 +2,43 @@
 #         langgraph_agent.py
 #################################
 
-from typing import Annotated
+import json
+import threading
+import time
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 from typing_extensions import TypedDict
-from langchain_core.messages import BaseMessage
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextvars import ContextVar, copy_context
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 from langchain.chat_models import init_chat_model
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
 from langgraph.checkpoint.memory import MemorySaver
 import config
 import db_tools
+import fake_llm
+import llm_scheduler
+import matviews
+import metrics
+import result_renderer
+import text_search
+import tracing
+print("----------------- json, threading, time imports completed or connected, ---------")
 print("----------------- typing imports completed or connected, ---------")
+print("----------------- concurrent.futures, contextvars imports completed or connected, ---------")
 print("----------------- langchain imports completed or connected, ---------")
 print("----------------- langgraph imports completed or connected, ---------")
 print("----------------- config import completed or connected, ---------")
 print("----------------- db_tools import completed or connected, ---------")
+print("----------------- fake_llm import completed or connected, ---------")
+print("----------------- llm_scheduler import completed or connected, ---------")
+print("----------------- matviews import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+print("----------------- result_renderer import completed or connected, ---------")
+print("----------------- text_search import completed or connected, ---------")
+print("----------------- tracing import completed or connected, ---------")
 
 print("="*40)
 # State
@@ -30,80 +51,310 @@ class State(TypedDict):
     # (in this case, it appends messages to the list)
     messages: Annotated[list, add_messages]
 
+print("="*40)
+# Turn Context
+print("="*40)
+
+# Budget and timing record of the agent turn currently running, set by run_agent_turn
+_turn_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("turn_context", default=None)
+
+def new_turn_context(timeout_seconds: float, max_tool_hops: int, priority: str = "interactive") -> Dict[str, Any]:
+    """Create budget and timing record for one agent turn. Returns turn context dict."""
+    return {
+        "start": time.perf_counter(),
+        "deadline": time.monotonic() + timeout_seconds,
+        "timeout_seconds": timeout_seconds,
+        "max_tool_hops": max_tool_hops,
+        "priority": priority,
+        "tool_hops": 0,
+        "llm_hops": [],
+        "tool_calls": [],
+        "db_seconds": [],
+        "stopped_reason": None,
+    }
+
+def deadline_exceeded(turn: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Check the turn deadline. Returns stop reason or None while time remains."""
+    if turn is not None and time.monotonic() > turn["deadline"]:
+        return f"turn deadline of {turn['timeout_seconds']}s exceeded"
+    return None
+
+def budget_exhausted(turn: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Check deadline and tool hop budget. Returns stop reason or None if another tool hop is allowed."""
+    reason = deadline_exceeded(turn)
+    if reason is None and turn is not None and turn["tool_hops"] >= turn["max_tool_hops"]:
+        reason = f"tool hop budget of {turn['max_tool_hops']} reached"
+    return reason
+
+def turn_stats(turn: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize timing and token usage of a finished turn. Returns stats dict."""
+    llm_hops = turn["llm_hops"]
+    tool_calls = turn["tool_calls"]
+    return {
+        "total_seconds": round(time.perf_counter() - turn["start"], 4),
+        "llm_seconds": round(sum(h["seconds"] for h in llm_hops), 4),
+        "llm_queue_seconds": round(sum(h["queue_seconds"] for h in llm_hops), 4),
+        "tool_seconds": round(sum(c["seconds"] for c in tool_calls), 4),
+        "db_seconds": round(sum(turn["db_seconds"]), 4),
+        "tokens_in": sum(h["tokens_in"] for h in llm_hops),
+        "tokens_out": sum(h["tokens_out"] for h in llm_hops),
+        "tool_hops": turn["tool_hops"],
+        "stopped_reason": turn["stopped_reason"],
+        "llm_hops": llm_hops,
+        "tool_calls": tool_calls,
+    }
+
 print("="*40)
 # Database Tools
 print("="*40)
 
 @tool
-def db_query(query: str) -> str:
-    """Execute SQL SELECT query and return results."""
-    # Executes a database SELECT query and returns formatted results
+def db_query(query: str, columns: str = "", database: str = "") -> str:
+    """Execute SQL SELECT query and return results as CSV. Optional comma-separated columns limits the output. Every database tool takes an optional database name (see db_list_tables)."""
+    # Executes a database SELECT query and returns compact, row-capped results
     try:
-        results = db_tools.execute_query(query)
-        return f"Query returned {len(results)} rows: {results}"
+        with db_tools.use_database(database or None):
+            results = db_tools.execute_query(query)
+            return result_renderer.render_for_llm(results, columns)
     except Exception as e:
         return f"Error executing query: {str(e)}"
 
 @tool
-def db_list_tables() -> str:
-    """List all tables in the database."""
-    # Returns list of all tables in the database
+def db_fetch_result(handle: str, offset: int = 0, limit: int = 50, columns: str = "") -> str:
+    """Fetch more rows of a large query result by its handle, starting at offset."""
+    # Reads a slice of a result stored by db_query without re-running the query
+    try:
+        return result_renderer.render_slice(handle, offset, limit, columns)
+    except Exception as e:
+        return f"Error fetching result: {str(e)}"
+
+@tool
+def db_list_tables(database: str = "") -> str:
+    """List all tables and precomputed materialized views in the database, and the other databases available."""
+    # Returns list of all tables in the database, materialized views with their columns, plus configured
+    # database names when there are several
     try:
-        tables = db_tools.list_tables()
-        return f"Available tables: {', '.join(tables)}"
+        with db_tools.use_database(database or None):
+            tables = db_tools.list_tables()
+            views = [
+                f"{v['name']}({', '.join(v['columns'])})" + (f" - {v['description']}" if v["description"] else "")
+                for v in matviews.list_views()
+            ]
+            searchable = [f"{i['table_name']}({', '.join(i['columns'])})" for i in text_search.list_search_indexes()]
+            databases = db_tools.database_names()
+            precomputed = ("\nMaterialized views (precomputed aggregates; query these instead of aggregating the "
+                           "raw tables when they answer the question):\n" + "\n".join(views)) if views else ""
+            if searchable:
+                precomputed += "\nSearchable with db_search: " + ", ".join(searchable)
+            others = f"\nAvailable databases: {', '.join(databases)}" if len(databases) > 1 else ""
+            return f"Available tables in '{db_tools.resolve_database()}': {', '.join(tables)}{precomputed}{others}"
     except Exception as e:
         return f"Error listing tables: {str(e)}"
 
 @tool
-def db_describe(table_name: str) -> str:
+def db_describe(table_name: str, database: str = "") -> str:
     """Describe the structure of a database table."""
     # Returns column information for a specified table
     try:
-        columns = db_tools.describe_table(table_name)
-        desc = [f"{c['column_name']} ({c['data_type']}, nullable: {c['is_nullable']})" 
-                for c in columns]
-        return f"Table '{table_name}' structure:\n" + "\n".join(desc)
+        with db_tools.use_database(database or None):
+            columns = db_tools.describe_table(table_name)
+            desc = [f"{c['column_name']} ({c['data_type']}, nullable: {c['is_nullable']})" 
+                    for c in columns]
+            return f"Table '{table_name}' structure:\n" + "\n".join(desc)
     except Exception as e:
         return f"Error describing table: {str(e)}"
 
 @tool
-def db_insert(table: str, data: str) -> str:
+def db_insert(table: str, data: str, database: str = "") -> str:
     """Insert record into database table. Data should be JSON string."""
     # Inserts a new record into the specified table
     import json
     try:
-        data_dict = json.loads(data)
-        row_id = db_tools.insert_record(table, data_dict)
-        return f"Record inserted successfully with ID: {row_id}"
+        with db_tools.use_database(database or None):
+            data_dict = json.loads(data)
+            row_id = db_tools.insert_record(table, data_dict)
+            return f"Record inserted successfully with ID: {row_id}"
     except Exception as e:
         return f"Error inserting record: {str(e)}"
 
 @tool
-def db_update(table: str, record_id: int, data: str) -> str:
+def db_update(table: str, record_id: int, data: str, database: str = "") -> str:
     """Update record in database table. Data should be JSON string."""
     # Updates an existing record in the specified table
     import json
     try:
-        data_dict = json.loads(data)
-        success = db_tools.update_record(table, record_id, data_dict)
-        return f"Record updated successfully: {success}"
+        with db_tools.use_database(database or None):
+            data_dict = json.loads(data)
+            success = db_tools.update_record(table, record_id, data_dict)
+            return f"Record updated successfully: {success}"
     except Exception as e:
         return f"Error updating record: {str(e)}"
 
 @tool
-def db_delete(table: str, record_id: int) -> str:
+def db_delete(table: str, record_id: int, database: str = "") -> str:
     """Delete record from database table by ID."""
     # Deletes a record from the specified table
     try:
-        success = db_tools.delete_record(table, record_id)
-        return f"Record deleted successfully: {success}"
+        with db_tools.use_database(database or None):
+            success = db_tools.delete_record(table, record_id)
+            return f"Record deleted successfully: {success}"
     except Exception as e:
         return f"Error deleting record: {str(e)}"
 
+@tool
+def db_table_stats(table_name: str = "", database: str = "") -> str:
+    """Get estimated row count and size of a table (or all tables) instantly. Prefer this over SELECT COUNT(*)."""
+    # Returns catalog estimates for row counts, sizes and scan activity
+    try:
+        with db_tools.use_database(database or None):
+            stats = db_tools.table_stats(table_name or None)
+            if not stats:
+                return f"No table statistics found for '{table_name}'" if table_name else "No tables found"
+            lines = [
+                f"{s['table_name']}: ~{s['estimated_rows']} rows, {s['total_size']} total, "
+                f"seq_scans={s['seq_scan']}, idx_scans={s['idx_scan']}, dead_tuples={s['n_dead_tup']}, "
+                f"last_analyze={s['last_analyze'] or s['last_autoanalyze']}"
+                for s in stats
+            ]
+            return "Table statistics (estimates):\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error getting table statistics: {str(e)}"
+
+@tool
+def db_sample(table: str, rows: int = 50, method: str = "system", seed: Optional[int] = None, database: str = "") -> str:
+    """Get a random sample of a table plus per-column profile (nulls, distinct count, common values). Use this to look at data instead of SELECT * or ORDER BY random()."""
+    # Reads only a TABLESAMPLE fraction of the table; the profile comes from pg_stats
+    try:
+        with db_tools.use_database(database or None):
+            sample = db_tools.sample_table(table, rows, method, seed)
+            profile = [
+                f"{name}: null_frac={p['null_frac']}, distinct~{p['distinct_estimate']}, "
+                f"common={[m['value'] for m in p['most_common']]}"
+                for name, p in sample["profile"].items()
+            ]
+            return (
+                f"Sample of '{table}' (~{sample['estimated_rows']} rows, {sample['method']} {sample['percent'] or 100}%):\n"
+                + result_renderer.render_for_llm(sample["rows"])
+                + "\nColumn profile:\n" + ("\n".join(profile) or sample["profile_note"])
+            )
+    except Exception as e:
+        return f"Error sampling table: {str(e)}"
+
+@tool
+def db_search(table: str, query: str, limit: int = 20, database: str = "") -> str:
+    """Ranked text search over a table's indexed text columns (see db_list_tables for searchable tables). Use this instead of ILIKE '%...%' to find rows mentioning words."""
+    # Uses the table's managed full-text or trigram index instead of scanning the table
+    try:
+        with db_tools.use_database(database or None):
+            found = text_search.search(table, query, limit)
+            return (f"Search of '{table}' ({found['kind']} on {', '.join(found['columns'])}), best matches first:\n"
+                    + result_renderer.render_for_llm(found["rows"]))
+    except Exception as e:
+        return f"Error searching table: {str(e)}"
+
+@tool
+def db_export(filename: str, query: str = "", table: str = "", format: str = "csv", database: str = "") -> str:
+    """Export a query or whole table to a local CSV or Parquet file. Use for bulk extracts instead of db_query."""
+    # Streams data to a file and reports only rows, bytes and path back to the LLM
+    try:
+        with db_tools.use_database(database or None):
+            export = db_tools.export_query(filename, query=query or None, table=table or None, fmt=format)
+            return f"Exported {export['rows']} rows ({export['bytes']} bytes) to {export['path']}"
+    except Exception as e:
+        return f"Error exporting data: {str(e)}"
+
 # All available tools
-tools = [db_query, db_list_tables, db_describe, db_insert, db_update, db_delete]
+tools = [db_query, db_fetch_result, db_list_tables, db_describe, db_table_stats, db_sample, db_search, db_export, db_insert, db_update, db_delete]
+tools_by_name = {t.name: t for t in tools}
 print("----------------- database tools registered, ---------")
 
+# Tools that never modify data and may run concurrently within one agent step
+READ_ONLY_TOOLS = {"db_query", "db_fetch_result", "db_list_tables", "db_describe", "db_table_stats", "db_sample", "db_search"}
+
+# SQL statements db_query may run concurrently; anything else is treated as a write. The keyword
+# test only picks candidates: read-only calls run in READ ONLY transactions, so a SELECT calling a
+# writing function (nextval, ...) fails instead of racing writes of the same step
+READ_ONLY_SQL_KEYWORDS = ("select", "show", "explain", "values", "table")
+
+# Bounded pool shared by all agent steps for concurrent read-only tool calls
+_tool_pool = ThreadPoolExecutor(max_workers=config.TOOL_MAX_WORKERS, thread_name_prefix="agent-tool")
+
+print("="*40)
+# tools_node
+print("="*40)
+
+def is_read_only_call(tool_call: Dict[str, Any]) -> bool:
+    """Check if a tool call is safe to run concurrently. Returns True for read-only calls."""
+    # db_query accepts arbitrary SQL, so only plain SELECT-like statements count as reads
+    if tool_call["name"] not in READ_ONLY_TOOLS:
+        return False
+    if tool_call["name"] == "db_query":
+        query = str(tool_call.get("args", {}).get("query", "")).strip().rstrip(";").lower()
+        # Several statements ("select 1; delete ...") run serially as a possible write
+        if ";" in query:
+            return False
+        return query.startswith(READ_ONLY_SQL_KEYWORDS)
+    return True
+
+def run_tool_call(tool_call: Dict[str, Any], read_only: bool = False) -> ToolMessage:
+    """Execute a single tool call. Returns ToolMessage answering the call."""
+    # Looks up the tool by name and wraps its output for the LLM; read_only calls run their SQL
+    # in READ ONLY transactions
+    start = time.perf_counter()
+    tool_fn = tools_by_name.get(tool_call["name"])
+    tool_token = db_tools.current_tool.set(f"agent:{tool_call['name']}")
+    read_only_token = db_tools.transaction_read_only.set(read_only)
+    with tracing.span("agent.tool", tool=tool_call["name"]) as span:
+        if tool_fn is None:
+            content = f"Error: unknown tool '{tool_call['name']}'"
+        else:
+            try:
+                content = tool_fn.invoke(tool_call.get("args", {}))
+            except Exception as e:
+                content = f"Error executing tool '{tool_call['name']}': {str(e)}"
+        span.set_attribute("result_chars", len(str(content)))
+    db_tools.transaction_read_only.reset(read_only_token)
+    db_tools.current_tool.reset(tool_token)
+    elapsed = time.perf_counter() - start
+    metrics.observe("agent_tool_seconds", elapsed, tool=tool_call["name"])
+    turn = _turn_context.get()
+    if turn is not None:
+        turn["tool_calls"].append({"name": tool_call["name"], "seconds": round(elapsed, 4)})
+    return ToolMessage(content=str(content), name=tool_call["name"], tool_call_id=tool_call["id"])
+
+def tools_node(state: State):
+    """Tool node that executes the tool calls of the last message. Returns updated state."""
+    # Consecutive read-only calls run concurrently on the shared pool; a write call acts as
+    # a barrier and runs alone, so writes stay serialized and keep their original ordering
+    print("#===============[ tools node ]==========")
+    tool_calls = state["messages"][-1].tool_calls
+    results: List[ToolMessage] = [None] * len(tool_calls)
+    batch: List[int] = []
+    turn = _turn_context.get()
+    if turn is not None:
+        turn["tool_hops"] += 1
+
+    def flush_batch():
+        if len(batch) == 1:
+            results[batch[0]] = run_tool_call(tool_calls[batch[0]], read_only=True)
+        elif batch:
+            # Each call runs in a copy of this context so turn and DB time accounting follow it
+            futures = [_tool_pool.submit(copy_context().run, run_tool_call, tool_calls[i], True) for i in batch]
+            for i, future in zip(batch, futures):
+                results[i] = future.result()
+        batch.clear()
+
+    for i, tool_call in enumerate(tool_calls):
+        if is_read_only_call(tool_call):
+            batch.append(i)
+        else:
+            flush_batch()
+            results[i] = run_tool_call(tool_call)
+    flush_batch()
+
+    print(f"----------------- executed {len(tool_calls)} tool calls, ---------")
+    return {"messages": results}
+
 print("="*40)
 # init_llm
 print("="*40)
@@ -112,7 +363,16 @@ def init_llm():
     """Initialize Ollama LLM with tools. Returns LLM instance with bound tools."""
     # Creates and configures the Ollama LLM instance
     print("#===============[ init_llm ]==========")
-    
+
+    if config.LLM_PROVIDER == "fake":
+        # Scripted model for load tests; no Ollama endpoint needed
+        llm = fake_llm.ScriptedChatModel(
+            script=fake_llm.load_script(config.FAKE_LLM_SCRIPT),
+            latency_ms=config.FAKE_LLM_LATENCY_MS
+        )
+        print(f"----------------- fake LLM initialized ({config.FAKE_LLM_LATENCY_MS} ms latency), ---------")
+        return llm.bind_tools(tools)
+
     # Initialize chat model with remote Ollama endpoint
     llm = init_chat_model(
         f"ollama:{config.OLLAMA_LLM_MODEL}",
@@ -128,18 +388,130 @@ def init_llm():
     
     return llm_with_tools
 
+# Tool-bound LLM client shared by all chatbot hops, threads and sessions of this process
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """Get or create singleton tool-bound LLM."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = init_llm()
+    return _llm
+
 print("="*40)
 # chatbot
 print("="*40)
 
+# Threads running model requests of agent turns: one per in-flight or queued scheduler entry
+_llm_pool = ThreadPoolExecutor(max_workers=config.LLM_MAX_IN_FLIGHT + config.LLM_MAX_QUEUED, thread_name_prefix="agent-llm")
+
+def invoke_llm(messages: List[BaseMessage], priority: str = "interactive",
+               queue_timeout: Optional[float] = None) -> Tuple[AIMessage, float, float]:
+    """Send messages to the chat model through the LLM scheduler. Returns response, queue and model seconds."""
+    # queue_timeout caps the wait for a process-wide model slot (raises LLMBusyError)
+    with llm_scheduler.llm_slot(priority, timeout=queue_timeout) as queued:
+        start = time.perf_counter()
+        with tracing.span("agent.llm_hop", messages=len(messages), queue_seconds=round(queued, 4)) as span:
+            response = get_llm().invoke(messages)
+            usage = getattr(response, "usage_metadata", None) or {}
+            span.set_attribute("tokens_in", usage.get("input_tokens", 0))
+            span.set_attribute("tokens_out", usage.get("output_tokens", 0))
+            span.set_attribute("tool_calls", len(getattr(response, "tool_calls", None) or []))
+        return response, queued, time.perf_counter() - start
+
 def chatbot(state: State):
     """Chatbot node that processes messages and calls LLM. Returns updated state."""
     # Main chatbot node that processes user messages
     print("#===============[ chatbot node ]==========")
-    llm = init_llm()
-    response = llm.invoke(state["messages"])
+    turn = _turn_context.get()
+    reason = deadline_exceeded(turn)
+    if reason:
+        turn["stopped_reason"] = reason
+        return {"messages": [AIMessage(content=partial_answer(state["messages"], reason))]}
+
+    priority = turn["priority"] if turn is not None else "interactive"
+    try:
+        if turn is None:
+            response, queued, elapsed = invoke_llm(state["messages"], priority)
+        else:
+            # The model call runs on _llm_pool so the turn stops waiting at its deadline; the
+            # scheduler slot stays taken until the abandoned call returns
+            remaining = turn["deadline"] - time.monotonic()
+            future = _llm_pool.submit(copy_context().run, invoke_llm, state["messages"], priority, remaining)
+            response, queued, elapsed = future.result(timeout=max(remaining, 0))
+    except FutureTimeoutError:
+        reason = f"turn deadline of {turn['timeout_seconds']}s exceeded waiting for the model"
+        turn["stopped_reason"] = reason
+        return {"messages": [AIMessage(content=partial_answer(state["messages"], reason))]}
+    except llm_scheduler.LLMBusyError as e:
+        if turn is not None:
+            turn["stopped_reason"] = str(e)
+        return {"messages": [AIMessage(content=partial_answer(state["messages"], str(e)))]}
+    usage = getattr(response, "usage_metadata", None) or {}
+    metrics.observe("llm_hop_seconds", elapsed)
+    metrics.increment("llm_tokens_total", usage.get("input_tokens", 0), direction="in")
+    metrics.increment("llm_tokens_total", usage.get("output_tokens", 0), direction="out")
+    if turn is not None:
+        turn["llm_hops"].append({
+            "seconds": round(elapsed, 4),
+            "queue_seconds": round(queued, 4),
+            "tokens_in": usage.get("input_tokens", 0),
+            "tokens_out": usage.get("output_tokens", 0),
+        })
     return {"messages": [response]}
 
+print("="*40)
+# Turn Budget Handling
+print("="*40)
+
+def partial_answer(messages: List[BaseMessage], reason: str) -> str:
+    """Build graceful answer for a turn stopped early. Returns answer text with latest progress."""
+    # Reports the latest assistant text and tool result of the current turn, if any
+    answer = f"I stopped before finishing this request ({reason})."
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, ToolMessage):
+            answer += f"\nLatest tool result ({message.name}):\n{str(message.content)[:1000]}"
+            break
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.content:
+            answer += f"\nProgress so far: {message.content}"
+            break
+    return answer
+
+def route_after_chatbot(state: State) -> str:
+    """Route chatbot output to tools, budget handler or end. Returns next node name."""
+    # Tool calls only proceed while the turn has time and tool hops left
+    if tools_condition(state) == END:
+        return END
+    turn = _turn_context.get()
+    reason = budget_exhausted(turn)
+    if reason:
+        turn["stopped_reason"] = reason
+        return "budget_exceeded"
+    return "tools"
+
+def budget_exceeded(state: State):
+    """Node that closes a turn stopped by its budget. Returns updated state."""
+    # Answers the pending tool calls without running them, keeping thread history valid
+    print("#===============[ budget_exceeded node ]==========")
+    turn = _turn_context.get()
+    reason = turn["stopped_reason"] if turn is not None else "turn budget exhausted"
+    pending = state["messages"][-1].tool_calls
+    messages: List[BaseMessage] = [
+        ToolMessage(content=f"Not executed: {reason}", name=c["name"], tool_call_id=c["id"])
+        for c in pending
+    ]
+    messages.append(AIMessage(content=partial_answer(state["messages"], reason)))
+    print(f"----------------- turn stopped early: {reason}, ---------")
+    return {"messages": messages}
+
 print("="*40)
 # build_graph
 print("="*40)
@@ -154,16 +526,19 @@ def build_graph():
     
     # Add nodes
     graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", ToolNode(tools))
+    graph_builder.add_node("tools", tools_node)
+    graph_builder.add_node("budget_exceeded", budget_exceeded)
     print("----------------- graph nodes added, ---------")
     
     # Add edges
     graph_builder.add_edge(START, "chatbot")
     graph_builder.add_conditional_edges(
         "chatbot",
-        tools_condition
+        route_after_chatbot,
+        ["tools", "budget_exceeded", END]
     )
     graph_builder.add_edge("tools", "chatbot")
+    graph_builder.add_edge("budget_exceeded", END)
     print("----------------- graph edges added, ---------")
     
     # Add memory
@@ -179,45 +554,87 @@ def build_graph():
 print("="*40)
 # Global variable to store compiled graph
 _compiled_graph = None
+_graph_lock = threading.Lock()
 
 def get_graph():
-    """Get or create singleton compiled graph."""
+    """Get or create singleton compiled graph. Safe to call from concurrent threads."""
     global _compiled_graph
     if _compiled_graph is None:
-        _compiled_graph = build_graph()
+        with _graph_lock:
+            if _compiled_graph is None:
+                _compiled_graph = build_graph()
     return _compiled_graph
 
 print("="*40)
 # run_agent
 print("="*40)
 
-def run_agent(user_input: str, thread_id: str = "default") -> str:
-    """Run agent with user input. Returns agent response."""
-    # Executes the agent with a user message in a specific thread
-    print("#===============[ run_agent ]==========")
+def run_agent_turn(user_input: str, thread_id: str = "default",
+                   timeout_seconds: Optional[float] = None,
+                   max_tool_hops: Optional[int] = None,
+                   priority: str = "interactive") -> Dict[str, Any]:
+    """Run agent turn within deadline and tool hop budget. Returns dict with response and timing stats."""
+    # Executes the agent with a user message in a specific thread, accounting LLM, tool and DB time;
+    # priority orders its model requests in the process-wide LLM queue ("interactive" or "batch")
+    print("#===============[ run_agent_turn ]==========")
+    if priority not in llm_scheduler.PRIORITIES:
+        raise ValueError(f"Unsupported priority '{priority}', use one of {', '.join(llm_scheduler.PRIORITIES)}")
     
     # Use cached graph to persist memory
     graph = get_graph()
     
-    config_dict = {"configurable": {"thread_id": thread_id}}
-    
-    # Stream events
-    events = graph.stream(
-        {"messages": [("user", user_input)]},
-        config_dict,
-        stream_mode="values"
+    turn = new_turn_context(
+        timeout_seconds if timeout_seconds is not None else config.AGENT_TIMEOUT_SECONDS,
+        max_tool_hops if max_tool_hops is not None else config.AGENT_MAX_TOOL_HOPS,
+        priority
     )
+    # Recursion limit is a safety net only; the hop budget normally stops the turn first
+    config_dict = {
+        "configurable": {"thread_id": thread_id},
+        "recursion_limit": 2 * turn["max_tool_hops"] + 5
+    }
     
-    # Get final response
-    response = ""
-    for event in events:
-        if "messages" in event and len(event["messages"]) > 0:
-            last_msg = event["messages"][-1]
-            if hasattr(last_msg, "content"):
-                response = last_msg.content
+    turn_token = _turn_context.set(turn)
+    db_token = db_tools.db_time_sink.set(turn["db_seconds"])
+    # SQL of this turn (tool threads included) is cancelled by the server once the deadline passes
+    deadline_token = db_tools.statement_deadline.set(turn["deadline"])
+    try:
+        with tracing.span("agent.turn", thread_id=thread_id) as span:
+            # Stream events
+            events = graph.stream(
+                {"messages": [("user", user_input)]},
+                config_dict,
+                stream_mode="values"
+            )
+            
+            # Get final response
+            response = ""
+            for event in events:
+                if "messages" in event and len(event["messages"]) > 0:
+                    last_msg = event["messages"][-1]
+                    if hasattr(last_msg, "content"):
+                        response = last_msg.content
+            
+            stats = turn_stats(turn)
+            for key in ("tool_hops", "tokens_in", "tokens_out", "stopped_reason"):
+                span.set_attribute(key, stats[key])
+    finally:
+        db_tools.statement_deadline.reset(deadline_token)
+        db_tools.db_time_sink.reset(db_token)
+        _turn_context.reset(turn_token)
     
+    metrics.observe("agent_turn_seconds", stats["total_seconds"])
+    if stats["stopped_reason"]:
+        metrics.increment("agent_turns_stopped_total")
     print(f"----------------- agent response generated, ---------")
-    return response
+    print(f"----------------- turn stats: {json.dumps(stats)}, ---------")
+    return {"response": response, "stats": stats}
+
+def run_agent(user_input: str, thread_id: str = "default") -> str:
+    """Run agent with user input. Returns agent response."""
+    # Executes the agent with default turn budgets and drops the timing stats
+    print("#===============[ run_agent ]==========")
+    return run_agent_turn(user_input, thread_id)["response"]
 
 print("="*40)
 # interactive_chat
@@ -325,7 +742,10 @@ if __name__ == "__main__":
 
 # EXPLANATION
 # Purpose: LangGraph agent with Ollama LLM and PostgreSQL tool integration
-# Main functions: init_llm -> initializes Ollama with remote endpoint, build_graph -> creates workflow,
-#                 chatbot -> main LLM node, run_agent -> executes agent with user input,
+# Main functions: init_llm -> initializes Ollama with remote endpoint, get_llm -> shared LLM client, build_graph -> creates workflow,
+#                 chatbot -> main LLM node, invoke_llm -> model call through an llm_scheduler slot, tools_node -> runs read-only tool calls concurrently,
+#                 route_after_chatbot -> enforces deadline and tool hop budget, budget_exceeded -> partial answer,
+#                 run_agent_turn -> executes agent turn with timing stats, run_agent -> returns response only,
 #                 interactive_chat -> CLI interface for interactive conversations
-# Notable vars: tools -> list of database operation tools, State -> TypedDict with message history
+# Notable vars: tools -> list of database operation tools (each takes an optional database profile), _tool_pool -> bounded tool worker pool, _llm_pool -> model call threads,
+#               _turn_context -> per-turn budget and timing record, State -> TypedDict with message history
@@ -0,0 +1,107 @@
+#################################
+#         llm_scheduler.py
+#################################
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+import config
+import metrics
+print("----------------- heapq, itertools, threading, time imports completed or connected, ---------")
+print("----------------- contextlib import completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+
+print("="*40)
+# Scheduler State
+print("="*40)
+
+# Every chat model request of the process (MCP agent_query, Streamlit sessions, benchmarks) passes
+# through one admission gate: at most LLM_MAX_IN_FLIGHT requests reach the model at once, the rest
+# wait in a priority queue (interactive before batch, FIFO within a priority) of at most
+# LLM_MAX_QUEUED entries. Arrivals beyond that are rejected at once instead of piling onto the model
+PRIORITIES: Dict[str, int] = {"interactive": 0, "batch": 1}
+
+_cond = threading.Condition()
+_in_flight = 0
+# Heap of (priority rank, arrival sequence) tickets; the head is admitted when a slot frees up
+_waiting: List[Tuple[int, int]] = []
+_sequence = itertools.count()
+
+class LLMBusyError(RuntimeError):
+    """Raised when a chat model request is rejected (queue full) or timed out waiting for a slot."""
+
+def _check_priority(priority: str) -> int:
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unsupported priority '{priority}', use one of {', '.join(PRIORITIES)}")
+    return PRIORITIES[priority]
+
+print("="*40)
+# llm_slot
+print("="*40)
+
+@contextmanager
+def llm_slot(priority: str = "interactive", timeout: Optional[float] = None):
+    """Wait for a chat model slot in priority order. Yields seconds spent queued; raises LLMBusyError."""
+    # timeout caps the queue wait below LLM_QUEUE_TIMEOUT_SECONDS (e.g. to the remaining turn deadline)
+    global _in_flight
+    rank = _check_priority(priority)
+    wait_limit = config.LLM_QUEUE_TIMEOUT_SECONDS if timeout is None else min(timeout, config.LLM_QUEUE_TIMEOUT_SECONDS)
+    start = time.perf_counter()
+    with _cond:
+        if _in_flight >= config.LLM_MAX_IN_FLIGHT or _waiting:
+            if len(_waiting) >= config.LLM_MAX_QUEUED:
+                metrics.increment("llm_requests_total", result="rejected", priority=priority)
+                print(f"WARNING: LLM queue full ({len(_waiting)} waiting), {priority} request rejected")
+                raise LLMBusyError(f"model busy: {len(_waiting)} requests already queued")
+            ticket = (rank, next(_sequence))
+            heapq.heappush(_waiting, ticket)
+            metrics.observe("llm_queue_depth", len(_waiting))
+            admitted = _cond.wait_for(
+                lambda: _in_flight < config.LLM_MAX_IN_FLIGHT and _waiting[0] == ticket,
+                timeout=max(wait_limit, 0)
+            )
+            if not admitted:
+                _waiting.remove(ticket)
+                heapq.heapify(_waiting)
+                # The head may have changed; let the new head check for a free slot
+                _cond.notify_all()
+                metrics.increment("llm_requests_total", result="timeout", priority=priority)
+                print(f"WARNING: {priority} LLM request timed out after {wait_limit:.1f}s in queue")
+                raise LLMBusyError(f"model busy: no slot within {wait_limit:.1f}s")
+            heapq.heappop(_waiting)
+            if _waiting:
+                _cond.notify_all()
+        _in_flight += 1
+    queued = time.perf_counter() - start
+    metrics.increment("llm_requests_total", result="admitted", priority=priority)
+    metrics.observe("llm_queue_wait_seconds", queued, priority=priority)
+    try:
+        yield queued
+    finally:
+        with _cond:
+            _in_flight -= 1
+            _cond.notify_all()
+
+def scheduler_stats() -> Dict[str, Any]:
+    """Get current chat model admission state. Returns dict with limits, in-flight and queued counts."""
+    with _cond:
+        queued = {name: sum(1 for rank, _ in _waiting if rank == value) for name, value in PRIORITIES.items()}
+        return {
+            "max_in_flight": config.LLM_MAX_IN_FLIGHT,
+            "max_queued": config.LLM_MAX_QUEUED,
+            "queue_timeout_seconds": config.LLM_QUEUE_TIMEOUT_SECONDS,
+            "in_flight": _in_flight,
+            "queued": queued,
+        }
+
+# EXPLANATION
+# Purpose: Process-wide admission control in front of the chat model so bursts queue here instead of inside Ollama
+# Main functions: llm_slot -> priority-ordered slot with backpressure (full queue) and queue timeout, yields wait time,
+#                 scheduler_stats -> live in-flight and per-priority queue depth for server_stats
+# Notable vars: PRIORITIES -> interactive before batch, _waiting -> heap of queued tickets,
+#               LLM_MAX_IN_FLIGHT / LLM_MAX_QUEUED / LLM_QUEUE_TIMEOUT_SECONDS -> limits from config
@@ -0,0 +1,270 @@
+#################################
+#         matviews.py
+#################################
+
+import json
+import re
+import threading
+import time
+import psycopg2
+from psycopg2 import sql
+from typing import Dict, List, Any, Optional, Tuple
+import config
+import db_tools
+import metrics
+print("----------------- json, re, threading, time imports completed or connected, ---------")
+print("----------------- psycopg2 import completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+
+print("="*40)
+# View Catalog
+print("="*40)
+
+# Managed views carry their settings as a JSON comment {"mcp_managed": true, "description", "refresh_seconds",
+# "last_refresh_at"}, so every server process (and every database profile) sees the same definitions
+# and refresh schedule; last_refresh_at (epoch seconds) is rewritten by each successful refresh
+_NAME_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+# Details of the last refresh per (database, view) done by this process: at, duration_ms, mode, error
+_refreshes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_refresh_lock = threading.Lock()
+
+def _check_name(name: str) -> None:
+    if not _NAME_RE.match(name or ""):
+        raise ValueError(f"Invalid view or column name '{name}', use lowercase letters, digits and _")
+
+def _settings(comment: Optional[str]) -> Dict[str, Any]:
+    # Parses the management comment; views without one are listed but not managed
+    try:
+        settings = json.loads(comment or "")
+    except json.JSONDecodeError:
+        return {}
+    return settings if isinstance(settings, dict) and settings.get("mcp_managed") else {}
+
+def _is_due(settings: Dict[str, Any], now: float) -> bool:
+    # Views never refreshed since this setting existed count as due
+    interval = settings.get("refresh_seconds", 0)
+    return interval > 0 and now - settings.get("last_refresh_at", 0) >= interval
+
+def _write_settings(cur, name: str, settings: Dict[str, Any]) -> None:
+    cur.execute(sql.SQL("COMMENT ON MATERIALIZED VIEW {} IS {}").format(
+        sql.Identifier(name), sql.Literal(json.dumps(settings))))
+
+def list_views() -> List[Dict[str, Any]]:
+    """List materialized views of the current database with columns, size and refresh settings."""
+    print("#===============[ list_views ]==========")
+    rows = db_tools.execute_query("""
+        SELECT c.relname AS name, c.relispopulated AS populated,
+               GREATEST(c.reltuples, 0)::bigint AS estimated_rows,
+               pg_size_pretty(pg_total_relation_size(c.oid)) AS size,
+               obj_description(c.oid, 'pg_class') AS comment,
+               EXISTS (SELECT 1 FROM pg_index i
+                       WHERE i.indrelid = c.oid AND i.indisunique
+                         AND i.indpred IS NULL AND i.indexprs IS NULL) AS has_unique_index,
+               ARRAY(SELECT attname FROM pg_attribute
+                     WHERE attrelid = c.oid AND attnum > 0 AND NOT attisdropped
+                     ORDER BY attnum) AS columns,
+               pg_get_viewdef(c.oid) AS definition
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'm' AND n.nspname = 'public'
+        ORDER BY c.relname
+    """)
+    database = db_tools.resolve_database()
+    views = []
+    for row in rows:
+        settings = _settings(row.pop("comment"))
+        with _refresh_lock:
+            last = dict(_refreshes.get((database, row["name"]), {}))
+        views.append({
+            **row,
+            "managed": bool(settings),
+            "description": settings.get("description", ""),
+            "refresh_seconds": settings.get("refresh_seconds", 0),
+            "last_refresh_at": settings.get("last_refresh_at"),
+            "refresh_due": _is_due(settings, time.time()),
+            "concurrent_refresh": row["has_unique_index"] and row["populated"],
+            "last_refresh": last or None,
+        })
+    print(f"----------------- found {len(views)} materialized views, ---------")
+    return views
+
+def _get_view(name: str) -> Dict[str, Any]:
+    for view in list_views():
+        if view["name"] == name:
+            return view
+    raise ValueError(f"Unknown materialized view '{name}'")
+
+print("="*40)
+# create_view / drop_view
+print("="*40)
+
+def create_view(name: str, query: str, description: str = "", refresh_seconds: int = 0,
+                unique_columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Create a managed materialized view from a SELECT. Returns the view as listed by list_views."""
+    # unique_columns adds the unique index REFRESH ... CONCURRENTLY needs (readers are not blocked
+    # during refreshes); without it refreshes lock the view. refresh_seconds > 0 lets the server
+    # scheduler refresh it
+    print("#===============[ create_view ]==========")
+    _check_name(name)
+    for column in unique_columns or []:
+        _check_name(column)
+    query = query.strip().rstrip(";").strip()
+    if not query.lower().startswith(("select", "with")):
+        raise ValueError("Materialized view query must be a SELECT (or WITH ... SELECT) statement")
+    settings = {"mcp_managed": True, "description": description, "refresh_seconds": max(int(refresh_seconds), 0),
+                "last_refresh_at": round(time.time(), 3)}
+
+    start = time.perf_counter()
+    with db_tools.get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("CREATE MATERIALIZED VIEW {} AS ").format(sql.Identifier(name)) + sql.SQL(query))
+            if unique_columns:
+                cur.execute(sql.SQL("CREATE UNIQUE INDEX {} ON {} ({})").format(
+                    sql.Identifier(f"{name}_key"), sql.Identifier(name),
+                    sql.SQL(", ").join(sql.Identifier(c) for c in unique_columns)))
+            _write_settings(cur, name, settings)
+    _record_refresh(name, time.perf_counter() - start, "create")
+    print(f"----------------- materialized view '{name}' created, ---------")
+    return _get_view(name)
+
+def drop_view(name: str) -> bool:
+    """Drop a managed materialized view. Returns True when dropped."""
+    print("#===============[ drop_view ]==========")
+    if not _get_view(name)["managed"]:
+        raise ValueError(f"Materialized view '{name}' was not created by this server; drop it manually")
+    with db_tools.get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("DROP MATERIALIZED VIEW {}").format(sql.Identifier(name)))
+    with _refresh_lock:
+        _refreshes.pop((db_tools.resolve_database(), name), None)
+    print(f"----------------- materialized view '{name}' dropped, ---------")
+    return True
+
+print("="*40)
+# refresh_view
+print("="*40)
+
+def _record_refresh(name: str, seconds: float, mode: str, error: Optional[str] = None) -> Dict[str, Any]:
+    entry = {
+        "at": round(time.time(), 3),
+        "duration_ms": round(seconds * 1000, 1),
+        "mode": mode,
+        "error": error,
+    }
+    with _refresh_lock:
+        _refreshes[(db_tools.resolve_database(), name)] = entry
+    metrics.observe("matview_refresh_seconds", seconds, view=name)
+    if error:
+        metrics.increment("matview_refresh_errors_total", view=name)
+    return entry
+
+def refresh_view(name: str, concurrently: Optional[bool] = None, only_if_due: bool = False) -> Dict[str, Any]:
+    """Refresh a materialized view, CONCURRENTLY when it has a unique index. Returns refresh record."""
+    # A transaction-scoped advisory lock keeps several server processes from refreshing the
+    # same view at once; the loser reports the refresh as skipped. only_if_due re-reads the
+    # schedule under the lock, so a view another process just refreshed is not refreshed again
+    print("#===============[ refresh_view ]==========")
+    view = _get_view(name)
+    if concurrently is None:
+        concurrently = view["concurrent_refresh"]
+    elif concurrently and not view["concurrent_refresh"]:
+        raise ValueError(f"'{name}' needs a unique index on plain columns (and to be populated) for a concurrent refresh")
+    mode = "concurrent" if concurrently else "blocking"
+
+    start = time.perf_counter()
+    try:
+        with db_tools.get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (f"mcp_matview:{name}",))
+                if not cur.fetchone()[0]:
+                    print(f"----------------- refresh of '{name}' already running elsewhere, ---------")
+                    return {"name": name, "refreshed": False, "reason": "refresh already running"}
+                cur.execute("SELECT obj_description(%s::regclass, 'pg_class')", (name,))
+                settings = _settings(cur.fetchone()[0])
+                if only_if_due and not _is_due(settings, time.time()):
+                    return {"name": name, "refreshed": False, "reason": "not due (refreshed elsewhere)"}
+                cur.execute(sql.SQL("REFRESH MATERIALIZED VIEW {}{}").format(
+                    sql.SQL("CONCURRENTLY ") if concurrently else sql.SQL(""), sql.Identifier(name)))
+                if settings:
+                    # Committed with the refresh, so every process sees the new schedule
+                    settings["last_refresh_at"] = round(time.time(), 3)
+                    _write_settings(cur, name, settings)
+    except psycopg2.Error as e:
+        _record_refresh(name, time.perf_counter() - start, mode, str(e).strip())
+        raise
+    entry = _record_refresh(name, time.perf_counter() - start, mode)
+    print(f"----------------- refreshed '{name}' ({mode}) in {entry['duration_ms']} ms, ---------")
+    return {"name": name, "refreshed": True, **entry}
+
+print("="*40)
+# Refresh Scheduler
+print("="*40)
+
+# Daemon thread checking every MATVIEW_REFRESH_TICK seconds for managed views (of every database
+# profile) whose refresh_seconds have passed since their last refresh by any process (last_refresh_at)
+_scheduler: Optional[threading.Thread] = None
+_scheduler_stop = threading.Event()
+
+def refresh_due() -> List[Dict[str, Any]]:
+    """Refresh managed views whose interval has passed, in every database. Returns refresh records."""
+    results = []
+    for database in db_tools.database_names():
+        with db_tools.use_database(database):
+            try:
+                views = list_views()
+            except Exception as e:
+                print(f"ERROR: Listing materialized views of '{database}' failed: {e}")
+                continue
+            for view in views:
+                if not view["managed"] or not view["refresh_due"]:
+                    continue
+                # A failing refresh (not recorded in last_refresh_at) is retried once per interval
+                last = view["last_refresh"] or {}
+                if last.get("error") and time.time() - last["at"] < view["refresh_seconds"]:
+                    continue
+                try:
+                    results.append({"database": database, **refresh_view(view["name"], only_if_due=True)})
+                except Exception as e:
+                    print(f"ERROR: Scheduled refresh of '{database}.{view['name']}' failed: {e}")
+    return results
+
+def _scheduler_loop() -> None:
+    token = db_tools.current_tool.set("matview_scheduler")
+    try:
+        while not _scheduler_stop.wait(config.MATVIEW_REFRESH_TICK):
+            refresh_due()
+    finally:
+        db_tools.current_tool.reset(token)
+
+def start_scheduler() -> bool:
+    """Start the refresh scheduler thread unless disabled (MATVIEW_REFRESH_TICK=0). Returns True if running."""
+    global _scheduler
+    if config.MATVIEW_REFRESH_TICK <= 0:
+        return False
+    if _scheduler is None or not _scheduler.is_alive():
+        _scheduler_stop.clear()
+        _scheduler = threading.Thread(target=_scheduler_loop, name="matview-refresh", daemon=True)
+        _scheduler.start()
+        print(f"----------------- materialized view scheduler started (every {config.MATVIEW_REFRESH_TICK}s), ---------")
+    return True
+
+def stop_scheduler() -> None:
+    """Stop the refresh scheduler thread."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler_stop.set()
+        _scheduler.join(timeout=5)
+        _scheduler = None
+
+# EXPLANATION
+# Purpose: Materialized views for recurring aggregate questions, with optional scheduled refreshes
+# Main functions: create_view/drop_view -> managed views (settings kept in the view comment),
+#                 list_views -> views with columns, size and last refresh (advertised to the agent),
+#                 refresh_view -> REFRESH [CONCURRENTLY] under an advisory lock,
+#                 refresh_due/start_scheduler -> background refresh of views whose interval has passed
+# Notable vars: last_refresh_at -> shared refresh schedule in the view comment, _refreshes -> last refresh
+#               details per (database, view) in this process, MATVIEW_REFRESH_TICK -> scheduler period
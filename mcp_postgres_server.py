@@ -4,20 +4,49 @@
 
 import asyncio
 import json
-from typing import Any, Dict, List
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from contextvars import copy_context
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
 from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
+from mcp.types import Resource, Tool, TextContent
+from pydantic import AnyUrl
+import change_feed
 import config
 import db_tools
+import index_advisor
 import langgraph_agent
+import llm_scheduler
+import matviews
+import metrics
+import result_renderer
+import text_search
+import tracing
+import warmup
 print("----------------- asyncio import completed or connected, ---------")
-print("----------------- json import completed or connected, ---------")
+print("----------------- json, sys, threading, time imports completed or connected, ---------")
+print("----------------- concurrent.futures, contextlib, contextvars imports completed or connected, ---------")
 print("----------------- typing import completed or connected, ---------")
+print("----------------- urllib import completed or connected, ---------")
 print("----------------- mcp imports completed or connected, ---------")
+print("----------------- change_feed import completed or connected, ---------")
 print("----------------- config import completed or connected, ---------")
 print("----------------- db_tools import completed or connected, ---------")
+print("----------------- index_advisor import completed or connected, ---------")
 print("----------------- langgraph_agent import completed or connected, ---------")
+print("----------------- llm_scheduler import completed or connected, ---------")
+print("----------------- matviews import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+print("----------------- result_renderer import completed or connected, ---------")
+print("----------------- text_search import completed or connected, ---------")
+print("----------------- tracing import completed or connected, ---------")
+print("----------------- warmup import completed or connected, ---------")
 
 print("="*40)
 # MCP Server Initialization
@@ -40,7 +69,8 @@ async def list_tools() -> List[Tool]:
     tools_list = [
         Tool(
             name="db_query",
-            description="Execute SQL SELECT query and return results",
+            description="Execute SQL SELECT query and return results. Large results come back as a summary, "
+                        "the first rows and a results:// resource (or db_fetch_result handle) to read the rest by slice",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -49,6 +79,19 @@ async def list_tools() -> List[Tool]:
                 "required": ["query"]
             }
         ),
+        Tool(
+            name="db_fetch_result",
+            description="Read rows of a large stored db_query result by handle, same as reading its results:// resource",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "handle": {"type": "string", "description": "Result handle returned by db_query"},
+                    "offset": {"type": "integer", "description": "First row to return", "default": 0},
+                    "limit": {"type": "integer", "description": f"Rows to return (max {RESULT_PAGE_MAX_ROWS})", "default": 100}
+                },
+                "required": ["handle"]
+            }
+        ),
         Tool(
             name="db_list_tables",
             description="List all tables in the PostgreSQL database",
@@ -77,6 +120,23 @@ async def list_tools() -> List[Tool]:
                 "required": ["table", "data"]
             }
         ),
+        Tool(
+            name="db_upsert",
+            description="Insert or update many records in one transaction (INSERT ... ON CONFLICT DO UPDATE); "
+                        "returns how many rows were inserted, updated or already up to date",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "table": {"type": "string", "description": "Table name"},
+                    "rows": {"type": "string", "description": "JSON array of objects with the same keys"},
+                    "conflict_columns": {"type": "array", "items": {"type": "string"},
+                                         "description": "Columns of the unique key to upsert on"},
+                    "update_columns": {"type": "array", "items": {"type": "string"},
+                                       "description": "Columns to update on conflict (optional, default all others; [] = insert only)"}
+                },
+                "required": ["table", "rows", "conflict_columns"]
+            }
+        ),
         Tool(
             name="db_update",
             description="Update an existing record in a database table",
@@ -102,6 +162,131 @@ async def list_tools() -> List[Tool]:
                 "required": ["table", "record_id"]
             }
         ),
+        Tool(
+            name="db_table_stats",
+            description="Estimated row counts, sizes and scan/vacuum stats from the catalog (instant, no COUNT(*))",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "table_name": {"type": "string", "description": "Table name (optional, all tables if omitted)"}
+                }
+            }
+        ),
+        Tool(
+            name="db_sample",
+            description="Random sample of a table via TABLESAMPLE (reads only a fraction of it) with a per-column profile "
+                        "from pg_stats: null fraction, distinct estimate, most common values. Use instead of ORDER BY random()",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "table": {"type": "string", "description": "Table name"},
+                    "rows": {"type": "integer", "description": "Target sample size (max 1000)", "default": 100},
+                    "method": {"type": "string", "enum": ["system", "bernoulli"],
+                               "description": "system samples pages (fastest), bernoulli samples rows (less clustered)",
+                               "default": "system"},
+                    "seed": {"type": "integer", "description": "Seed for a repeatable sample (optional)"}
+                },
+                "required": ["table"]
+            }
+        ),
+        Tool(
+            name="db_search",
+            description="Ranked text search backed by GIN indexes instead of ILIKE scans. 'setup' indexes text columns "
+                        "of a table (fts: tsvector full-text, trgm: pg_trgm fuzzy/substring), 'search' returns the best "
+                        "matching rows, 'list' shows search indexes, 'drop' removes one",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string", "enum": ["search", "setup", "list", "drop"], "default": "search"},
+                    "table": {"type": "string", "description": "Table name"},
+                    "query": {"type": "string", "description": "Search text; fts accepts \"phrases\", or, -word (search)"},
+                    "columns": {"type": "array", "items": {"type": "string"}, "description": "Text columns to index (setup)"},
+                    "kind": {"type": "string", "enum": ["fts", "trgm"], "description": "Index kind (setup/drop; search prefers fts)"},
+                    "language": {"type": "string", "description": "Text search configuration for fts (setup)", "default": "english"},
+                    "limit": {"type": "integer", "description": "Max rows (search)", "default": 20}
+                }
+            }
+        ),
+        Tool(
+            name="db_top_queries",
+            description="Slowest and most frequent statements from pg_stat_statements, plus the in-process slow-query log",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "order_by": {"type": "string", "enum": ["total_time", "mean_time", "calls", "rows", "blocks_read"],
+                                 "description": "Sort key", "default": "total_time"},
+                    "limit": {"type": "integer", "description": "Max statements per list", "default": 10}
+                }
+            }
+        ),
+        Tool(
+            name="db_index_advice",
+            description="Propose indexes for recorded workload statements from their EXPLAIN plans "
+                        "(hypopg-verified when installed). Returns CREATE INDEX statements to review; nothing is applied",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "source": {"type": "string", "enum": ["workload", "pg_stat_statements"],
+                               "description": "Statements recorded by this server or by pg_stat_statements", "default": "workload"},
+                    "max_statements": {"type": "integer", "description": "Max statements to analyze", "default": 50}
+                }
+            }
+        ),
+        Tool(
+            name="db_export",
+            description="Stream a query or table to a local CSV or Parquet file; returns row count, bytes and file path, not the data",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "filename": {"type": "string", "description": "Output file name inside the export directory"},
+                    "query": {"type": "string", "description": "SQL SELECT query to export (or use table)"},
+                    "table": {"type": "string", "description": "Table to export (or use query)"},
+                    "format": {"type": "string", "enum": ["csv", "parquet"], "description": "File format", "default": "csv"}
+                },
+                "required": ["filename"]
+            }
+        ),
+        Tool(
+            name="db_matview",
+            description="Manage materialized views for recurring aggregate queries: 'create' precomputes a SELECT "
+                        "(optionally refreshed every refresh_seconds by the server), 'list' shows views with columns and "
+                        "last refresh, 'refresh' recomputes one (CONCURRENTLY when unique_columns were given), 'drop' removes one",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string", "enum": ["create", "list", "refresh", "drop"], "default": "list"},
+                    "name": {"type": "string", "description": "View name (create/refresh/drop)"},
+                    "query": {"type": "string", "description": "SELECT defining the view (create)"},
+                    "description": {"type": "string", "description": "What the view answers, shown to the agent (create)"},
+                    "refresh_seconds": {"type": "integer", "description": "Scheduled refresh interval, 0 = manual only (create)", "default": 0},
+                    "unique_columns": {"type": "array", "items": {"type": "string"},
+                                       "description": "Columns unique per row; enables non-blocking concurrent refresh (create)"},
+                    "concurrently": {"type": "boolean", "description": "Force or disable concurrent refresh (refresh, optional)"}
+                }
+            }
+        ),
+        Tool(
+            name="db_watch",
+            description="Watch a table for row changes via LISTEN/NOTIFY instead of polling. 'start' installs a trigger and "
+                        "returns a changes:// resource to subscribe to; 'poll' waits for events after a sequence number; "
+                        "'stop' removes the trigger",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "table": {"type": "string", "description": "Table to watch"},
+                    "action": {"type": "string", "enum": ["start", "poll", "stop"], "default": "start"},
+                    "after": {"type": "integer", "description": "poll: return events with seq greater than this", "default": 0},
+                    "wait_seconds": {"type": "number", "description": "poll: wait up to this long (max 30) for new events", "default": 0},
+                    "limit": {"type": "integer", "description": "poll: max events returned", "default": 100}
+                },
+                "required": ["table"]
+            }
+        ),
+        Tool(
+            name="server_stats",
+            description="Server metrics: per-tool latency percentiles, rows/bytes returned, errors, cache hits, pool stats, LLM queue depth and warm-up readiness",
+            inputSchema={"type": "object", "properties": {}}
+        ),
         Tool(
             name="agent_query",
             description="Ask the LangGraph agent a question (uses Ollama LLM with database access)",
@@ -109,16 +294,191 @@ async def list_tools() -> List[Tool]:
                 "type": "object",
                 "properties": {
                     "question": {"type": "string", "description": "Question to ask the agent"},
-                    "thread_id": {"type": "string", "description": "Conversation thread ID (optional)", "default": "default"}
+                    "thread_id": {"type": "string", "description": "Conversation thread ID (optional)", "default": "default"},
+                    "timeout_seconds": {"type": "number", "description": "Deadline for this turn in seconds (optional)"},
+                    "max_tool_hops": {"type": "integer", "description": "Max tool round trips for this turn (optional)"},
+                    "priority": {"type": "string", "enum": ["interactive", "batch"], "description": "Queue priority of this turn's LLM requests; batch waits behind interactive", "default": "interactive"},
+                    "include_stats": {"type": "boolean", "description": "Return JSON with response and timing breakdown", "default": False}
                 },
                 "required": ["question"]
             }
         )
     ]
     
+    # Every tool except server_stats can be routed to a named database profile
+    database_property = {
+        "type": "string",
+        "enum": db_tools.database_names(),
+        "description": "Database profile to run against (optional)",
+        "default": config.DEFAULT_DATABASE
+    }
+    for tool in tools_list:
+        if tool.name != "server_stats":
+            tool.inputSchema["properties"]["database"] = database_property
+    
     print(f"----------------- listed {len(tools_list)} tools, ---------")
     return tools_list
 
+print("="*40)
+# Result Resources
+print("="*40)
+
+# db_query results over MCP_INLINE_MAX_ROWS are spilled to the result store and returned as a preview
+# plus results://<handle>, read back by slice (at most RESULT_PAGE_MAX_ROWS rows per read) until the TTL
+RESULT_PAGE_MAX_ROWS = 1000
+RESULT_PREVIEW_ROWS = 20
+
+def result_uri(handle: str) -> str:
+    """MCP resource URI of a stored result."""
+    return f"results://{handle}"
+
+def spill_result(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Store a large result and describe it. Returns row count, columns, preview rows and resource URI."""
+    handle = result_renderer.store_result(rows)
+    return {
+        "row_count": len(rows),
+        "columns": list(rows[0].keys()),
+        "handle": handle,
+        "resource": result_uri(handle),
+        "expires_in_seconds": config.RESULT_TTL_SECONDS,
+        "summary": result_renderer.summarize_rows(rows).splitlines(),
+        "preview": rows[:RESULT_PREVIEW_ROWS],
+        "note": f"Showing {RESULT_PREVIEW_ROWS} of {len(rows)} rows; read the resource with ?offset=&limit= "
+                f"or call db_fetch_result for more",
+    }
+
+def read_result_page(handle: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """Read one slice of a stored result. Returns rows with offset, total and next_offset."""
+    limit = max(1, min(limit, RESULT_PAGE_MAX_ROWS))
+    found = result_renderer.read_rows(handle, offset, limit)
+    if found is None:
+        raise ValueError(f"Result '{handle}' not found or expired; re-run the query")
+    rows, total = found
+    offset = min(max(offset, 0), total)
+    next_offset = offset + len(rows)
+    return {
+        "handle": handle,
+        "offset": offset,
+        "total": total,
+        "rows": rows,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+
+print("="*40)
+# Change Stream Resources
+print("="*40)
+
+# changes://<table> resources of watched tables; subscribed sessions get resources/updated
+# notifications pushed from the change-feed listener thread onto their event loop
+_resource_subscriptions: Dict[str, List[Tuple[Any, asyncio.AbstractEventLoop]]] = {}
+_pending_updates: set = set()
+_subscription_lock = threading.Lock()
+
+@server.list_resources()
+async def list_resources() -> List[Resource]:
+    """List change streams of watched tables and stored query results."""
+    # Watched tables come from the database (off the event loop); when it is unreachable only the
+    # stored results, which are local files, are listed
+    try:
+        watched = await asyncio.to_thread(change_feed.watched_tables)
+    except Exception as e:
+        print(f"ERROR: Listing change streams failed: {e}")
+        watched = []
+    streams = [
+        Resource(
+            uri=change_feed.resource_uri(table),
+            name=f"{table} changes",
+            description=f"Recent row changes of {table}; read with ?after=<seq> for newer events only",
+            mimeType="application/json"
+        )
+        for table in watched
+    ]
+    results = [
+        Resource(
+            uri=result_uri(r["handle"]),
+            name=f"query result {r['handle']}",
+            description=f"{r['row_count']} rows ({', '.join(r['columns'])}); read slices with ?offset=<n>&limit=<n>, "
+                        f"expires in {r['expires_in_seconds']:.0f}s unless read",
+            mimeType="application/json"
+        )
+        for r in result_renderer.list_results()
+    ]
+    return streams + results
+
+@server.read_resource()
+async def read_resource(uri: AnyUrl) -> List[ReadResourceContents]:
+    """Read buffered events of a change stream or a slice of a stored result. Returns JSON."""
+    parsed = urlparse(str(uri))
+    query = parse_qs(parsed.query)
+    if parsed.scheme == "changes":
+        after = int(query.get("after", ["0"])[0])
+        content = change_feed.events_since(parsed.netloc, after)
+    elif parsed.scheme == "results":
+        content = read_result_page(parsed.netloc, int(query.get("offset", ["0"])[0]),
+                                   int(query.get("limit", ["100"])[0]))
+    else:
+        raise ValueError(f"Unknown resource {uri}")
+    return [ReadResourceContents(content=json.dumps(content, default=str), mime_type="application/json")]
+
+@server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """Register the calling session for updates of a change stream."""
+    uri_text = str(uri).split("?")[0]
+    with _subscription_lock:
+        _resource_subscriptions.setdefault(uri_text, []).append(
+            (server.request_context.session, asyncio.get_running_loop()))
+    print(f"----------------- session subscribed to {uri_text}, ---------")
+
+@server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    """Remove the calling session from a change stream."""
+    session = server.request_context.session
+    with _subscription_lock:
+        targets = _resource_subscriptions.get(str(uri).split("?")[0], [])
+        targets[:] = [t for t in targets if t[0] is not session]
+
+async def _send_resource_updated(uri: str, targets: List[Tuple[Any, asyncio.AbstractEventLoop]]) -> None:
+    # Sends one notification per burst of changes; clients read the resource for the events
+    with _subscription_lock:
+        _pending_updates.discard(uri)
+    for session, _ in targets:
+        try:
+            await session.send_resource_updated(AnyUrl(uri))
+        except Exception as e:
+            print(f"ERROR: Failed to notify subscriber of {uri}: {e}")
+
+def notify_resource_subscribers(table: str, event: Dict[str, Any]) -> None:
+    """Change-feed callback: schedule a resources/updated notification unless one is already pending."""
+    uri = change_feed.resource_uri(table)
+    with _subscription_lock:
+        targets = list(_resource_subscriptions.get(uri, ()))
+        if not targets or uri in _pending_updates:
+            return
+        _pending_updates.add(uri)
+    asyncio.run_coroutine_threadsafe(_send_resource_updated(uri, targets), targets[0][1])
+
+change_feed.add_subscriber(notify_resource_subscribers)
+
+print("="*40)
+# Call Log
+print("="*40)
+
+# Incoming call_tool requests appended to MCP_CALL_LOG as {"at", "tool", "arguments"} lines
+_call_log_handle = None
+_call_log_lock = threading.Lock()
+
+def record_call(name: str, arguments: Dict[str, Any]) -> None:
+    """Append one call_tool request to the call log, if MCP_CALL_LOG is set."""
+    global _call_log_handle
+    if not config.MCP_CALL_LOG:
+        return
+    line = json.dumps({"at": round(time.time(), 3), "tool": name, "arguments": arguments}, default=str)
+    with _call_log_lock:
+        if _call_log_handle is None:
+            _call_log_handle = open(config.MCP_CALL_LOG, "a", encoding="utf-8")
+        _call_log_handle.write(line + "\n")
+        _call_log_handle.flush()
+
 print("="*40)
 # call_tool_handler
 print("="*40)
@@ -126,20 +486,65 @@ print("="*40)
 @server.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool execution requests. Returns list of TextContent with results."""
-    # Routes tool calls to appropriate handlers
+    record_call(name, arguments)
+    # Root span of everything a tool call does (agent turn, LLM hops, SQL); the tool name
+    # is also attributed to any slow statement it runs; the database argument routes all of it
+    tool_token = db_tools.current_tool.set(name)
+    database_token = db_tools.current_database.set(arguments.get("database") or None)
+    try:
+        with tracing.span("mcp.call_tool", tool=name, database=arguments.get("database") or config.DEFAULT_DATABASE):
+            return await dispatch_tool(name, arguments)
+    finally:
+        db_tools.current_database.reset(database_token)
+        db_tools.current_tool.reset(tool_token)
+
+# Worker threads for the blocking tool handlers (asyncio's default executor is sized by CPU count)
+_tool_executor = ThreadPoolExecutor(max_workers=config.MCP_TOOL_WORKERS, thread_name_prefix="mcp-tool")
+
+async def dispatch_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Run a tool call on a worker thread. Returns list of TextContent with results."""
+    # Handlers block on SQL, model calls and long-polls; running them off the event loop keeps
+    # concurrent calls of all clients and resource notifications going. Like asyncio.to_thread the
+    # call runs in a copy of the context, so current_tool, the database and the trace span follow it
+    context = copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_tool_executor, context.run, run_tool, name, arguments)
+
+def run_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Route a tool call to its handler. Returns list of TextContent with results."""
+    # Routes tool calls to appropriate handlers (blocking; called through dispatch_tool)
     print(f"#===============[ call_tool: {name} ]==========")
+    start = time.perf_counter()
     
     try:
         result = ""
+        # Unknown database names fail here instead of at the first query
+        db_tools.resolve_database()
         
         if name == "db_query":
             query = arguments.get("query", "")
             results = db_tools.execute_query(query)
-            result = json.dumps(results, indent=2)
+            if len(results) > config.MCP_INLINE_MAX_ROWS:
+                result = json.dumps(spill_result(results), indent=2, default=str)
+            else:
+                result = json.dumps(results, indent=2, default=str)
+            
+        elif name == "db_fetch_result":
+            page = read_result_page(arguments.get("handle", ""), int(arguments.get("offset", 0)),
+                                    int(arguments.get("limit", 100)))
+            result = json.dumps(page, indent=2)
             
         elif name == "db_list_tables":
             tables = db_tools.list_tables()
-            result = json.dumps({"tables": tables}, indent=2)
+            # Precomputed aggregates are advertised next to the tables so clients query them instead
+            views = [
+                {"name": v["name"], "description": v["description"], "columns": v["columns"]}
+                for v in matviews.list_views()
+            ]
+            searchable = [
+                {"table": i["table_name"], "kind": i["kind"], "columns": i["columns"]}
+                for i in text_search.list_search_indexes()
+            ]
+            result = json.dumps({"tables": tables, "materialized_views": views, "searchable": searchable}, indent=2)
             
         elif name == "db_describe":
             table_name = arguments.get("table_name", "")
@@ -153,6 +558,15 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             row_id = db_tools.insert_record(table, data_dict)
             result = json.dumps({"success": True, "id": row_id}, indent=2)
             
+        elif name == "db_upsert":
+            counts = db_tools.upsert_records(
+                arguments.get("table", ""),
+                json.loads(arguments.get("rows", "[]")),
+                arguments.get("conflict_columns", []),
+                arguments.get("update_columns")
+            )
+            result = json.dumps({"success": True, **counts}, indent=2)
+            
         elif name == "db_update":
             table = arguments.get("table", "")
             record_id = arguments.get("record_id", 0)
@@ -167,19 +581,130 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             success = db_tools.delete_record(table, record_id)
             result = json.dumps({"success": success}, indent=2)
             
+        elif name == "db_table_stats":
+            stats = db_tools.table_stats(arguments.get("table_name") or None)
+            result = json.dumps(stats, indent=2, default=str)
+            
+        elif name == "db_sample":
+            sample = db_tools.sample_table(
+                arguments.get("table", ""),
+                int(arguments.get("rows", 100)),
+                arguments.get("method", "system"),
+                arguments.get("seed")
+            )
+            result = json.dumps(sample, indent=2, default=str)
+            
+        elif name == "db_search":
+            action = arguments.get("action", "search")
+            table = arguments.get("table", "")
+            if action == "search":
+                found = text_search.search(table, arguments.get("query", ""), int(arguments.get("limit", 20)),
+                                           arguments.get("kind"))
+                result = json.dumps(found, indent=2, default=str)
+            elif action == "setup":
+                index = text_search.create_search_index(table, arguments.get("columns", []),
+                                                        arguments.get("kind", "fts"), arguments.get("language", "english"))
+                result = json.dumps(index, indent=2)
+            elif action == "list":
+                result = json.dumps({"indexes": text_search.list_search_indexes(table or None)}, indent=2)
+            elif action == "drop":
+                result = json.dumps({"dropped": text_search.drop_search_index(table, arguments.get("kind", "fts"))}, indent=2)
+            else:
+                raise ValueError(f"Unknown db_search action '{action}', use search, setup, list or drop")
+            
+        elif name == "db_top_queries":
+            limit = int(arguments.get("limit", 10))
+            insights = db_tools.top_queries(arguments.get("order_by", "total_time"), limit)
+            insights["slow_queries"] = db_tools.slow_queries(limit)
+            result = json.dumps(insights, indent=2, default=str)
+            
+        elif name == "db_index_advice":
+            advice = index_advisor.advise(
+                arguments.get("source", "workload"),
+                int(arguments.get("max_statements", 50))
+            )
+            result = json.dumps(advice, indent=2, default=str)
+            
+        elif name == "db_export":
+            export = db_tools.export_query(
+                arguments.get("filename", ""),
+                query=arguments.get("query"),
+                table=arguments.get("table"),
+                fmt=arguments.get("format", "csv")
+            )
+            result = json.dumps(export, indent=2)
+            
+        elif name == "db_matview":
+            action = arguments.get("action", "list")
+            view_name = arguments.get("name", "")
+            if action == "create":
+                view = matviews.create_view(
+                    view_name,
+                    arguments.get("query", ""),
+                    arguments.get("description", ""),
+                    int(arguments.get("refresh_seconds", 0)),
+                    arguments.get("unique_columns")
+                )
+                result = json.dumps(view, indent=2, default=str)
+            elif action == "list":
+                result = json.dumps({"views": matviews.list_views()}, indent=2, default=str)
+            elif action == "refresh":
+                result = json.dumps(matviews.refresh_view(view_name, arguments.get("concurrently")), indent=2)
+            elif action == "drop":
+                result = json.dumps({"dropped": matviews.drop_view(view_name)}, indent=2)
+            else:
+                raise ValueError(f"Unknown db_matview action '{action}', use create, list, refresh or drop")
+            
+        elif name == "db_watch":
+            table = arguments.get("table", "")
+            action = arguments.get("action", "start")
+            if action == "start":
+                watch = change_feed.watch(table)
+            elif action == "poll":
+                # Long-poll waits on the in-memory buffer (in the worker thread of this call)
+                wait_seconds = min(float(arguments.get("wait_seconds", 0)), 30.0)
+                watch = change_feed.events_since(
+                    table, int(arguments.get("after", 0)), wait_seconds, int(arguments.get("limit", 100))
+                )
+            elif action == "stop":
+                watch = {"table": table, "stopped": change_feed.unwatch(table)}
+            else:
+                raise ValueError(f"Unknown db_watch action '{action}'")
+            result = json.dumps(watch, indent=2, default=str)
+            
+        elif name == "server_stats":
+            stats = metrics.snapshot()
+            stats["pool"] = db_tools.pool_stats()
+            stats["llm"] = llm_scheduler.scheduler_stats()
+            stats["warmup"] = warmup.warmup_status()
+            result = json.dumps(stats, indent=2)
+            
         elif name == "agent_query":
             question = arguments.get("question", "")
             thread_id = arguments.get("thread_id", "default")
-            response = langgraph_agent.run_agent(question, thread_id)
-            result = response
+            turn = langgraph_agent.run_agent_turn(
+                question,
+                thread_id,
+                timeout_seconds=arguments.get("timeout_seconds"),
+                max_tool_hops=arguments.get("max_tool_hops"),
+                priority=arguments.get("priority", "interactive")
+            )
+            if arguments.get("include_stats", False):
+                result = json.dumps(turn, indent=2)
+            else:
+                result = turn["response"]
             
         else:
             result = json.dumps({"error": f"Unknown tool: {name}"}, indent=2)
         
+        metrics.observe("mcp_tool_seconds", time.perf_counter() - start, tool=name)
+        metrics.observe("mcp_tool_response_bytes", len(result), tool=name)
         print(f"----------------- tool '{name}' executed successfully, ---------")
         return [TextContent(type="text", text=result)]
         
     except Exception as e:
+        metrics.observe("mcp_tool_seconds", time.perf_counter() - start, tool=name)
+        metrics.increment("mcp_tool_errors_total", tool=name)
         error_msg = f"Error executing tool '{name}': {str(e)}"
         print(f"ERROR: {error_msg}")
         return [TextContent(type="text", text=json.dumps({"error": error_msg}, indent=2))]
@@ -203,17 +728,35 @@ async def main():
         print("ERROR: Database connection test failed")
         return
     
+    # Optional Prometheus scrape endpoint; GET /ready answers 503 until warm-up has finished
+    metrics.set_readiness_check(warmup.is_ready)
+    if config.METRICS_PORT:
+        metrics.start_http_server(config.METRICS_PORT)
+    
     print("----------------- MCP server starting with stdio transport, ---------")
+    sys.stdout.flush()
     
-    # Run server with stdio transport
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # Run server with stdio transport; from here on stdout carries JSON-RPC only and status
+    # prints go to stderr, so concurrent calls cannot interleave them with protocol messages
+    # Change-stream resources support subscriptions; the SDK does not advertise that by itself
+    init_options = server.create_initialization_options()
+    init_options.capabilities.resources.subscribe = True
     
-    print("#===============[ process completed ]==========")
+    async with stdio_server() as (read_stream, write_stream):
+        with redirect_stdout(sys.stderr):
+            # Scheduled REFRESH of managed materialized views (MATVIEW_REFRESH_TICK=0 disables)
+            matviews.start_scheduler()
+            # Tables watched before a restart keep their triggers; listen for them again
+            change_feed.resume_listener()
+            # Background warm-up (WARMUP_ENABLED=false skips it): pool prefill, schema catalog,
+            # graph compile and optional LLM prime; requests are served meanwhile
+            warmup.start_warmup()
+            await server.run(
+                read_stream,
+                write_stream,
+                init_options
+            )
+            print("#===============[ process completed ]==========")
 
 if __name__ == "__main__":
     print("#===============[ start_of_main_process ]==========")
@@ -221,6 +764,12 @@ if __name__ == "__main__":
 
 # EXPLANATION
 # Purpose: MCP server implementing Model Context Protocol for PostgreSQL access with LangGraph agent
-# Main functions: list_tools -> returns available MCP tools, call_tool -> executes tool requests,
+# Main functions: list_tools -> returns available MCP tools, call_tool -> traced entry point,
+#                 dispatch_tool -> runs run_tool (the blocking tool handlers) off the event loop, record_call -> optional JSONL call log for replay,
 #                 main -> starts server with stdio transport
+#                 server_stats -> metrics snapshot with per-database pool stats, LLM queue state and warm-up status,
+#                 list/read/subscribe_resource -> changes://<table> streams fed by db_watch (change_feed)
+#                 and results://<handle> slices of large db_query results (spill_result/read_result_page),
+#                 db_matview -> materialized view manager (matviews), refreshed on a schedule while serving,
+#                 db_search -> ranked full-text / trigram search over managed GIN indexes (text_search)
 # Notable vars: server -> MCP Server instance, tools_list -> available database and agent operations
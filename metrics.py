@@ -0,0 +1,188 @@
+#################################
+#         metrics.py
+#################################
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Any, Optional, Tuple
+import config
+print("----------------- threading, time imports completed or connected, ---------")
+print("----------------- collections, contextlib imports completed or connected, ---------")
+print("----------------- http.server import completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+
+print("="*40)
+# Registry
+print("="*40)
+
+# Metric series are keyed by (name, sorted label items). Histograms keep a cumulative count/sum
+# plus a sliding window of the last METRICS_WINDOW samples used for percentiles
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_counters: Dict[SeriesKey, float] = {}
+_histograms: Dict[SeriesKey, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _key(name: str, labels: Dict[str, Any]) -> SeriesKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def increment(name: str, amount: float = 1, **labels) -> None:
+    """Add amount to a counter series."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one sample in a histogram series."""
+    key = _key(name, labels)
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = {"count": 0, "sum": 0.0, "window": deque(maxlen=config.METRICS_WINDOW)}
+            _histograms[key] = series
+        series["count"] += 1
+        series["sum"] += value
+        series["window"].append(value)
+
+@contextmanager
+def timer(name: str, **labels):
+    """Time the wrapped block in seconds and record it in a histogram series."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def reset() -> None:
+    """Drop all recorded series."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+print("="*40)
+# snapshot
+print("="*40)
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank quantile of an already sorted sample window
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def _series_name(key: SeriesKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+def snapshot() -> Dict[str, Any]:
+    """Get current counters and histogram summaries. Returns JSON-serializable dict."""
+    with _lock:
+        counters = {_series_name(k): v for k, v in _counters.items()}
+        histograms = {}
+        for key, series in _histograms.items():
+            window = sorted(series["window"])
+            summary = {
+                "count": series["count"],
+                "sum": round(series["sum"], 6),
+                "mean": round(series["sum"] / series["count"], 6) if series["count"] else 0.0,
+                "max": round(window[-1], 6) if window else 0.0,
+            }
+            for q in QUANTILES:
+                summary[f"p{int(q * 100)}"] = round(_quantile(window, q), 6)
+            histograms[_series_name(key)] = summary
+    return {"counters": counters, "histograms": histograms}
+
+print("="*40)
+# prometheus_text
+print("="*40)
+
+def _prom_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in items]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+def prometheus_text() -> str:
+    """Render all series in Prometheus text exposition format. Histograms are exported as summaries."""
+    lines: List[str] = []
+    with _lock:
+        typed = set()
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_prom_labels(labels)} {value}")
+        for (name, labels), series in sorted(_histograms.items(), key=lambda item: item[0]):
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            window = sorted(series["window"])
+            for q in QUANTILES:
+                lines.append(f"{name}{_prom_labels(labels, {'quantile': str(q)})} {_quantile(window, q)}")
+            lines.append(f"{name}_sum{_prom_labels(labels)} {series['sum']}")
+            lines.append(f"{name}_count{_prom_labels(labels)} {series['count']}")
+    return "\n".join(lines) + "\n"
+
+print("="*40)
+# start_http_server
+print("="*40)
+
+# Optional readiness probe for GET /ready (200 when it returns True, 503 otherwise), set by the server
+_readiness_check: Optional[Callable[[], bool]] = None
+
+def set_readiness_check(check: Optional[Callable[[], bool]]) -> None:
+    """Register the callable answering GET /ready."""
+    global _readiness_check
+    _readiness_check = check
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics in Prometheus text format and GET /ready readiness probes."""
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/ready":
+            ready = _readiness_check is None or _readiness_check()
+            body = b"ready\n" if ready else b"warming up\n"
+            self.send_response(200 if ready else 503)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if path != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the server output
+        pass
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics on a daemon thread. Returns the running HTTP server."""
+    print("#===============[ start_metrics_server ]==========")
+    httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"----------------- metrics endpoint listening on {host}:{port}/metrics, ---------")
+    return httpd
+
+# EXPLANATION
+# Purpose: In-process metrics registry for latency, row/byte counts, errors, cache hits and pool waits
+# Main functions: increment -> counters, observe/timer -> histograms with p50/p95/p99 over a sliding window,
+#                 snapshot -> JSON summary for server_stats, prometheus_text/start_http_server -> /metrics,
+#                 set_readiness_check -> answers /ready on the same endpoint
+# Notable vars: _counters, _histograms -> series keyed by name and labels, QUANTILES -> reported percentiles
@@ -0,0 +1,250 @@
+#################################
+#         result_renderer.py
+#################################
+
+import atexit
+import csv
+import io
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+import config
+import metrics
+print("----------------- atexit, csv, io, json, mmap, os, shutil, tempfile imports completed or connected, ---------")
+print("----------------- threading, time, uuid, array imports completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+
+print("="*40)
+# Result Store
+print("="*40)
+
+# Full results of oversized queries, keyed by handle. Rows are spilled to a JSON-lines file with a
+# row offset index and read back by slice through a memory map, so neither the store nor a read
+# holds the whole result in memory. Handles expire RESULT_TTL_SECONDS after last access; at most
+# RESULT_STORE_SIZE are kept, least recently used evicted first
+_result_store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_store_lock = threading.Lock()
+_spill_dir: Optional[str] = None
+
+def _get_spill_dir() -> str:
+    # Per-process directory under RESULT_SPILL_DIR (or the system temp dir), removed at exit
+    global _spill_dir
+    if _spill_dir is None:
+        if config.RESULT_SPILL_DIR:
+            os.makedirs(config.RESULT_SPILL_DIR, exist_ok=True)
+        _spill_dir = tempfile.mkdtemp(prefix="mcp_results_", dir=config.RESULT_SPILL_DIR or None)
+        atexit.register(shutil.rmtree, _spill_dir, True)
+    return _spill_dir
+
+def _evict_locked(now: float) -> None:
+    # Drops expired handles and the least recently used ones past the store size; caller holds _store_lock
+    expired = [h for h, e in _result_store.items() if now - e["accessed"] > config.RESULT_TTL_SECONDS]
+    for handle in expired:
+        _remove_locked(handle)
+    while len(_result_store) > config.RESULT_STORE_SIZE:
+        _remove_locked(next(iter(_result_store)))
+
+def _remove_locked(handle: str) -> None:
+    entry = _result_store.pop(handle)
+    try:
+        os.remove(entry["path"])
+    except OSError:
+        pass
+    metrics.increment("result_store_evictions_total")
+
+def store_result(rows: List[Dict[str, Any]]) -> str:
+    """Keep full query result for later retrieval. Returns result handle."""
+    # Writes rows to the spill file and evicts expired or oldest results past the store size
+    handle = f"r_{uuid.uuid4().hex[:8]}"
+    path = os.path.join(_get_spill_dir(), f"{handle}.jsonl")
+    offsets = array("Q")
+    with open(path, "wb") as f:
+        for row in rows:
+            offsets.append(f.tell())
+            f.write(json.dumps(row, default=str).encode("utf-8") + b"\n")
+        size = f.tell()
+    offsets.append(size)
+    now = time.monotonic()
+    entry = {
+        "path": path,
+        "offsets": offsets,
+        "row_count": len(rows),
+        "columns": list(rows[0].keys()) if rows else [],
+        "bytes": size,
+        "accessed": now,
+    }
+    with _store_lock:
+        _result_store[handle] = entry
+        _evict_locked(now)
+    metrics.observe("result_store_spilled_bytes", size)
+    print(f"----------------- result stored as {handle} ({len(rows)} rows, {size} bytes), ---------")
+    return handle
+
+def _touch(handle: str) -> Optional[Dict[str, Any]]:
+    # Looks up a live handle and renews its TTL
+    now = time.monotonic()
+    with _store_lock:
+        _evict_locked(now)
+        entry = _result_store.get(handle)
+        if entry is not None:
+            entry["accessed"] = now
+            _result_store.move_to_end(handle)
+    metrics.increment("result_store_requests_total", result="hit" if entry is not None else "miss")
+    return entry
+
+def result_info(handle: str) -> Optional[Dict[str, Any]]:
+    """Get row count, columns, size and expiry of a stored result. Returns None if unknown or expired."""
+    entry = _touch(handle)
+    if entry is None:
+        return None
+    return {
+        "handle": handle,
+        "row_count": entry["row_count"],
+        "columns": entry["columns"],
+        "bytes": entry["bytes"],
+        "expires_in_seconds": config.RESULT_TTL_SECONDS,
+    }
+
+def list_results() -> List[Dict[str, Any]]:
+    """List live stored results with row count, columns and seconds until expiry."""
+    now = time.monotonic()
+    with _store_lock:
+        _evict_locked(now)
+        return [
+            {"handle": h, "row_count": e["row_count"], "columns": e["columns"], "bytes": e["bytes"],
+             "expires_in_seconds": round(config.RESULT_TTL_SECONDS - (now - e["accessed"]), 1)}
+            for h, e in _result_store.items()
+        ]
+
+def read_rows(handle: str, offset: int = 0, limit: int = 100) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """Read rows offset..offset+limit of a stored result. Returns (rows, total rows) or None if unknown or expired."""
+    entry = _touch(handle)
+    if entry is None:
+        return None
+    total = entry["row_count"]
+    offset = min(max(offset, 0), total)
+    end = min(offset + max(limit, 0), total)
+    if end <= offset:
+        return [], total
+    offsets = entry["offsets"]
+    try:
+        with open(entry["path"], "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            chunk = mapped[offsets[offset]:offsets[end]]
+    except (OSError, ValueError):
+        # Evicted by another thread between lookup and read
+        return None
+    return [json.loads(line) for line in chunk.splitlines()], total
+
+print("="*40)
+# Formatting Helpers
+print("="*40)
+
+def parse_columns(columns: str) -> List[str]:
+    """Parse comma-separated column list. Returns list of column names."""
+    return [c.strip() for c in columns.split(",") if c.strip()]
+
+def project_rows(rows: List[Dict[str, Any]], columns: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Keep only selected columns of each row. Returns projected rows."""
+    if not columns:
+        return rows
+    return [{c: row.get(c) for c in columns} for row in rows]
+
+def _format_cell(value: Any) -> str:
+    # Renders a single value compactly and caps very long text
+    if value is None:
+        return ""
+    text = str(value)
+    if len(text) > config.RESULT_MAX_CELL_CHARS:
+        text = text[:config.RESULT_MAX_CELL_CHARS] + "..."
+    return text
+
+def rows_to_csv(rows: List[Dict[str, Any]]) -> str:
+    """Render rows as compact CSV with header line. Returns CSV text."""
+    if not rows:
+        return ""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    header = list(rows[0].keys())
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([_format_cell(row.get(c)) for c in header])
+    return buffer.getvalue()
+
+print("="*40)
+# summarize_rows
+print("="*40)
+
+def summarize_rows(rows: List[Dict[str, Any]]) -> str:
+    """Compute per-column summary statistics. Returns one line per column."""
+    # Reports non-null count, distinct count and min/max where values are comparable
+    if not rows:
+        return ""
+    lines = []
+    for column in rows[0].keys():
+        values = [row.get(column) for row in rows if row.get(column) is not None]
+        distinct = len({v if isinstance(v, (str, int, float, bool)) else str(v) for v in values})
+        line = f"{column}: count={len(values)}, nulls={len(rows) - len(values)}, distinct={distinct}"
+        if values:
+            try:
+                line += f", min={_format_cell(min(values))}, max={_format_cell(max(values))}"
+            except TypeError:
+                pass
+        lines.append(line)
+    return "\n".join(lines)
+
+print("="*40)
+# render_for_llm
+print("="*40)
+
+def render_for_llm(rows: List[Dict[str, Any]], columns: str = "") -> str:
+    """Render query result for the LLM with row cap. Returns compact text."""
+    # Small results are rendered in full as CSV; oversized results are stored under a handle
+    # and rendered as summary statistics plus the first rows
+    projected = project_rows(rows, parse_columns(columns))
+    total = len(projected)
+    if total == 0:
+        return "Query returned 0 rows."
+    if total <= config.RESULT_MAX_ROWS:
+        return f"Query returned {total} rows:\n" + rows_to_csv(projected)
+
+    handle = store_result(rows)
+    shown = projected[:config.RESULT_MAX_ROWS]
+    return (
+        f"Query returned {total} rows (showing first {len(shown)}). "
+        f"Full result handle: {handle} (use db_fetch_result to read more).\n"
+        f"Summary:\n{summarize_rows(projected)}\n"
+        f"First rows:\n{rows_to_csv(shown)}"
+    )
+
+def render_slice(handle: str, offset: int = 0, limit: int = 0, columns: str = "") -> str:
+    """Render a slice of a stored result. Returns compact text or error message."""
+    limit = min(limit or config.RESULT_MAX_ROWS, config.RESULT_MAX_ROWS)
+    offset = max(offset, 0)
+    found = read_rows(handle, offset, limit)
+    if found is None:
+        return f"Error: result handle '{handle}' not found or expired"
+    rows, total = found
+    shown = project_rows(rows, parse_columns(columns))
+    if not shown:
+        return f"No rows at offset {offset} (result has {total} rows)."
+    return (
+        f"Rows {offset}-{offset + len(shown) - 1} of {total} from {handle}:\n"
+        + rows_to_csv(shown)
+    )
+
+# EXPLANATION
+# Purpose: Compact, capped rendering of query results sent back to the LLM
+# Main functions: render_for_llm -> CSV for small results, summary + first rows + handle for large ones,
+#                 render_slice -> reads more rows of a stored result, summarize_rows -> per-column stats
+#                 store_result/read_rows -> spill full results to JSON-lines files and read slices via mmap
+# Notable vars: _result_store -> LRU store of spilled results by handle, bounded by RESULT_STORE_SIZE and RESULT_TTL_SECONDS
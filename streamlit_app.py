@@ -5,6 +5,9 @@
 import streamlit as st
 import pandas as pd
 import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import db_tools
 import langgraph_agent
 import config
@@ -12,6 +15,7 @@ from typing import Dict, Any
 
 print("----------------- streamlit import completed or connected, ---------")
 print("----------------- pandas import completed or connected, ---------")
+print("----------------- threading, concurrent.futures imports completed or connected, ---------")
 
 # Configure page
 st.set_page_config(
@@ -25,10 +29,106 @@ st.set_page_config(
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "thread_id" not in st.session_state:
-    st.session_state.thread_id = "default_streamlit_thread"
+    # One agent conversation per browser session
+    st.session_state.thread_id = f"thread_{uuid.uuid4().hex[:8]}"
+if "pending_turn" not in st.session_state:
+    st.session_state.pending_turn = None
 
 print("#===============[ start_of_main_process ]==========")
 
+# Cached Resources and Data
+# Resources are shared by every session of this process; data is cached with a TTL and
+# cleared explicitly by the refresh buttons, so reruns do not hit the database
+
+@st.cache_resource
+def get_agent_graph():
+    """Get process-wide compiled agent graph."""
+    return langgraph_agent.get_graph()
+
+@st.cache_resource
+def get_db_pool():
+    """Get process-wide database connection pool."""
+    return db_tools.get_pool()
+
+@st.cache_resource
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Get process-wide executor that runs agent turns off the script thread."""
+    return ThreadPoolExecutor(max_workers=config.STREAMLIT_AGENT_MAX_IN_FLIGHT, thread_name_prefix="st-agent")
+
+@st.cache_resource
+def get_agent_slots() -> threading.BoundedSemaphore:
+    """Get process-wide admission limit for running plus queued agent turns."""
+    return threading.BoundedSemaphore(config.STREAMLIT_AGENT_MAX_IN_FLIGHT + config.STREAMLIT_AGENT_MAX_QUEUED)
+
+def submit_agent_turn(prompt: str, thread_id: str):
+    """Submit agent turn to the shared executor. Returns future, or None when the agent is at capacity."""
+    slots = get_agent_slots()
+    if not slots.acquire(blocking=False):
+        return None
+    future = get_agent_executor().submit(langgraph_agent.run_agent, prompt, thread_id)
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+@st.fragment(run_every=1.0)
+def render_pending_turn():
+    """Poll this session's running agent turn and move its answer into the chat history."""
+    future = st.session_state.pending_turn
+    if future is None:
+        return
+    if not future.done():
+        with st.chat_message("assistant"):
+            st.markdown("🤔 Thinking...")
+        return
+    st.session_state.pending_turn = None
+    try:
+        response = future.result()
+    except Exception as e:
+        response = f"Error: {str(e)}"
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    st.rerun()
+
+@st.cache_data(ttl=config.STREAMLIT_CACHE_TTL, show_spinner=False)
+def cached_connection_status() -> bool:
+    """Cached database connection check."""
+    return db_tools.test_connection()
+
+@st.cache_data(ttl=config.STREAMLIT_CACHE_TTL, show_spinner=False)
+def cached_tables() -> list:
+    """Cached list of database tables."""
+    return db_tools.list_tables()
+
+@st.cache_data(ttl=config.STREAMLIT_CACHE_TTL, show_spinner=False)
+def cached_structure(table: str) -> pd.DataFrame:
+    """Cached column structure of a table."""
+    return pd.DataFrame(db_tools.describe_table(table))
+
+@st.cache_data(ttl=config.STREAMLIT_CACHE_TTL, show_spinner=False)
+def cached_table_stats(table: str) -> Dict[str, Any]:
+    """Cached catalog estimates (rows, size, scans) of a table."""
+    stats = db_tools.table_stats(table)
+    return stats[0] if stats else {}
+
+@st.cache_data(ttl=config.STREAMLIT_CACHE_TTL, show_spinner=False)
+def cached_page(table: str, columns: tuple, sort_column, descending: bool,
+                filters: tuple, cursor, limit: int) -> Dict[str, Any]:
+    """Cached keyset-paginated page of a table, fetched server-side as an Arrow table."""
+    return db_tools.fetch_page(table, list(columns) or None, sort_column, descending,
+                               list(filters), cursor, limit, as_arrow=True)
+
+def clear_data_caches():
+    """Drop cached database data so the next run refetches it."""
+    cached_connection_status.clear()
+    cached_tables.clear()
+    cached_structure.clear()
+    cached_table_stats.clear()
+    cached_page.clear()
+
+try:
+    get_db_pool()
+    get_agent_graph()
+except Exception as e:
+    print(f"ERROR: Failed to initialize cached resources: {e}")
+
 # Sidebar
 with st.sidebar:
     st.title("🤖 MCP Config")
@@ -36,7 +136,7 @@ with st.sidebar:
     st.divider()
     
     st.subheader("Database Status")
-    if db_tools.test_connection():
+    if cached_connection_status():
         st.success("Connected to PostgreSQL")
     else:
         st.error("Database Connection Failed")
@@ -54,13 +154,13 @@ with st.sidebar:
     st.divider()
     
     st.subheader("Tools")
-    st.code("db_query\ndb_list_tables\ndb_describe\ndb_insert\ndb_update\ndb_delete")
+    st.code("db_query\ndb_fetch_result\ndb_list_tables\ndb_describe\ndb_table_stats\ndb_sample\ndb_search\ndb_export\ndb_insert\ndb_update\ndb_delete")
     
     st.divider()
     if st.button("Clear Conversation History"):
         st.session_state.messages = []
+        st.session_state.pending_turn = None
         # Generate new thread ID to effectively clear agent memory
-        import uuid
         st.session_state.thread_id = f"thread_{uuid.uuid4().hex[:8]}"
         st.rerun()
 
@@ -80,60 +180,91 @@ with tab_chat:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+    # Running turn of this session is polled in a fragment, so the script thread is never blocked
+    render_pending_turn()
+
     # React to user input
-    if prompt := st.chat_input("Ask about your data (e.g., 'Show me all tables', 'How many users are there?')..."):
-        # Display user message in chat message container
-        st.chat_message("user").markdown(prompt)
+    if prompt := st.chat_input("Ask about your data (e.g., 'Show me all tables', 'How many users are there?')...",
+                               disabled=st.session_state.pending_turn is not None):
         # Add user message to chat history
         st.session_state.messages.append({"role": "user", "content": prompt})
         
-        with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            message_placeholder.markdown("🤔 Thinking...")
-            
-            try:
-                # Call agent
-                response = langgraph_agent.run_agent(prompt, st.session_state.thread_id)
-                
-                # Display response
-                message_placeholder.markdown(response)
-                
-                # Add assistant response to chat history
-                st.session_state.messages.append({"role": "assistant", "content": response})
-                
-            except Exception as e:
-                message_placeholder.error(f"Error: {str(e)}")
+        # Submit agent turn to the shared background executor
+        future = submit_agent_turn(prompt, st.session_state.thread_id)
+        if future is None:
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": "⚠️ The agent is busy with other users right now. Please try again in a moment."
+            })
+        st.session_state.pending_turn = future
+        st.rerun()
 
 with tab_data:
     st.subheader("Quick Data Explorer")
     
     # Refresh button
     if st.button("Refresh Tables"):
+        clear_data_caches()
         st.rerun()
         
     try:
-        tables = db_tools.list_tables()
+        tables = cached_tables()
         if not tables:
             st.info("No tables found in the database.")
         else:
             selected_table = st.selectbox("Select Table", tables)
             
             if selected_table:
-                col1, col2 = st.columns(2)
+                structure = cached_structure(selected_table)
+                stats = cached_table_stats(selected_table)
+                if stats:
+                    met1, met2, met3, met4 = st.columns(4)
+                    met1.metric("Estimated rows", f"{stats['estimated_rows'] or 0:,}")
+                    met2.metric("Total size", stats["total_size"])
+                    met3.metric("Dead tuples", f"{stats['n_dead_tup'] or 0:,}")
+                    met4.metric("Seq / idx scans", f"{stats['seq_scan'] or 0:,} / {stats['idx_scan'] or 0:,}")
+                with st.expander(f"Structure for `{selected_table}`"):
+                    st.dataframe(structure, use_container_width=True)
+                all_columns = structure["column_name"].tolist() if not structure.empty else []
+                
+                # View controls: projection, sorting and a filter are pushed down into SQL
+                ctrl1, ctrl2, ctrl3, ctrl4 = st.columns([3, 2, 1, 1])
+                shown_columns = ctrl1.multiselect("Columns", all_columns, default=all_columns)
+                sort_choice = ctrl2.selectbox("Sort by", ["(primary key)"] + all_columns)
+                descending = ctrl3.checkbox("Descending")
+                page_size = ctrl4.selectbox("Rows per page", [25, 100, 500], index=1)
+                sort_column = None if sort_choice == "(primary key)" else sort_choice
+                
+                flt1, flt2, flt3 = st.columns([2, 1, 2])
+                filter_column = flt1.selectbox("Filter column", ["(none)"] + all_columns)
+                filter_op = flt2.selectbox("Operator", list(db_tools.FILTER_OPERATORS))
+                filter_value = flt3.text_input("Value")
+                filters = ()
+                if filter_column != "(none)" and (filter_value or filter_op in ("is null", "is not null")):
+                    filters = ((filter_column, filter_op, filter_value),)
+                
+                # Stack of page start cursors; changing the view starts again at page 1
+                view_key = (selected_table, tuple(shown_columns), sort_column, descending, page_size, filters)
+                if st.session_state.get("viewer_key") != view_key:
+                    st.session_state.viewer_key = view_key
+                    st.session_state.viewer_cursors = [None]
+                cursors = st.session_state.viewer_cursors
                 
-                with col1:
-                    st.markdown(f"**Structure for `{selected_table}`**")
-                    structure = db_tools.describe_table(selected_table)
-                    st.dataframe(pd.DataFrame(structure), use_container_width=True)
+                page = cached_page(selected_table, tuple(shown_columns), sort_column, descending,
+                                   filters, cursors[-1], page_size)
+                st.caption(f"Page {len(cursors)} · ~{page['estimated_total']:,} rows (estimated)")
+                if page["rows"].num_rows:
+                    st.dataframe(page["rows"], use_container_width=True)
+                else:
+                    st.info("No rows match.")
                 
-                with col2:
-                    st.markdown(f"**Data Preview for `{selected_table}`**")
-                    # Limit preview to 100 rows
-                    data = db_tools.execute_query(f"SELECT * FROM {selected_table} LIMIT 100")
-                    if data:
-                        st.dataframe(pd.DataFrame(data), use_container_width=True)
-                    else:
-                        st.info("Table is empty.")
+                nav1, nav2 = st.columns(2)
+                if nav1.button("◀ Previous", disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+                if nav2.button("Next ▶", disabled=page["next_cursor"] is None):
+                    cursors.append(page["next_cursor"])
+                    st.rerun()
                         
     except Exception as e:
         st.error(f"Error fetching database info: {str(e)}")
@@ -144,5 +275,8 @@ st.caption("Built with Streamlit, LangGraph, Ollama, and MCP")
 
 # EXPLANATION
 # Purpose: Streamlit user interface for the MCP PostgreSQL Agent
-# Main functions: Chat interface for natural language queries, Database Viewer for manual exploration
-# Notable vars: st.session_state.messages -> stores chat history, st.session_state.thread_id -> manages conversation context
+# Main functions: Chat interface for natural language queries, Database Viewer for manual exploration,
+#                 submit_agent_turn/render_pending_turn -> background agent turns with a shared in-flight limit
+#                 cached_* helpers -> TTL-cached table list, structure and keyset-paginated pages
+# Notable vars: st.session_state.messages -> stores chat history, st.session_state.thread_id -> manages conversation context,
+#               st.session_state.pending_turn -> future of the running agent turn
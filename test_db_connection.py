@@ -2,8 +2,12 @@
 #         test_db_connection.py
 #################################
 
+import os
+import pyarrow.parquet as pq
 import db_tools
 import config
+print("----------------- os import completed or connected, ---------")
+print("----------------- pyarrow import completed or connected, ---------")
 print("----------------- db_tools import completed or connected, ---------")
 print("----------------- config import completed or connected, ---------")
 
@@ -92,6 +96,26 @@ print(f"Found {len(results)} records:")
 for row in results:
     print(f"  ID: {row['id']}, Name: {row['name']}, Value: {row['value']}")
 
+print("="*40)
+# Paginated Fetch
+print("="*40)
+
+print("\nPaging through mcp_test two rows at a time, sorted by value...")
+cursor = None
+paged_ids = []
+while True:
+    page = db_tools.fetch_page("mcp_test", columns=["id", "value"], sort_column="value",
+                               cursor=cursor, limit=2)
+    paged_ids.extend(row["id"] for row in page["rows"])
+    cursor = page["next_cursor"]
+    if cursor is None:
+        break
+expected_ids = [row["id"] for row in db_tools.execute_query("SELECT id FROM mcp_test ORDER BY value, id")]
+print(f"Paged {len(paged_ids)} rows, estimated total {page['estimated_total']}")
+if paged_ids != expected_ids:
+    print("ERROR: Paginated fetch returned rows out of order")
+    exit(1)
+
 print("="*40)
 # Update Test
 print("="*40)
@@ -117,6 +141,26 @@ if len(inserted_ids) > 1:
     success = db_tools.delete_record("mcp_test", test_id)
     print(f"Delete success: {success}")
 
+print("="*40)
+# Parquet Export
+print("="*40)
+
+print("\nExporting a query to Parquet in 2-row batches...")
+# The first batch has only NULLs in maybe_int and the NUMERIC column mixes scales across batches
+export_sql = """
+    SELECT CASE WHEN g > 2 THEN g END AS maybe_int,
+           (g * 1.25)::numeric(12,2) AS amount,
+           CASE WHEN g % 2 = 0 THEN g / 3.0 ELSE g END AS ratio
+    FROM generate_series(1, 7) g
+"""
+export = db_tools.export_query("test_export.parquet", query=export_sql, fmt="parquet", chunk_rows=2)
+exported = pq.read_table(export["path"])
+print(f"Exported {export['rows']} rows, schema: {', '.join(f'{f.name} {f.type}' for f in exported.schema)}")
+if exported.num_rows != 7 or exported.column("maybe_int").null_count != 2:
+    print("ERROR: Parquet export lost or mistyped rows")
+    exit(1)
+os.remove(export["path"])
+
 print("="*40)
 # Final Count
 print("="*40)
@@ -130,5 +174,6 @@ print("\n✓ All database operations completed successfully!")
 
 # EXPLANATION
 # Purpose: Test script for PostgreSQL database connection and operations
-# Main functions: Tests connection, creates table, inserts/updates/deletes records, queries data
+# Main functions: Tests connection, creates table, inserts/updates/deletes records, queries and pages data,
+#                 exports a multi-batch query to Parquet
 # Notable vars: test_data -> sample records for testing, inserted_ids -> tracks created record IDs
@@ -0,0 +1,170 @@
+#################################
+#         text_search.py
+#################################
+
+import json
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from typing import Dict, List, Any, Optional
+import db_tools
+print("----------------- json import completed or connected, ---------")
+print("----------------- psycopg2 import completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+
+print("="*40)
+# Search Indexes
+print("="*40)
+
+# Managed search indexes are expression indexes over the chosen text columns (no table rewrite);
+# their settings are kept as a JSON index comment {"mcp_search": true, "kind", "columns", "language"},
+# and searches rebuild the identical expression so the planner can use the index
+SEARCH_KINDS = ("fts", "trgm")
+TEXT_TYPES = ("text", "character varying", "character")
+
+def _document(columns: List[str]) -> sql.Composable:
+    # coalesce(a, '') || ' ' || coalesce(b, '') over the indexed columns
+    return sql.SQL(" || ' ' || ").join(sql.SQL("coalesce({}, '')").format(sql.Identifier(c)) for c in columns)
+
+def _expression(settings: Dict[str, Any]) -> sql.Composable:
+    # Indexed expression of a search configuration
+    document = _document(settings["columns"])
+    if settings["kind"] == "fts":
+        return sql.SQL("to_tsvector({}::regconfig, {})").format(sql.Literal(settings["language"]), document)
+    return sql.SQL("({})").format(document)
+
+def _index_name(table: str, kind: str) -> str:
+    return f"{table[:48]}_search_{kind}"
+
+def list_search_indexes(table: Optional[str] = None) -> List[Dict[str, Any]]:
+    """List managed search indexes of the current database, optionally of one table."""
+    rows = db_tools.execute_query("""
+        SELECT t.relname AS table_name, i.relname AS index_name, x.indisvalid AS valid,
+               pg_size_pretty(pg_relation_size(i.oid)) AS size,
+               obj_description(i.oid, 'pg_class') AS comment
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public' AND (%s::text IS NULL OR t.relname = %s)
+          AND obj_description(i.oid, 'pg_class') LIKE '{"mcp_search"%%'
+        ORDER BY t.relname, i.relname
+    """, (table, table))
+    indexes = []
+    for row in rows:
+        try:
+            settings = json.loads(row.pop("comment"))
+        except json.JSONDecodeError:
+            continue
+        indexes.append({**row, "kind": settings["kind"], "columns": settings["columns"],
+                        "language": settings.get("language")})
+    return indexes
+
+def create_search_index(table: str, columns: List[str], kind: str = "fts", language: str = "english") -> Dict[str, Any]:
+    """Create a managed GIN search index over text columns of a table. Returns the index as listed."""
+    # fts indexes to_tsvector(language, columns); trgm indexes the concatenated text with gin_trgm_ops
+    # (needs the pg_trgm extension) for fuzzy and substring matches. Built CONCURRENTLY so writes
+    # to the table are not blocked; an existing index of the same kind on the table is replaced
+    print("#===============[ create_search_index ]==========")
+    if kind not in SEARCH_KINDS:
+        raise ValueError(f"Unsupported search kind '{kind}', use one of {', '.join(SEARCH_KINDS)}")
+    if not columns:
+        raise ValueError("At least one text column is required")
+    described = {c["column_name"]: c["data_type"] for c in db_tools.describe_table(table)}
+    if not described:
+        raise ValueError(f"Unknown table '{table}'")
+    for column in columns:
+        if column not in described:
+            raise ValueError(f"Unknown column '{column}'")
+        if described[column] not in TEXT_TYPES:
+            raise ValueError(f"Column '{column}' is {described[column]}, search indexes need text columns")
+
+    settings = {"mcp_search": True, "kind": kind, "columns": columns, "language": language if kind == "fts" else None}
+    name = _index_name(table, kind)
+    opclass = sql.SQL(" gin_trgm_ops") if kind == "trgm" else sql.SQL("")
+    try:
+        with db_tools.get_db_connection() as conn:
+            with conn.cursor() as cur:
+                if kind == "fts":
+                    # Rejects unknown text search configurations before the build starts
+                    cur.execute("SELECT %s::regconfig", (language,))
+                else:
+                    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                    if cur.fetchone() is None:
+                        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except psycopg2.Error as e:
+        reason = e.diag.message_primary or str(e).strip()
+        raise ValueError(f"Cannot create {kind} index: {reason}" + ("; use kind 'fts'" if kind == "trgm" else "")) from e
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with db_tools.get_db_connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)))
+            try:
+                cur.execute(sql.SQL("CREATE INDEX CONCURRENTLY {} ON {} USING gin ({}{})").format(
+                    sql.Identifier(name), sql.Identifier(table), _expression(settings), opclass))
+            except psycopg2.Error:
+                # A failed concurrent build leaves an invalid index behind
+                cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)))
+                raise
+            cur.execute(sql.SQL("COMMENT ON INDEX {} IS {}").format(
+                sql.Identifier(name), sql.Literal(json.dumps(settings))))
+    print(f"----------------- {kind} search index '{name}' created on {table}({', '.join(columns)}), ---------")
+    return next(i for i in list_search_indexes(table) if i["index_name"] == name)
+
+def drop_search_index(table: str, kind: str = "fts") -> bool:
+    """Drop the managed search index of a kind on a table. Returns True if one was dropped."""
+    print("#===============[ drop_search_index ]==========")
+    name = _index_name(table, kind)
+    if not any(i["index_name"] == name for i in list_search_indexes(table)):
+        return False
+    with db_tools.get_db_connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("DROP INDEX CONCURRENTLY {}").format(sql.Identifier(name)))
+    print(f"----------------- search index '{name}' dropped, ---------")
+    return True
+
+print("="*40)
+# search
+print("="*40)
+
+def search(table: str, query: str, limit: int = 20, kind: Optional[str] = None) -> Dict[str, Any]:
+    """Ranked text search of a table through its managed search index. Returns rows with _rank, best first."""
+    # fts matches websearch syntax ("quoted phrases", or, -exclude) ranked by ts_rank; trgm matches
+    # words similar to the query (typos, substrings) ranked by word_similarity
+    print("#===============[ search ]==========")
+    if not query.strip():
+        raise ValueError("Search query is empty")
+    indexes = [i for i in list_search_indexes(table) if i["valid"] and (kind is None or i["kind"] == kind)]
+    if not indexes:
+        raise ValueError(f"No {kind or 'search'} index on '{table}'; create one with db_search action 'setup'")
+    index = min(indexes, key=lambda i: SEARCH_KINDS.index(i["kind"]))
+    expression = _expression(index)
+    if index["kind"] == "fts":
+        statement = sql.SQL(
+            "SELECT t.*, ts_rank({expr}, {tsquery}) AS _rank FROM {table} t "
+            "WHERE {expr} @@ {tsquery} ORDER BY _rank DESC LIMIT %s"
+        ).format(expr=expression, table=sql.Identifier(table),
+                 tsquery=sql.SQL("websearch_to_tsquery({}::regconfig, %s)").format(sql.Literal(index["language"])))
+        params = (query, query, limit)
+    else:
+        statement = sql.SQL(
+            "SELECT t.*, word_similarity(%s, {expr}) AS _rank FROM {table} t "
+            "WHERE %s <%% {expr} ORDER BY _rank DESC LIMIT %s"
+        ).format(expr=expression, table=sql.Identifier(table))
+        params = (query, query, limit)
+    with db_tools.get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(statement, params)
+            rows = [dict(row) for row in cur.fetchall()]
+    print(f"----------------- {index['kind']} search of '{table}' returned {len(rows)} rows, ---------")
+    return {"table": table, "kind": index["kind"], "index": index["index_name"],
+            "columns": index["columns"], "rows": rows}
+
+# EXPLANATION
+# Purpose: Full-text (tsvector + GIN) and trigram (pg_trgm) search over chosen text columns via managed indexes
+# Main functions: create_search_index/drop_search_index -> GIN expression indexes built CONCURRENTLY,
+#                 list_search_indexes -> managed indexes with kind, columns and validity,
+#                 search -> ranked websearch_to_tsquery / word_similarity lookup using the index expression
+# Notable vars: SEARCH_KINDS -> fts, trgm, _expression -> indexed expression shared by build and search
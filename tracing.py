@@ -0,0 +1,155 @@
+#################################
+#         tracing.py
+#################################
+
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Any, Optional
+import config
+print("----------------- hashlib, json, re imports completed or connected, ---------")
+print("----------------- threading, time, uuid imports completed or connected, ---------")
+print("----------------- collections, contextvars imports completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+
+print("="*40)
+# Exporters
+print("="*40)
+
+# Finished spans go to an in-memory ring buffer and, when TRACE_FILE is set, to a JSONL file
+_enabled: bool = config.TRACING_ENABLED
+_buffer: deque = deque(maxlen=config.TRACE_BUFFER_SIZE)
+_trace_file: str = config.TRACE_FILE
+_file_handle = None
+_export_lock = threading.Lock()
+
+def enable(enabled: bool = True, trace_file: Optional[str] = None) -> None:
+    """Turn span recording on or off at runtime, optionally switching the JSONL file."""
+    global _enabled, _trace_file, _file_handle
+    with _export_lock:
+        _enabled = enabled
+        if trace_file is not None and trace_file != _trace_file:
+            if _file_handle is not None:
+                _file_handle.close()
+                _file_handle = None
+            _trace_file = trace_file
+
+def is_enabled() -> bool:
+    """Check if spans are being recorded."""
+    return _enabled
+
+def _export(record: Dict[str, Any]) -> None:
+    global _file_handle
+    with _export_lock:
+        _buffer.append(record)
+        if _trace_file:
+            if _file_handle is None:
+                _file_handle = open(_trace_file, "a", encoding="utf-8")
+            _file_handle.write(json.dumps(record, default=str) + "\n")
+            _file_handle.flush()
+
+def recent_spans(limit: int = 100, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get most recent finished spans, oldest first. Optionally only spans of one trace."""
+    with _export_lock:
+        spans = list(_buffer)
+    if trace_id:
+        spans = [s for s in spans if s["trace_id"] == trace_id]
+    return spans[-limit:]
+
+print("="*40)
+# Span
+print("="*40)
+
+# Innermost open span of the current context; child spans and threads started with
+# copy_context() attach to it
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    """Timed, attributed unit of work nested under the current span of its context."""
+
+    __slots__ = ("name", "attributes", "trace_id", "span_id", "parent_id", "start", "_t0", "_token")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach or overwrite one attribute."""
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = uuid.uuid4().hex[:8]
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self._t0
+        _current_span.reset(self._token)
+        record = {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round(duration * 1000, 3),
+            "status": "error" if exc_type else "ok",
+            "attributes": self.attributes,
+        }
+        if exc_type:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        _export(record)
+        return False
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is disabled; every method does nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str, **attributes):
+    """Open a span as a context manager. Returns a shared no-op span while tracing is disabled."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+print("="*40)
+# sql_fingerprint
+print("="*40)
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_sql(query: str) -> str:
+    """Replace literals with ? and collapse whitespace. Returns normalized SQL text."""
+    return _WHITESPACE_RE.sub(" ", _LITERAL_RE.sub("?", query)).strip().lower()
+
+def sql_fingerprint(query: str) -> str:
+    """Stable short hash of a statement's shape, independent of literal values."""
+    return hashlib.sha1(normalize_sql(query).encode("utf-8")).hexdigest()[:12]
+
+# EXPLANATION
+# Purpose: Lightweight tracing with nested spans across agent turn -> LLM hop / tool call -> SQL
+# Main functions: span -> context-managed Span (no-op when disabled), recent_spans -> ring buffer reader,
+#                 enable -> runtime on/off and JSONL file, sql_fingerprint -> literal-free statement hash
+# Notable vars: _current_span -> parent span of the current context, _buffer -> in-memory ring buffer
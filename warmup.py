@@ -0,0 +1,180 @@
+#################################
+#         warmup.py
+#################################
+
+import threading
+import time
+from langchain_core.messages import HumanMessage
+from typing import Dict, List, Any, Optional
+import config
+import db_tools
+import langgraph_agent
+import llm_scheduler
+import metrics
+print("----------------- threading, time imports completed or connected, ---------")
+print("----------------- langchain import completed or connected, ---------")
+print("----------------- typing import completed or connected, ---------")
+print("----------------- config import completed or connected, ---------")
+print("----------------- db_tools import completed or connected, ---------")
+print("----------------- langgraph_agent import completed or connected, ---------")
+print("----------------- llm_scheduler import completed or connected, ---------")
+print("----------------- metrics import completed or connected, ---------")
+
+print("="*40)
+# Warm-up Steps
+print("="*40)
+
+# Work the first requests would otherwise pay for, done once in the background at startup:
+# pool -> open WARMUP_POOL_CONNECTIONS connections per database (kept in the pool afterwards),
+# schema -> table list and column catalog into the schema cache (kept fresh afterwards by the
+# schema refresher below), graph -> compile the LangGraph
+# graph and build the LLM client, llm -> optional one-token request so the model is loaded
+def _warm_pool() -> Dict[str, Any]:
+    return {"connections": {database: db_tools.prefill_pool(config.WARMUP_POOL_CONNECTIONS, database)
+                            for database in db_tools.database_names()}}
+
+# Column catalogs loaded per database; very wide schemas are left to load on demand
+SCHEMA_WARM_MAX_TABLES = 500
+
+def _warm_schema() -> Dict[str, Any]:
+    tables = {}
+    for database in db_tools.database_names():
+        with db_tools.use_database(database):
+            tables[database] = db_tools.warm_schema_cache(SCHEMA_WARM_MAX_TABLES)
+    start_schema_refresh()
+    return {"tables": tables}
+
+def _warm_graph() -> Dict[str, Any]:
+    langgraph_agent.get_graph()
+    langgraph_agent.get_llm()
+    return {}
+
+def _warm_llm() -> Dict[str, Any]:
+    # Goes through the scheduler at batch priority so it never delays a real interactive request
+    with llm_scheduler.llm_slot("batch"):
+        langgraph_agent.get_llm().invoke([HumanMessage(content="Reply with OK.")])
+    return {}
+
+print("="*40)
+# Schema Refresher
+print("="*40)
+
+# Warmed schema entries expire after SCHEMA_CACHE_TTL like any other, so other processes' DDL still
+# shows up; reloading every catalog at half the TTL keeps lookups hitting without giving that up
+_schema_refresher: Optional[threading.Thread] = None
+_schema_refresh_stop = threading.Event()
+
+def _schema_refresh_loop() -> None:
+    token = db_tools.current_tool.set("schema_refresh")
+    try:
+        while not _schema_refresh_stop.wait(config.SCHEMA_CACHE_TTL / 2):
+            for database in db_tools.database_names():
+                try:
+                    with db_tools.use_database(database):
+                        db_tools.warm_schema_cache(SCHEMA_WARM_MAX_TABLES)
+                except Exception as e:
+                    print(f"ERROR: Schema refresh of database '{database}' failed: {e}")
+    finally:
+        db_tools.current_tool.reset(token)
+
+def start_schema_refresh() -> bool:
+    """Start the background schema catalog reload unless the cache is off (SCHEMA_CACHE_TTL=0). Returns True if running."""
+    global _schema_refresher
+    if config.SCHEMA_CACHE_TTL <= 0:
+        return False
+    if _schema_refresher is None or not _schema_refresher.is_alive():
+        _schema_refresh_stop.clear()
+        _schema_refresher = threading.Thread(target=_schema_refresh_loop, name="schema-refresh", daemon=True)
+        _schema_refresher.start()
+    return True
+
+def stop_schema_refresh() -> None:
+    """Stop the background schema catalog reload."""
+    global _schema_refresher
+    if _schema_refresher is not None:
+        _schema_refresh_stop.set()
+        _schema_refresher.join(timeout=5)
+        _schema_refresher = None
+
+STEPS = (("pool", _warm_pool), ("schema", _warm_schema), ("graph", _warm_graph), ("llm", _warm_llm))
+
+print("="*40)
+# Warm-up State
+print("="*40)
+
+# state: idle -> warming -> ready; ready is also reached when a step fails (the server still works,
+# those first requests are just slower), failed steps keep their error in steps[name]
+_state: Dict[str, Any] = {"state": "idle", "started": None, "seconds": None, "steps": {}}
+_state_lock = threading.Lock()
+_ready = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+def run_warmup(steps: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the warm-up steps in order (all configured ones by default). Returns warm-up status."""
+    print("#===============[ run_warmup ]==========")
+    if steps is None:
+        steps = [name for name, _ in STEPS if name != "llm" or config.WARMUP_PRIME_LLM]
+    start = time.perf_counter()
+    with _state_lock:
+        _state.update({"state": "warming", "started": round(time.time(), 3), "seconds": None, "steps": {}})
+    token = db_tools.current_tool.set("warmup")
+    try:
+        for name, step in STEPS:
+            if name not in steps:
+                continue
+            step_start = time.perf_counter()
+            try:
+                entry = {**step(), "error": None}
+            except Exception as e:
+                print(f"ERROR: Warm-up step '{name}' failed: {e}")
+                entry = {"error": str(e)}
+            elapsed = time.perf_counter() - step_start
+            entry["seconds"] = round(elapsed, 4)
+            metrics.observe("warmup_step_seconds", elapsed, step=name)
+            with _state_lock:
+                _state["steps"][name] = entry
+            print(f"----------------- warm-up step '{name}' done in {elapsed:.2f}s, ---------")
+    finally:
+        db_tools.current_tool.reset(token)
+        elapsed = time.perf_counter() - start
+        with _state_lock:
+            _state["state"] = "ready"
+            _state["seconds"] = round(elapsed, 4)
+        print(f"----------------- warm-up completed in {elapsed:.2f}s, ---------")
+        _ready.set()
+    return warmup_status()
+
+def start_warmup() -> bool:
+    """Start warm-up on a daemon thread unless disabled (WARMUP_ENABLED=false). Returns True if started or done."""
+    global _thread
+    if not config.WARMUP_ENABLED:
+        # Nothing to wait for; report ready straight away
+        with _state_lock:
+            _state["state"] = "ready"
+        _ready.set()
+        return False
+    if _thread is None:
+        _thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+        _thread.start()
+    return True
+
+def is_ready() -> bool:
+    """Check whether warm-up has finished."""
+    return _ready.is_set()
+
+def wait_ready(timeout: Optional[float] = None) -> bool:
+    """Block until warm-up has finished or timeout passes. Returns True when ready."""
+    return _ready.wait(timeout)
+
+def warmup_status() -> Dict[str, Any]:
+    """Get warm-up state with per-step duration and errors. Returns JSON-serializable dict."""
+    with _state_lock:
+        return {**_state, "ready": _ready.is_set(), "steps": {k: dict(v) for k, v in _state["steps"].items()}}
+
+# EXPLANATION
+# Purpose: Background startup warm-up so the first requests run at steady-state latency, plus readiness reporting
+# Main functions: run_warmup -> pool prefill, schema catalog load, graph compile and optional LLM prime, timed per step,
+#                 start_warmup -> runs it on a daemon thread, is_ready/wait_ready/warmup_status -> readiness indicator,
+#                 start_schema_refresh/stop_schema_refresh -> reloads warmed schema catalogs every half SCHEMA_CACHE_TTL
+# Notable vars: STEPS -> ordered warm-up steps, _ready -> set once warm-up finished,
+#               WARMUP_ENABLED / WARMUP_POOL_CONNECTIONS / WARMUP_PRIME_LLM -> settings from config